@@ -0,0 +1,62 @@
+import shutil
+import tempfile
+import time
+import numpy as np
+from vector_cache.vector_stores.chroma_db import ChromaDB
+
+# Insert and query throughput of ChromaDB, one call per vector against batched calls, for the ephemeral and the
+# persistent client, plus how long a persistent collection takes to reopen.
+dimension = 384
+num_vectors = 20000
+num_queries = 1000
+batch_size = 500
+top_k = 3
+
+rng = np.random.default_rng(42)
+# Clustered data behaves more like real embeddings than uniform noise does
+centers = rng.standard_normal((200, dimension)).astype(np.float32)
+data = centers[rng.integers(0, len(centers), num_vectors)] + 0.3 * rng.standard_normal((num_vectors, dimension)).astype(np.float32)
+queries = centers[rng.integers(0, len(centers), num_queries)] + 0.3 * rng.standard_normal((num_queries, dimension)).astype(np.float32)
+payloads = [f"response {i}" for i in range(num_vectors)]
+
+
+def run(label, **options):
+    start = time.perf_counter()
+    store = ChromaDB(f"throughput-single-{label}", **options)
+    for vector, payload in zip(data[:num_queries], payloads):
+        store.add(vector, payload=payload)
+    single_insert = num_queries / (time.perf_counter() - start)
+
+    store = ChromaDB(f"throughput-batch-{label}", **options)
+    start = time.perf_counter()
+    for offset in range(0, num_vectors, batch_size):
+        store.add_many(data[offset:offset + batch_size], payloads[offset:offset + batch_size])
+    batch_insert = num_vectors / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for query in queries:
+        store.search_with_payload(query, top_k)
+    single_query = num_queries / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for offset in range(0, num_queries, 100):
+        store.search_many_with_payload(queries[offset:offset + 100], top_k)
+    batch_query = num_queries / (time.perf_counter() - start)
+
+    print(f"{label:<10} | {single_insert:>12.0f} | {batch_insert:>12.0f} | {single_query:>11.0f} | {batch_query:>11.0f}")
+
+
+print(f"{num_vectors} vectors of {dimension} dimensions; insert batches of {batch_size}, query batches of 100\n")
+print(f"{'client':<10} | {'insert/s x1':>12} | {'insert/s x' + str(batch_size):>12} | {'query/s x1':>11} | {'query/s x100':>11}")
+print("-" * 68)
+run("ephemeral")
+path = tempfile.mkdtemp(prefix="vector-cache-chroma-")
+try:
+    run("persistent", path=path)
+
+    start = time.perf_counter()
+    reopened = ChromaDB("throughput-batch-persistent", path=path)
+    reopened.search(queries[0], top_k)
+    print(f"\nreopened {len(reopened)} persisted vectors and answered a query in {time.perf_counter() - start:.2f}s")
+finally:
+    shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,46 @@
+import time
+import numpy as np
+from vector_cache.vector_stores import NumpyVectorStore, HNSWVectorStore
+
+# Recall-vs-latency table for HNSWVectorStore, using NumpyVectorStore (exact search) as ground truth.
+dimension = 128
+num_vectors = 20000
+num_queries = 200
+top_k = 10
+
+rng = np.random.default_rng(42)
+# Clustered data behaves more like real embeddings than uniform noise does
+centers = rng.standard_normal((200, dimension)).astype(np.float32)
+data = centers[rng.integers(0, len(centers), num_vectors)] + 0.3 * rng.standard_normal((num_vectors, dimension)).astype(np.float32)
+queries = centers[rng.integers(0, len(centers), num_queries)] + 0.3 * rng.standard_normal((num_queries, dimension)).astype(np.float32)
+
+# Sequential ids make the two stores' results directly comparable
+exact_ids = iter(range(num_vectors))
+hnsw_ids = iter(range(num_vectors))
+exact_store = NumpyVectorStore(dimension=dimension, identifier=lambda: str(next(exact_ids)))
+hnsw_store = HNSWVectorStore(dimension=dimension, m=16, ef_construction=100, seed=0, identifier=lambda: str(next(hnsw_ids)))
+
+start = time.perf_counter()
+for vector in data:
+    exact_store.add(vector)
+print(f"NumpyVectorStore: inserted {num_vectors} vectors in {time.perf_counter() - start:.2f}s")
+
+start = time.perf_counter()
+for vector in data:
+    hnsw_store.add(vector)
+print(f"HNSWVectorStore:  inserted {num_vectors} vectors in {time.perf_counter() - start:.2f}s")
+
+start = time.perf_counter()
+ground_truth = [set(exact_store.search(query, top_k)[0]) for query in queries]
+exact_latency = (time.perf_counter() - start) / num_queries
+print(f"\nexact search: {exact_latency * 1e6:.0f} us/query\n")
+
+print(f"{'ef_search':>9} | {'recall@' + str(top_k):>10} | {'recall@1':>8} | {'us/query':>8}")
+print("-" * 45)
+for ef_search in (10, 20, 40, 80, 160, 320):
+    start = time.perf_counter()
+    results = [hnsw_store.search(query, top_k, ef_search=ef_search)[0] for query in queries]
+    latency = (time.perf_counter() - start) / num_queries
+    recall = np.mean([len(truth.intersection(result)) / top_k for truth, result in zip(ground_truth, results)])
+    recall_at_1 = np.mean([exact_store.search(query, 1)[0][0] == result[0] for query, result in zip(queries, results)])
+    print(f"{ef_search:>9} | {recall:>10.3f} | {recall_at_1:>8.3f} | {latency * 1e6:>8.0f}")
@@ -0,0 +1,64 @@
+import time
+import numpy as np
+from vector_cache.vector_stores import NumpyVectorStore, QuantizedVectorStore
+
+# Recall and memory of QuantizedVectorStore configurations, using NumpyVectorStore (exact float32) as ground truth.
+dimension = 768
+num_vectors = 20000
+num_queries = 200
+top_k = 10
+
+rng = np.random.default_rng(42)
+# Clustered data behaves more like real embeddings than uniform noise does
+centers = rng.standard_normal((200, dimension)).astype(np.float32)
+data = centers[rng.integers(0, len(centers), num_vectors)] + 0.5 * rng.standard_normal((num_vectors, dimension)).astype(np.float32)
+queries = centers[rng.integers(0, len(centers), num_queries)] + 0.5 * rng.standard_normal((num_queries, dimension)).astype(np.float32)
+
+
+def sequential_ids():
+    ids = iter(range(num_vectors))
+    return lambda: str(next(ids))
+
+
+exact_store = NumpyVectorStore(dimension=dimension, identifier=sequential_ids())
+exact_store.add_many(data)
+ground_truth = exact_store.search_many(queries, top_k)
+
+configurations = [
+    ("int8, no rerank", dict(quantization="int8", rerank=None)),
+    ("int8, rerank 32 (disk)", dict(quantization="int8", rerank="disk")),
+    ("pq m=96, no rerank", dict(quantization="pq", pq_subvectors=96, rerank=None)),
+    ("pq m=96, rerank 32 (disk)", dict(quantization="pq", pq_subvectors=96, rerank="disk")),
+    ("pq m=96, rerank 128 (disk)", dict(quantization="pq", pq_subvectors=96, rerank="disk", rerank_candidates=128)),
+    ("pq m=192, rerank 32 (disk)", dict(quantization="pq", pq_subvectors=192, rerank="disk")),
+]
+
+print(f"float32 baseline: {dimension * 4} bytes/vector in RAM\n")
+print(f"{'configuration':<28} | {'RAM B/vec':>9} | {'x smaller':>9} | {'recall@' + str(top_k):>9} | {'recall@1':>8} | {'max |d err|':>11} | {'us/query':>8}")
+print("-" * 104)
+for label, options in configurations:
+    with QuantizedVectorStore(dimension=dimension, seed=0, identifier=sequential_ids(), **options) as store:
+        store.add_many(data)
+        start = time.perf_counter()
+        results = store.search_many(queries, top_k)
+        latency = (time.perf_counter() - start) / num_queries
+        recall = np.mean([len(set(truth[0]) & set(result[0])) / top_k for truth, result in zip(ground_truth, results)])
+        recall_at_1 = np.mean([truth[0][0] == result[0][0] for truth, result in zip(ground_truth, results)])
+        # Largest error of the reported top-1 distance against its exact value
+        error = max(abs(result[1][0] - truth[1][0]) for truth, result in zip(ground_truth, results) if truth[0][0] == result[0][0])
+        print(f"{label:<28} | {store.bytes_per_vector:>9} | {dimension * 4 / store.bytes_per_vector:>9.1f} | {recall:>9.3f} | "
+              f"{recall_at_1:>8.3f} | {error:>11.2e} | {latency * 1e6:>8.0f}")
+
+# Retraining re-encodes the stored vectors, so it needs their full vectors: without rerank it raises ValueError
+with QuantizedVectorStore(dimension=dimension, quantization="pq", pq_subvectors=96, rerank=None, seed=0) as store:
+    store.add_many(data[:1000])
+    store.train(data[:1000])
+    try:
+        store.train(data[1000:3000])
+    except ValueError as e:
+        print(f"\npq, no rerank, retrain: {e}")
+with QuantizedVectorStore(dimension=dimension, quantization="pq", pq_subvectors=96, rerank="memory", seed=0) as store:
+    store.add_many(data[:1000])
+    store.train(data[:1000])
+    store.train(data[1000:3000])
+    print(f"pq, rerank (memory), retrain: re-encoded {len(store)} stored vectors")
@@ -23,7 +23,8 @@ extras_require = {
     'pinecone': ['pinecone-client'],
     'redis': ['redis'],
     'memcache': ['pymemcache'],
-    'cohere': ['cohere']
+    'cohere': ['cohere'],
+    'compression': ['zstandard', 'lz4', 'orjson']
 }
 
 # Add 'all' option which includes all extra dependencies
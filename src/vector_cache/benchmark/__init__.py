@@ -0,0 +1,2 @@
+from .workloads import HashingEmbeddings, make_paraphrase_clusters, zipf_workload, load_query_log
+from .runner import run_benchmark, measure_memory_per_entry, format_report
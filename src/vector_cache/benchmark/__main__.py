@@ -0,0 +1,151 @@
+"""
+Compare vector store / cache storage combinations on a synthetic or recorded workload.
+
+    python -m vector_cache.benchmark --vector-stores numpy,hnsw,chroma --storages sharded-lru,redis --concurrency 8
+
+Everything runs offline with the deterministic `HashingEmbeddings` model; remote backends use the URLs given below.
+"""
+import argparse
+import json
+import sys
+import tempfile
+import uuid
+from urllib.parse import urlparse
+from vector_cache.benchmark.runner import MODES, format_report, run_benchmark
+from vector_cache.benchmark.workloads import HashingEmbeddings, load_query_log, make_paraphrase_clusters, zipf_workload
+from vector_cache.main import VectorCache
+
+# Storages without internal locking, which must not be shared by several threads
+UNLOCKED_STORAGES = ("lru", "lfu")
+
+
+def build_vector_store(name: str, args):
+    # Remote backends get a fresh index per cache so runs do not see each other's entries
+    unique = f"bench_{uuid.uuid4().hex[:12]}"
+    if name == "numpy":
+        from vector_cache.vector_stores.numpy_store import NumpyVectorStore
+        return NumpyVectorStore(dimension=args.dimension)
+    if name == "hnsw":
+        from vector_cache.vector_stores.hnsw import HNSWVectorStore
+        return HNSWVectorStore(dimension=args.dimension, seed=0)
+    if name == "mmap":
+        from vector_cache.vector_stores.mmap_store import MMapVectorStore
+        return MMapVectorStore(tempfile.mkdtemp(prefix="vector-cache-bench-"), dimension=args.dimension, fsync="never")
+    if name == "chroma":
+        from vector_cache.vector_stores.chroma_db import ChromaDB
+        return ChromaDB(collection=unique)
+    if name == "chroma-persistent":
+        from vector_cache.vector_stores.chroma_db import ChromaDB
+        return ChromaDB(collection=unique, path=tempfile.mkdtemp(prefix="vector-cache-bench-"))
+    if name == "redis":
+        from vector_cache.vector_stores.redis_vector import RedisVectorStore
+        return RedisVectorStore(unique, redis_url=args.redis_url, vector_dim=args.dimension)
+    if name == "qdrant":
+        from vector_cache.vector_stores.qdrant import QdrantStore
+        if args.qdrant_url == ":memory:":
+            return QdrantStore(collection_name=unique, dimension=args.dimension, location=":memory:")
+        url = urlparse(args.qdrant_url)
+        return QdrantStore(collection_name=unique, host=url.hostname, port=url.port or 6333, dimension=args.dimension,
+                           prefer_grpc=args.qdrant_grpc)
+    if name == "pgvector":
+        from vector_cache.vector_stores.pgvector import PGVector
+        index_type = None if args.pg_index == "none" else args.pg_index
+        return PGVector(args.pg_dsn, table_name=unique, dimension=args.dimension, index_type=index_type,
+                        ef_search=args.pg_ef_search, max_connections=max(args.concurrency, 1) + 1)
+    raise ValueError(f"Unknown vector store: {name}")
+
+
+def build_storage(name: str, args):
+    if name == "lru":
+        from vector_cache.cache_storage.lru import LRUCache
+        return LRUCache(args.capacity)
+    if name == "lfu":
+        from vector_cache.cache_storage.lfu import LFUCache
+        return LFUCache(args.capacity)
+    if name in ("sharded-lru", "sharded-lfu"):
+        from vector_cache.cache_storage.sharded import ShardedLRUCache, ShardedLFUCache
+        cache_class = ShardedLRUCache if name == "sharded-lru" else ShardedLFUCache
+        return cache_class(args.capacity * args.response_bytes)
+    if name.startswith("tiered-"):
+        from vector_cache.cache_storage.tiered import TieredStorage
+        return TieredStorage(build_storage(name[len("tiered-"):], args),
+                             local_capacity_bytes=args.l1_entries * args.response_bytes)
+    if name == "redis":
+        from vector_cache.cache_storage.redis_store import RedisStorage
+        url = urlparse(args.redis_url)
+        return RedisStorage(host=url.hostname, port=url.port or 6379)
+    if name == "memcache":
+        from vector_cache.cache_storage.memcache import MemcacheCache
+        return MemcacheCache(servers=args.memcache.split(","))
+    raise ValueError(f"Unknown storage: {name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m vector_cache.benchmark", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vector-stores", default="numpy,hnsw", help="Comma-separated: numpy, hnsw, mmap, chroma, chroma-persistent, redis, qdrant, pgvector")
+    parser.add_argument("--storages", default="sharded-lru",
+                        help="Comma-separated: sharded-lru, sharded-lfu, lru, lfu, redis, memcache, tiered-redis, "
+                        "tiered-memcache. lru and lfu are not thread-safe and run with one thread")
+    parser.add_argument("--mode", choices=MODES, default="direct")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=5000, help="Length of the synthetic query stream")
+    parser.add_argument("--topics", type=int, default=1000)
+    parser.add_argument("--paraphrases", type=int, default=4, help="Paraphrases per topic")
+    parser.add_argument("--edits", type=int, default=2, help="Words replaced in each paraphrase (of 12)")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of topic popularity")
+    parser.add_argument("--log", help="Replay this query log (.jsonl or one query per line) instead of a synthetic stream")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--response-bytes", type=int, default=512)
+    parser.add_argument("--threshold", type=float, default=0.25, help="cosine_threshold of the cache")
+    parser.add_argument("--capacity", type=int, default=100000, help="Capacity of lru/lfu storages, in responses")
+    parser.add_argument("--l1-entries", type=int, default=1000, help="In-process tier of tiered-* storages, in responses")
+    parser.add_argument("--exact-match", action="store_true", help="Put a sharded LRU exact-match tier in front")
+    parser.add_argument("--memory-entries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--qdrant-url", default="http://localhost:6333", help="Or :memory: for embedded Qdrant")
+    parser.add_argument("--qdrant-grpc", action="store_true", help="Talk to Qdrant over gRPC")
+    parser.add_argument("--pg-dsn", default="postgresql://localhost/postgres")
+    parser.add_argument("--pg-index", choices=("hnsw", "none"), default="hnsw",
+                        help="pgvector index; ivfflat needs a loaded table, see PGVector.build_index")
+    parser.add_argument("--pg-ef-search", type=int, default=None, help="hnsw.ef_search for pgvector searches")
+    parser.add_argument("--memcache", default="localhost:11211", help="Comma-separated host:port of memcached servers")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.log:
+        queries = load_query_log(args.log)
+    else:
+        clusters = make_paraphrase_clusters(args.topics, args.paraphrases, edits_per_paraphrase=args.edits, seed=args.seed)
+        queries = zipf_workload(clusters, args.queries, exponent=args.zipf, seed=args.seed)
+
+    results = []
+    for store_name in args.vector_stores.split(","):
+        for storage_name in args.storages.split(","):
+            concurrency = args.concurrency
+            if storage_name in UNLOCKED_STORAGES and args.mode != "async-decorator" and concurrency > 1:
+                print(f"{storage_name} is not thread-safe; running it with concurrency 1", file=sys.stderr)
+                concurrency = 1
+
+            def make_cache(metrics, store_name=store_name, storage_name=storage_name):
+                exact_match_storage = None
+                if args.exact_match:
+                    from vector_cache.cache_storage.sharded import ShardedLRUCache
+                    exact_match_storage = ShardedLRUCache(args.capacity * args.response_bytes)
+                return VectorCache(HashingEmbeddings(args.dimension, seed=args.seed, latency_ms=args.embedding_latency_ms),
+                                   build_storage(storage_name, args), build_vector_store(store_name, args),
+                                   args.threshold, exact_match_storage=exact_match_storage, metrics=metrics)
+
+            results.append(run_benchmark(f"{store_name} + {storage_name}", make_cache, queries,
+                                         concurrency=concurrency, mode=args.mode,
+                                         response_bytes=args.response_bytes, llm_latency_ms=args.llm_latency_ms,
+                                         memory_entries=args.memory_entries))
+
+    print(json.dumps(results, indent=2) if args.json else format_report(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import asyncio
+import gc
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+import numpy as np
+from vector_cache.main import VectorCache, semantic_cache_decorator
+from vector_cache.utils.metrics import Metrics, MetricsSink, NULL_METRICS
+
+MODES = ("direct", "decorator", "async-decorator")
+
+
+class SampleSink(MetricsSink):
+    """
+    Keeps every latency sample, so percentiles are exact rather than bucketed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[int]] = {}
+        self.counters: Dict[str, int] = {}
+
+    def observe_latency(self, stage: str, elapsed_ns: int):
+        with self._lock:
+            self.samples.setdefault(stage, []).append(elapsed_ns)
+
+    def increment(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+
+def percentiles_ms(samples_ns: List[int]) -> dict:
+    if not samples_ns:
+        return {"count": 0, "p50": None, "p95": None, "p99": None}
+    p50, p95, p99 = np.percentile(np.asarray(samples_ns, dtype=np.float64) / 1e6, [50, 95, 99])
+    return {"count": len(samples_ns), "p50": p50, "p95": p95, "p99": p99}
+
+
+def make_responder(response_bytes: int = 512, llm_latency_ms: float = 0.0):
+    """
+    A stand-in for the LLM call behind the cache, in sync and async flavours.
+    """
+    def respond(query: str) -> str:
+        if llm_latency_ms:
+            time.sleep(llm_latency_ms / 1000)
+        return f"response to {query}".ljust(response_bytes, ".")
+
+    async def respond_async(query: str) -> str:
+        if llm_latency_ms:
+            await asyncio.sleep(llm_latency_ms / 1000)
+        return f"response to {query}".ljust(response_bytes, ".")
+
+    return respond, respond_async
+
+
+def measure_memory_per_entry(make_cache: Callable[[Metrics], VectorCache], queries: List[str],
+                             response_bytes: int = 512) -> float:
+    """
+    Bytes of Python-heap growth (as seen by tracemalloc) per inserted entry, for a fresh cache. Construction is
+    included, so up-front allocations such as a preallocated matrix are spread over the entries. Vector stores that
+    keep their vectors in memory-mapped files, which tracemalloc does not see, add the size of those files instead.
+
+    Only this process is measured: for remote stores and storages this is the client-side cost, not the server's.
+    """
+    respond, _ = make_responder(response_bytes)
+    responses = [respond(query) for query in queries]
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        cache = make_cache(NULL_METRICS)
+        # Lazily-built embedding model state (such as word vectors in HashingEmbeddings) is not part of the cache
+        warm_start, _ = tracemalloc.get_traced_memory()
+        cache.embedding_model.get_embeddings(list(queries))
+        gc.collect()
+        warm_stop, _ = tracemalloc.get_traced_memory()
+        for query, response in zip(queries, responses):
+            cache.add_query_to_index(query, response)
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    after -= warm_stop - warm_start
+    after += getattr(cache.vector_store, "mapped_bytes", 0)
+    return (after - before) / max(1, len(queries))
+
+
+def _run_threads(cache: VectorCache, queries: List[str], concurrency: int, mode: str, respond: Callable):
+    if mode == "decorator":
+        call = semantic_cache_decorator(cache)(respond)
+    else:
+        def call(query: str):
+            cached_response, _ = cache.find_similar_queries(query)
+            if cached_response is not None:
+                return cached_response
+            response = respond(query)
+            cache.add_query_to_index(query, response)
+            return response
+
+    latencies = [0] * len(queries)
+    errors = []
+    cursor = iter(range(len(queries)))
+    cursor_lock = threading.Lock()
+
+    def worker():
+        while True:
+            with cursor_lock:
+                position = next(cursor, None)
+            if position is None:
+                return
+            start = time.perf_counter_ns()
+            try:
+                call(queries[position])
+            except Exception as e:
+                errors.append(e)
+            latencies[position] = time.perf_counter_ns() - start
+
+    with ThreadPoolExecutor(concurrency, thread_name_prefix="vector-cache-benchmark") as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    return latencies, errors
+
+
+async def _run_tasks(cache: VectorCache, queries: List[str], concurrency: int, respond_async: Callable):
+    call = semantic_cache_decorator(cache)(respond_async)
+    latencies = [0] * len(queries)
+    errors = []
+    cursor = iter(range(len(queries)))
+
+    async def worker():
+        for position in cursor:  # Tasks share one iterator; each position is taken exactly once
+            start = time.perf_counter_ns()
+            try:
+                await call(queries[position])
+            except Exception as e:
+                errors.append(e)
+            latencies[position] = time.perf_counter_ns() - start
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def run_benchmark(name: str, make_cache: Callable[[Metrics], VectorCache], queries: List[str], concurrency: int = 8,
+                  mode: str = "direct", response_bytes: int = 512, llm_latency_ms: float = 0.0,
+                  memory_entries: int = 1000) -> dict:
+    """
+    Replay `queries` against a fresh cache and report throughput, latency percentiles, hit rate and memory.
+
+    :param name: A label for the store/storage combination.
+    :param make_cache: Builds a new `VectorCache` wired to the given `Metrics`.
+    :param queries: The query stream, e.g. from `zipf_workload` or `load_query_log`.
+    :param concurrency: Threads (or asyncio tasks for "async-decorator") issuing queries.
+    :param mode: "direct" calls `find_similar_queries` and `add_query_to_index`; "decorator" and "async-decorator"
+        go through `semantic_cache_decorator`.
+    :param response_bytes: Size of each simulated LLM response.
+    :param llm_latency_ms: Simulated latency of the LLM call made on a miss.
+    :param memory_entries: Distinct queries inserted into a separate fresh cache to measure memory per entry; 0 skips
+        the measurement.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}.")
+    respond, respond_async = make_responder(response_bytes, llm_latency_ms)
+    sink = SampleSink()
+    cache = make_cache(Metrics([sink]))
+
+    start = time.perf_counter()
+    if mode == "async-decorator":
+        latencies, errors = asyncio.run(_run_tasks(cache, queries, concurrency, respond_async))
+    else:
+        latencies, errors = _run_threads(cache, queries, concurrency, mode, respond)
+    elapsed = time.perf_counter() - start
+
+    hits = sink.counters.get("hit", 0) + sink.counters.get("exact_hit", 0)
+    lookups = hits + sink.counters.get("miss", 0) + sink.counters.get("near_miss", 0)
+    result = {
+        "name": name,
+        "mode": mode,
+        "concurrency": concurrency,
+        "queries": len(queries),
+        "seconds": elapsed,
+        "throughput_qps": len(queries) / elapsed if elapsed else None,
+        "hit_rate": hits / lookups if lookups else None,
+        "counters": dict(sink.counters),
+        "latency_ms": {"end_to_end": percentiles_ms(latencies),
+                       **{stage: percentiles_ms(samples) for stage, samples in sink.samples.items()}},
+        "errors": len(errors),
+        "first_error": repr(errors[0]) if errors else None,
+        "memory_bytes_per_entry": None,
+    }
+    if memory_entries:
+        distinct = list(dict.fromkeys(queries))[:memory_entries]
+        result["memory_bytes_per_entry"] = measure_memory_per_entry(make_cache, distinct, response_bytes)
+    return result
+
+
+def format_report(results: List[dict]) -> str:
+    """
+    Render benchmark results as a plain-text table, one block per combination.
+    """
+    lines = []
+    for result in results:
+        hit_rate = "n/a" if result["hit_rate"] is None else f"{result['hit_rate']:.3f}"
+        memory = "n/a" if result["memory_bytes_per_entry"] is None else f"{result['memory_bytes_per_entry']:.0f} B"
+        lines.append(f"== {result['name']} ({result['mode']}, concurrency {result['concurrency']})")
+        lines.append(f"   {result['queries']} queries in {result['seconds']:.2f}s = {result['throughput_qps']:.0f} q/s, "
+                     f"hit rate {hit_rate}, memory/entry {memory}, errors {result['errors']}")
+        if result["first_error"]:
+            lines.append(f"   first error: {result['first_error']}")
+        lines.append(f"   {'stage':<15} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for stage, stats in result["latency_ms"].items():
+            if stats["count"]:
+                lines.append(f"   {stage:<15} {stats['count']:>7} {stats['p50']:>9.3f} {stats['p95']:>9.3f} {stats['p99']:>9.3f}")
+        lines.append("")
+    return "\n".join(lines)
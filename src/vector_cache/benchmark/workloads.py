@@ -0,0 +1,107 @@
+import hashlib
+import json
+import time
+from typing import List, Optional
+import numpy as np
+from vector_cache.embedding.base_embedding import BaseEmbedding
+
+
+class HashingEmbeddings(BaseEmbedding):
+    def __init__(self, dimension: int = 384, seed: int = 0, latency_ms: float = 0.0):
+        """
+        A deterministic, offline embedding model for benchmarks.
+
+        Each lower-cased word maps to a fixed random unit vector derived from a hash of the word, and a text embeds
+        to the normalised sum of its word vectors. Texts sharing most of their words, such as the paraphrases made by
+        `make_paraphrase_clusters`, therefore land close together, and unrelated texts land far apart.
+
+        :param dimension: The embedding dimension.
+        :param seed: Changes every word vector; the same seed always gives the same embeddings.
+        :param latency_ms: Simulated model latency added to every call.
+        """
+        self._dimension = dimension
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.model_name = f"hashing-{dimension}-{seed}"
+        self._word_vectors = {}
+
+    def _word_vector(self, word: str) -> np.ndarray:
+        vector = self._word_vectors.get(word)
+        if vector is None:
+            digest = hashlib.blake2b(f"{self.seed}:{word}".encode("utf-8"), digest_size=8).digest()
+            vector = np.random.default_rng(int.from_bytes(digest, "little")).standard_normal(self._dimension)
+            vector = (vector / np.linalg.norm(vector)).astype(np.float32)
+            self._word_vectors[word] = vector
+        return vector
+
+    def _embed(self, text: str) -> np.ndarray:
+        words = text.lower().split()
+        if not words:
+            return np.zeros(self._dimension, dtype=np.float32)
+        embedding = np.sum([self._word_vector(word) for word in words], axis=0)
+        return embedding / np.linalg.norm(embedding)
+
+    def get_embeddings(self, text, **kwargs):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if isinstance(text, str):
+            return self._embed(text)
+        return [self._embed(item) for item in text]
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+
+def make_paraphrase_clusters(num_topics: int, paraphrases_per_topic: int = 4, words_per_query: int = 12,
+                             edits_per_paraphrase: int = 2, vocabulary_size: int = 20000, seed: int = 0) -> List[List[str]]:
+    """
+    Generate clusters of synthetic queries. Each topic has a base query of random words; each paraphrase replaces
+    `edits_per_paraphrase` of them. With `HashingEmbeddings`, a paraphrase sits at a cosine distance of roughly
+    edits_per_paraphrase / words_per_query from its base query.
+
+    :return: One list per topic, the base query first.
+    """
+    rng = np.random.default_rng(seed)
+    clusters = []
+    for _ in range(num_topics):
+        base = [f"w{index}" for index in rng.integers(0, vocabulary_size, words_per_query)]
+        cluster = [" ".join(base)]
+        for _ in range(paraphrases_per_topic - 1):
+            words = list(base)
+            for position in rng.choice(words_per_query, size=min(edits_per_paraphrase, words_per_query), replace=False):
+                words[position] = f"w{rng.integers(0, vocabulary_size)}"
+            cluster.append(" ".join(words))
+        clusters.append(cluster)
+    return clusters
+
+
+def zipf_workload(clusters: List[List[str]], num_queries: int, exponent: float = 1.1, seed: int = 0) -> List[str]:
+    """
+    Draw a query stream whose topic popularity follows a Zipf law: the topic of rank r is picked with probability
+    proportional to 1 / r ** exponent. Within a topic, the paraphrase is picked uniformly.
+    """
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, len(clusters) + 1) ** exponent
+    topics = rng.choice(len(clusters), size=num_queries, p=weights / weights.sum())
+    return [clusters[topic][rng.integers(0, len(clusters[topic]))] for topic in topics]
+
+
+def load_query_log(path: str, field: str = "query", limit: Optional[int] = None) -> List[str]:
+    """
+    Read a recorded query log for replay, in order. A `.jsonl` file holds one JSON object per line with the query
+    under `field` (or a bare JSON string); any other file holds one query per line.
+    """
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                record = json.loads(line)
+                line = record if isinstance(record, str) else record[field]
+            queries.append(line)
+            if limit is not None and len(queries) >= limit:
+                break
+    return queries
@@ -1 +1,4 @@
-from .redis_store import RedisStorage
\ No newline at end of file
+from .redis_store import RedisStorage
+from .codec import ResponseCodec, train_zstd_dictionary
+from .sharded import ShardedLRUCache, ShardedLFUCache
+from .tiered import TieredStorage
@@ -1,11 +1,76 @@
+import asyncio
+import warnings
 from abc import ABC, abstractmethod
+from typing import Callable, List
 
 
 class CacheStorageInterface(ABC):
+    # Storages that drop responses on their own (capacity eviction, expiry) and can report it set this to True.
+    # Listeners registered with `add_eviction_listener` are then called with the dropped query indices.
+    notifies_evictions = False
     @abstractmethod
     def set_response(self, query_index: int, response: str):
         pass
 
     @abstractmethod
     def get_response(self, query_index: int) -> str:
-        pass
\ No newline at end of file
+        pass
+
+    def set_many(self, responses: dict):
+        """
+        Store several query_index -> response pairs. Backends with a bulk write API override this.
+        """
+        for query_index, response in responses.items():
+            self.set_response(query_index, response)
+
+    def get_many(self, query_indices: list) -> List[str]:
+        """
+        Fetch several responses, returning None for missing ones, in input order. Backends with a bulk read API
+        override this.
+        """
+        return [self.get_response(query_index) for query_index in query_indices]
+
+    def delete_response(self, query_index: int) -> bool:
+        """
+        Remove a response, e.g. because a newer answer replaced it elsewhere. Returns True if it was present, or when
+        the backend cannot tell.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support deletes.")
+
+    def add_eviction_listener(self, listener: Callable[[list], None]):
+        """
+        Call `listener(query_indices)` whenever the storage drops responses on its own. Listeners run on the thread
+        that caused the eviction, so they should be quick.
+        """
+        if not self.notifies_evictions:
+            raise NotImplementedError(f"{type(self).__name__} does not report evictions.")
+        listeners = getattr(self, "_eviction_listeners", None)
+        if listeners is None:
+            listeners = self._eviction_listeners = []
+        listeners.append(listener)
+
+    def _notify_evicted(self, query_indices: list):
+        for listener in getattr(self, "_eviction_listeners", ()):
+            try:
+                listener(query_indices)
+            except Exception as e:
+                # A failing listener must not fail the write that triggered the eviction
+                warnings.warn(f"Eviction listener failed: {e!r}")
+
+    # Async counterparts. Backends with a native async client override these; the defaults run the blocking
+    # methods in a worker thread so that they never block the event loop.
+
+    async def set_response_async(self, query_index: int, response: str):
+        return await asyncio.to_thread(self.set_response, query_index, response)
+
+    async def get_response_async(self, query_index: int) -> str:
+        return await asyncio.to_thread(self.get_response, query_index)
+
+    async def delete_response_async(self, query_index: int) -> bool:
+        return await asyncio.to_thread(self.delete_response, query_index)
+
+    async def set_many_async(self, responses: dict):
+        return await asyncio.to_thread(self.set_many, responses)
+
+    async def get_many_async(self, query_indices: list) -> List[str]:
+        return await asyncio.to_thread(self.get_many, query_indices)
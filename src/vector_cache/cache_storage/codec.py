@@ -0,0 +1,154 @@
+import json
+import struct
+import zlib
+from typing import Iterable, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# Framed values start with 0xFF, a byte that never occurs in UTF-8 text, so values written before a codec was
+# configured (raw UTF-8 responses) are told apart from framed ones and still decode.
+MAGIC = b"\xffV"
+VERSION = 1
+# magic, version, codec id, format id
+HEADER = struct.Struct("!2sBBB")
+
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODEC_LZ4 = 3
+CODEC_ZSTD_DICT = 4
+
+FORMAT_TEXT = 0
+FORMAT_JSON = 1
+
+COMPRESSION_CODECS = {"none": CODEC_NONE, "zlib": CODEC_ZLIB, "zstd": CODEC_ZSTD, "lz4": CODEC_LZ4}
+
+
+def _dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _loads(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def train_zstd_dictionary(samples: Iterable[Union[str, bytes]], dict_size: int = 16384) -> bytes:
+    """
+    Train a zstd dictionary on sample responses. Short, repetitive responses (templated answers, chat completion
+    envelopes) compress several times better with a dictionary than on their own. Needs a few hundred samples.
+    """
+    if zstandard is None:
+        raise ImportError("Dictionary training requires zstandard. Install it with `pip install zstandard`.")
+    samples = [sample.encode("utf-8") if isinstance(sample, str) else sample for sample in samples]
+    return zstandard.train_dictionary(dict_size, samples).as_bytes()
+
+
+class ResponseCodec:
+    """
+    Turns responses into compact bytes for remote cache storage and back.
+
+    Each value is framed with a small header recording the format version, the compression codec and whether
+    the payload is text or JSON, so codecs and thresholds can change without invalidating what is already
+    stored. Strings are stored as UTF-8 text; other values (dicts, lists, e.g. a serialized chat completion)
+    are serialized to JSON, with orjson when it is installed, and come back as the same structure.
+    """
+
+    def __init__(self, compression: str = "zlib", threshold: int = 512, level: Optional[int] = None,
+                 zstd_dictionary: Optional[bytes] = None):
+        """
+        :param compression: "zlib", "zstd" (needs zstandard), "lz4" (needs lz4) or "none". All readers must
+            have the codec installed, so zlib is the default.
+        :param threshold: Values smaller than this many bytes are stored uncompressed; compressing them costs
+            CPU and rarely saves space.
+        :param level: Compression level, codec default when None.
+        :param zstd_dictionary: A dictionary from `train_zstd_dictionary`. Implies zstd compression. Readers
+            must be configured with the same dictionary.
+        """
+        if zstd_dictionary is not None:
+            compression = "zstd"
+        if compression not in COMPRESSION_CODECS:
+            raise ValueError(f"Unknown compression {compression!r}. Use one of {', '.join(COMPRESSION_CODECS)}.")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression requires zstandard. Install it with `pip install zstandard`.")
+        if compression == "lz4" and lz4_frame is None:
+            raise ImportError("lz4 compression requires lz4. Install it with `pip install lz4`.")
+        self.compression = compression
+        self.threshold = threshold
+        self.level = level
+        self.codec_id = CODEC_ZSTD_DICT if zstd_dictionary is not None else COMPRESSION_CODECS[compression]
+        self._zstd_dictionary = zstandard.ZstdCompressionDict(zstd_dictionary) if zstd_dictionary is not None else None
+        self._zstd_compressor = None
+        if zstandard is not None and compression == "zstd":
+            self._zstd_compressor = zstandard.ZstdCompressor(level=level if level is not None else 3,
+                                                             dict_data=self._zstd_dictionary)
+
+    def encode(self, response) -> bytes:
+        if isinstance(response, str):
+            body, format_id = response.encode("utf-8"), FORMAT_TEXT
+        else:
+            body, format_id = _dumps(response), FORMAT_JSON
+        codec_id = CODEC_NONE
+        if self.codec_id != CODEC_NONE and len(body) >= self.threshold:
+            compressed = self._compress(body)
+            # Incompressible values are kept as they are
+            if len(compressed) < len(body):
+                body, codec_id = compressed, self.codec_id
+        return HEADER.pack(MAGIC, VERSION, codec_id, format_id) + body
+
+    def decode(self, data: Optional[bytes]):
+        if data is None:
+            return None
+        if isinstance(data, str):
+            return data
+        if not data.startswith(MAGIC):
+            # Written without a codec
+            return data.decode("utf-8")
+        _, version, codec_id, format_id = HEADER.unpack_from(data)
+        if version != VERSION:
+            raise ValueError(f"Unsupported response frame version {version}.")
+        body = self._decompress(codec_id, memoryview(data)[HEADER.size:])
+        if format_id == FORMAT_JSON:
+            return _loads(body)
+        return body.decode("utf-8")
+
+    def _compress(self, body: bytes) -> bytes:
+        if self.codec_id == CODEC_ZLIB:
+            return zlib.compress(body, self.level if self.level is not None else 6)
+        if self.codec_id == CODEC_LZ4:
+            return lz4_frame.compress(body, compression_level=self.level or 0)
+        return self._zstd_compressor.compress(body)
+
+    def _decompress(self, codec_id: int, body: memoryview) -> bytes:
+        if codec_id == CODEC_NONE:
+            return bytes(body)
+        if codec_id == CODEC_ZLIB:
+            return zlib.decompress(body)
+        if codec_id == CODEC_LZ4:
+            if lz4_frame is None:
+                raise ImportError("Reading lz4 compressed responses requires lz4. Install it with `pip install lz4`.")
+            return lz4_frame.decompress(bytes(body))
+        if codec_id in (CODEC_ZSTD, CODEC_ZSTD_DICT):
+            if zstandard is None:
+                raise ImportError("Reading zstd compressed responses requires zstandard. Install it with `pip install zstandard`.")
+            if codec_id == CODEC_ZSTD_DICT and self._zstd_dictionary is None:
+                raise ValueError("Response was compressed with a zstd dictionary; pass it as zstd_dictionary.")
+            # Frames carry their content size, so no max_output_size is needed
+            return zstandard.ZstdDecompressor(dict_data=self._zstd_dictionary).decompress(bytes(body))
+        raise ValueError(f"Unknown response codec id {codec_id}.")
@@ -1,8 +1,11 @@
 from collections import defaultdict, OrderedDict
+from typing import List
 from vector_cache.cache_storage.base import CacheStorageInterface
 
 
 class LFUCache(CacheStorageInterface):
+    notifies_evictions = True
+
     def __init__(self, capacity: int):
         self.capacity = capacity
         self.cache = {}  # stores the query_index: (response, frequency)
@@ -31,6 +34,7 @@ class LFUCache(CacheStorageInterface):
                 if not self.freq[self.min_freq]:
                     del self.freq[self.min_freq]
                 del self.cache[evict_query_index]
+                self._notify_evicted([evict_query_index])
 
             # Insert the new response
             self.cache[query_index] = (response, 1)
@@ -51,4 +55,33 @@ class LFUCache(CacheStorageInterface):
         freq += 1
         self.freq[freq][query_index] = response
         self.cache[query_index] = (response, freq)
-        return response
\ No newline at end of file
+        return response
+
+    def delete_response(self, query_index: int) -> bool:
+        if query_index not in self.cache:
+            return False
+        _, freq = self.cache.pop(query_index)
+        self.freq[freq].pop(query_index)
+        if not self.freq[freq]:
+            del self.freq[freq]
+            if self.min_freq == freq:
+                self.min_freq = min(self.freq) if self.freq else 0
+        return True
+
+    # In-process operations never block for long, so the async variants run inline on the event loop instead of in
+    # worker threads, which would mutate the unlocked cache concurrently
+
+    async def set_response_async(self, query_index: int, response: str):
+        self.set_response(query_index, response)
+
+    async def get_response_async(self, query_index: int) -> str:
+        return self.get_response(query_index)
+
+    async def set_many_async(self, responses: dict):
+        self.set_many(responses)
+
+    async def get_many_async(self, query_indices: list) -> List[str]:
+        return self.get_many(query_indices)
+
+    async def delete_response_async(self, query_index: int) -> bool:
+        return self.delete_response(query_index)
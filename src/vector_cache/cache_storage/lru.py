@@ -1,8 +1,11 @@
 from collections import OrderedDict
+from typing import List
 from vector_cache.cache_storage.base import CacheStorageInterface
 
 
 class LRUCache(CacheStorageInterface):
+    notifies_evictions = True
+
     def __init__(self, capacity: int):
         self.cache = OrderedDict()
         self.capacity = capacity
@@ -12,10 +15,32 @@ class LRUCache(CacheStorageInterface):
             self.cache.move_to_end(query_index)
         self.cache[query_index] = response
         if len(self.cache) > self.capacity:
-            self.cache.popitem(last=False)
+            evicted_query_index, _ = self.cache.popitem(last=False)
+            self._notify_evicted([evicted_query_index])
 
     def get_response(self, query_index: int) -> str:
         if query_index not in self.cache:
             return None
         self.cache.move_to_end(query_index)
-        return self.cache[query_index]
\ No newline at end of file
+        return self.cache[query_index]
+
+    def delete_response(self, query_index: int) -> bool:
+        return self.cache.pop(query_index, None) is not None
+
+    # In-process operations never block for long, so the async variants run inline on the event loop instead of in
+    # worker threads, which would mutate the unlocked cache concurrently
+
+    async def set_response_async(self, query_index: int, response: str):
+        self.set_response(query_index, response)
+
+    async def get_response_async(self, query_index: int) -> str:
+        return self.get_response(query_index)
+
+    async def set_many_async(self, responses: dict):
+        self.set_many(responses)
+
+    async def get_many_async(self, query_indices: list) -> List[str]:
+        return self.get_many(query_indices)
+
+    async def delete_response_async(self, query_index: int) -> bool:
+        return self.delete_response(query_index)
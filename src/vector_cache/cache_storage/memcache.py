@@ -1,15 +1,106 @@
+from typing import List, Optional, Sequence, Tuple, Union
 from vector_cache.cache_storage.base import CacheStorageInterface
-from pymemcache.client.base import Client
+from vector_cache.cache_storage.codec import ResponseCodec
+from pymemcache.client.base import Client, PooledClient
+from pymemcache.client.hash import HashClient
+from pymemcache.exceptions import MemcacheError
+
+
+def _parse_server(server: Union[str, Tuple[str, int]]) -> Tuple[str, int]:
+    if isinstance(server, str):
+        host, _, port = server.rpartition(":") if ":" in server else (server, "", "")
+        return host, int(port or 11211)
+    host, port = server
+    return host, int(port)
+
 
 class MemcacheCache(CacheStorageInterface):
-    def __init__(self, host: str = 'localhost', port: int = 11211):
-        self.client = Client((host, port))
+    def __init__(self, host: str = 'localhost', port: int = 11211, codec: Optional[ResponseCodec] = None,
+                 servers: Optional[Sequence[Union[str, Tuple[str, int]]]] = None, pooled: bool = True,
+                 max_pool_size: Optional[int] = None, connect_timeout: Optional[float] = None,
+                 timeout: Optional[float] = None, fail_open: bool = False, noreply: bool = True,
+                 ttl: Optional[int] = None, retry_attempts: int = 2, dead_timeout: float = 60):
+        """
+        :param codec: Optional `ResponseCodec` compressing and framing stored responses. Values written before
+            a codec was configured are still read.
+        :param servers: "host:port" strings or (host, port) pairs of a memcached fleet. Keys are spread over them
+            by rendezvous hashing, so adding or removing a server only moves that server's share. host and port
+            are then ignored.
+        :param pooled: Keep a pool of connections per server so the storage can be shared by threads (and by the
+            worker threads of the async methods). A single unpooled connection is not thread-safe.
+        :param max_pool_size: Upper bound on the connections per server; None is unbounded.
+        :param connect_timeout: Seconds to wait for a connection; None blocks.
+        :param timeout: Seconds to wait on each socket operation; None blocks.
+        :param fail_open: Treat an unreachable or timed-out server as a miss (and drop the write) instead of
+            raising, so a memcached outage degrades the cache rather than the application. With several servers, a
+            failing one is also skipped for `dead_timeout` seconds after `retry_attempts` failures.
+        :param noreply: Send writes without waiting for the server's reply. Faster, but failed writes go unnoticed.
+        :param ttl: Optional expiry in seconds of stored responses.
+        """
+        options = dict(connect_timeout=connect_timeout, timeout=timeout, ignore_exc=fail_open,
+                       default_noreply=noreply)
+        if servers is not None and len(servers) > 1:
+            self.client = HashClient([_parse_server(server) for server in servers], use_pooling=pooled,
+                                     max_pool_size=max_pool_size, retry_attempts=retry_attempts,
+                                     dead_timeout=dead_timeout, **options)
+        else:
+            server = _parse_server(servers[0]) if servers else (host, port)
+            if pooled:
+                self.client = PooledClient(server, max_pool_size=max_pool_size, **options)
+            else:
+                self.client = Client(server, **options)
+        self.codec = codec
+        self.fail_open = fail_open
+        self.noreply = noreply
+        self.expire = ttl or 0
 
-    def set_response(self, query_index: int, response: str):
-        self.client.set(str(query_index), response)
+    def _encode(self, response):
+        return self.codec.encode(response) if self.codec is not None else response
 
-    def get_response(self, query_index: int) -> str:
-        response = self.client.get(str(query_index))
+    def _decode(self, response) -> Optional[str]:
+        if self.codec is not None:
+            return self.codec.decode(response)
         if response is not None:
             return response.decode('utf-8')
-        return None
\ No newline at end of file
+        return None
+
+    def _write(self, operation, *args, **kwargs):
+        # pymemcache's ignore_exc only covers reads; writes fail open here
+        try:
+            return operation(*args, **kwargs)
+        except (MemcacheError, OSError):
+            if not self.fail_open:
+                raise
+            return None
+
+    def set_response(self, query_index: int, response: str):
+        self._write(self.client.set, str(query_index), self._encode(response), expire=self.expire, noreply=self.noreply)
+
+    def get_response(self, query_index: int) -> str:
+        return self._decode(self.client.get(str(query_index)))
+
+    def set_many(self, responses: dict):
+        """
+        Store several responses with one multi-key set per server.
+        """
+        if not responses:
+            return
+        self._write(self.client.set_many,
+                    {str(query_index): self._encode(response) for query_index, response in responses.items()},
+                    expire=self.expire, noreply=self.noreply)
+
+    def get_many(self, query_indices: list) -> List[str]:
+        """
+        Fetch several responses with one multi-key get per server.
+        """
+        if not query_indices:
+            return []
+        keys = [str(query_index) for query_index in query_indices]
+        found = self.client.get_many(keys)
+        return [self._decode(found.get(key)) for key in keys]
+
+    def delete_response(self, query_index: int) -> bool:
+        return bool(self._write(self.client.delete, str(query_index), noreply=False))
+
+    def close(self):
+        self.client.close()
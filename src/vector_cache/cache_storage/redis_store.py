@@ -1,23 +1,208 @@
+import warnings
+from typing import List, Optional
 from vector_cache.cache_storage.base import CacheStorageInterface
+from vector_cache.cache_storage.codec import ResponseCodec
 import redis
+import redis.asyncio
+
+# Async counterparts of the blocking connection classes, and the connection settings that carry over between them
+_ASYNC_CONNECTION_CLASSES = {
+    redis.Connection: redis.asyncio.Connection,
+    redis.SSLConnection: redis.asyncio.SSLConnection,
+    redis.UnixDomainSocketConnection: redis.asyncio.UnixDomainSocketConnection,
+}
+_PORTABLE_CONNECTION_KWARGS = (
+    "host", "port", "path", "db", "username", "password", "credential_provider", "client_name", "socket_timeout",
+    "socket_connect_timeout", "socket_keepalive", "retry_on_timeout", "encoding", "encoding_errors",
+    "decode_responses", "protocol", "ssl_keyfile", "ssl_certfile", "ssl_cert_reqs", "ssl_ca_certs", "ssl_ca_data",
+    "ssl_check_hostname",
+)
+
+
+def _async_pool_like(connection_pool: redis.ConnectionPool) -> redis.asyncio.ConnectionPool:
+    """
+    Build an asyncio pool connecting to the same server, database and credentials as a blocking pool.
+    """
+    connection_class = _ASYNC_CONNECTION_CLASSES.get(connection_pool.connection_class)
+    if connection_class is None:
+        raise ValueError(f"Cannot derive an async pool from {connection_pool.connection_class.__name__}; "
+                         "pass async_connection_pool as well.")
+    kwargs = {key: value for key, value in connection_pool.connection_kwargs.items()
+              if key in _PORTABLE_CONNECTION_KWARGS}
+    return redis.asyncio.ConnectionPool(connection_class=connection_class,
+                                        max_connections=connection_pool.max_connections, **kwargs)
 
 
 class RedisStorage(CacheStorageInterface):
-    def __init__(self, host='localhost', port=6379, db=0, eviction_policy='volatile-lru', ttl=None):
-        self.r = redis.Redis(host=host, port=port, db=db)
+    notifies_evictions = True
+
+    def __init__(self, host='localhost', port=6379, db=0, eviction_policy='volatile-lru', ttl=None,
+                 connection_pool: Optional[redis.ConnectionPool] = None,
+                 async_connection_pool: Optional[redis.asyncio.ConnectionPool] = None,
+                 max_connections: Optional[int] = None, client_side_cache: bool = False,
+                 client_cache_size: int = 10000, codec: Optional[ResponseCodec] = None):
+        """
+        :param eviction_policy: The server's `maxmemory-policy`. It is read first and only set when it differs;
+            servers that refuse CONFIG (common on managed Redis) get a warning instead of an error. None leaves the
+            server configuration alone.
+        :param ttl: Optional expiry in seconds, written atomically with each response (SET ... EX).
+        :param connection_pool: Optional pool to share with other clients, e.g. a `RedisVectorStore` on the same
+            server. host, port, db and max_connections are then ignored.
+        :param async_connection_pool: The same for the asyncio client. Defaults to a pool connecting like
+            `connection_pool` when only that is given.
+        :param max_connections: Upper bound on the connections of the pools created here.
+        :param client_side_cache: Keep hot responses in process, using RESP3 server-assisted client-side caching:
+            the server invalidates cached keys when they change. Needs redis-py 5.1+ and Redis 6+, and applies
+            to the blocking client only. Ignored when `connection_pool` is given; configure the pool instead.
+        :param client_cache_size: Maximum number of responses held by the client-side cache.
+        :param codec: Optional `ResponseCodec` compressing and framing stored responses. Values written before
+            a codec was configured are still read.
+        """
+        if async_connection_pool is None and connection_pool is not None:
+            async_connection_pool = _async_pool_like(connection_pool)
+        if connection_pool is None:
+            cache_options = {}
+            if client_side_cache:
+                try:
+                    from redis.cache import CacheConfig
+                except ImportError:
+                    raise ImportError("client_side_cache requires redis-py 5.1 or later.")
+                cache_options = {"protocol": 3, "cache_config": CacheConfig(max_size=client_cache_size)}
+            connection_pool = redis.ConnectionPool(host=host, port=port, db=db, max_connections=max_connections,
+                                                   **cache_options)
+        if async_connection_pool is None:
+            async_connection_pool = redis.asyncio.ConnectionPool(host=host, port=port, db=db,
+                                                                 max_connections=max_connections)
+        self.r = redis.Redis(connection_pool=connection_pool)
+        self.async_r = redis.asyncio.Redis(connection_pool=async_connection_pool)
         self.eviction_policy = eviction_policy
         self.ttl = ttl
+        self.codec = codec
+        self._eviction_subscriber = None
         self._configure_eviction_policy()
 
     def _configure_eviction_policy(self):
-        self.r.config_set('maxmemory-policy', self.eviction_policy)
+        if self.eviction_policy is None:
+            return
+        try:
+            current = self.r.config_get('maxmemory-policy').get('maxmemory-policy')
+            if isinstance(current, bytes):
+                current = current.decode()
+            if current != self.eviction_policy:
+                self.r.config_set('maxmemory-policy', self.eviction_policy)
+        except redis.ResponseError as e:
+            warnings.warn(f"Could not set maxmemory-policy to {self.eviction_policy}: {e}")
+
+    def add_eviction_listener(self, listener):
+        """
+        Listen for responses the server evicts or expires, using keyspace notifications delivered to a background
+        thread. `notify-keyspace-events` is extended with `Exe` when the server allows CONFIG; otherwise enable it
+        in the server configuration.
+        """
+        super().add_eviction_listener(listener)
+        if self._eviction_subscriber is None:
+            self._subscribe_evictions()
+
+    def _subscribe_evictions(self):
+        try:
+            flags = self.r.config_get('notify-keyspace-events').get('notify-keyspace-events') or ''
+            if isinstance(flags, bytes):
+                flags = flags.decode()
+            # 'A' includes both the evicted ('e') and expired ('x') classes
+            missing = {'E'} | ({'e', 'x'} if 'A' not in flags else set())
+            missing -= set(flags)
+            if missing:
+                self.r.config_set('notify-keyspace-events', flags + ''.join(sorted(missing)))
+        except redis.ResponseError as e:
+            warnings.warn(f"Could not enable keyspace notifications, set notify-keyspace-events to include 'Exe': {e}")
+        db = self.r.connection_pool.connection_kwargs.get('db', 0)
+        pubsub = self.r.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{f"__keyevent@{db}__:evicted": self._on_key_event,
+                            f"__keyevent@{db}__:expired": self._on_key_event})
+        self._eviction_subscriber = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def _on_key_event(self, message):
+        key = message['data']
+        if isinstance(key, bytes):
+            key = key.decode()
+        # Other clients of a shared server (e.g. a RedisVectorStore) produce events too
+        if key.startswith("response:"):
+            self._notify_evicted([key[len("response:"):]])
+
+    @staticmethod
+    def _key(query_index) -> str:
+        return f"response:{query_index}"
+
+    def _encode(self, response):
+        return self.codec.encode(response) if self.codec is not None else response
+
+    def _decode(self, response) -> Optional[str]:
+        if self.codec is not None:
+            return self.codec.decode(response)
+        return response.decode() if response else None
 
     def set_response(self, query_index: int, response: str):
-        key = f"response:{query_index}"
-        self.r.set(key, response)
-        if self.ttl is not None:
-            self.r.expire(key, self.ttl)
+        self.r.set(self._key(query_index), self._encode(response), ex=self.ttl)
 
     def get_response(self, query_index: int) -> str:
-        response = self.r.get(f"response:{query_index}")
-        return response.decode() if response else None
+        return self._decode(self.r.get(self._key(query_index)))
+
+    def delete_response(self, query_index: int) -> bool:
+        return bool(self.r.delete(self._key(query_index)))
+
+    def set_many(self, responses: dict):
+        """
+        Store several responses in one round-trip: a single MSET, or a pipeline of SET ... EX when `ttl` is set.
+        """
+        if not responses:
+            return
+        if self.ttl is None:
+            self.r.mset({self._key(query_index): self._encode(response) for query_index, response in responses.items()})
+            return
+        pipeline = self.r.pipeline(transaction=False)
+        for query_index, response in responses.items():
+            pipeline.set(self._key(query_index), self._encode(response), ex=self.ttl)
+        pipeline.execute()
+
+    def get_many(self, query_indices: list) -> List[str]:
+        """
+        Fetch several responses with one MGET.
+        """
+        if not query_indices:
+            return []
+        return [self._decode(response) for response in self.r.mget([self._key(query_index) for query_index in query_indices])]
+
+    async def set_response_async(self, query_index: int, response: str):
+        await self.async_r.set(self._key(query_index), self._encode(response), ex=self.ttl)
+
+    async def get_response_async(self, query_index: int) -> str:
+        return self._decode(await self.async_r.get(self._key(query_index)))
+
+    async def delete_response_async(self, query_index: int) -> bool:
+        return bool(await self.async_r.delete(self._key(query_index)))
+
+    async def set_many_async(self, responses: dict):
+        if not responses:
+            return
+        if self.ttl is None:
+            await self.async_r.mset({self._key(query_index): self._encode(response) for query_index, response in responses.items()})
+            return
+        pipeline = self.async_r.pipeline(transaction=False)
+        for query_index, response in responses.items():
+            pipeline.set(self._key(query_index), self._encode(response), ex=self.ttl)
+        await pipeline.execute()
+
+    async def get_many_async(self, query_indices: list) -> List[str]:
+        if not query_indices:
+            return []
+        responses = await self.async_r.mget([self._key(query_index) for query_index in query_indices])
+        return [self._decode(response) for response in responses]
+
+    def close(self):
+        if self._eviction_subscriber is not None:
+            self._eviction_subscriber.stop()
+            self._eviction_subscriber = None
+        self.r.close()
+
+    async def close_async(self):
+        await self.async_r.aclose()
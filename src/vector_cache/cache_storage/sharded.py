@@ -0,0 +1,319 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+from vector_cache.cache_storage.base import CacheStorageInterface
+
+
+def response_size(response) -> int:
+    """Bytes charged against the capacity for a response: its UTF-8 length for text."""
+    if isinstance(response, str):
+        return len(response.encode("utf-8"))
+    if isinstance(response, (bytes, bytearray)):
+        return len(response)
+    return sys.getsizeof(response)
+
+
+class _Entry:
+    __slots__ = ("response", "size", "expires_at", "frequency")
+
+    def __init__(self, response, size: int, expires_at: Optional[float]):
+        self.response = response
+        self.size = size
+        self.expires_at = expires_at
+        self.frequency = 1
+
+
+class _Shard:
+    """
+    One independently locked partition of a sharded cache. Subclasses implement the eviction order; the caller
+    holds `lock` around every method.
+    """
+
+    def __init__(self, capacity_bytes: int):
+        self.lock = threading.Lock()
+        self.capacity_bytes = capacity_bytes
+        self.bytes = 0
+        # Query indices evicted or expired since the caller last drained this list
+        self.dropped = []
+
+    def get(self, query_index, now: float):
+        entry = self.entries.get(query_index)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= now:
+            self.remove(query_index)
+            self.dropped.append(query_index)
+            return None
+        self.touch(query_index, entry)
+        return entry.response
+
+    def put(self, query_index, response, size: int, expires_at: Optional[float]):
+        previous = self.entries.get(query_index)
+        frequency = 0
+        if previous is not None:
+            frequency = previous.frequency
+            self.remove(query_index)
+        if size > self.capacity_bytes:
+            # Would flush the whole shard and still not fit
+            if previous is not None:
+                self.dropped.append(query_index)
+            return
+        # Make room first, so that the new entry is never its own eviction victim
+        while self.bytes + size > self.capacity_bytes:
+            evicted_query_index, evicted = self.evict()
+            self.bytes -= evicted.size
+            self.dropped.append(evicted_query_index)
+        entry = _Entry(response, size, expires_at)
+        entry.frequency = frequency + 1
+        self.bytes += size
+        self.insert(query_index, entry)
+
+    def remove(self, query_index):
+        raise NotImplementedError
+
+    def touch(self, query_index, entry: _Entry):
+        raise NotImplementedError
+
+    def insert(self, query_index, entry: _Entry):
+        raise NotImplementedError
+
+    def evict(self) -> tuple:
+        raise NotImplementedError
+
+    def drain(self) -> list:
+        dropped, self.dropped = self.dropped, []
+        return dropped
+
+
+class _LRUShard(_Shard):
+    def __init__(self, capacity_bytes: int):
+        super().__init__(capacity_bytes)
+        self.entries = OrderedDict()
+
+    def remove(self, query_index):
+        entry = self.entries.pop(query_index, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def touch(self, query_index, entry: _Entry):
+        self.entries.move_to_end(query_index)
+
+    def insert(self, query_index, entry: _Entry):
+        self.entries[query_index] = entry
+
+    def evict(self) -> tuple:
+        return self.entries.popitem(last=False)
+
+
+class _LFUShard(_Shard):
+    def __init__(self, capacity_bytes: int, decay_interval: Optional[int]):
+        super().__init__(capacity_bytes)
+        self.entries = {}
+        self.buckets = {}  # frequency -> OrderedDict of query_index -> entry, least recent first
+        self.min_frequency = 0
+        self.decay_interval = decay_interval
+        self.accesses = 0
+
+    def _unlink(self, query_index, entry: _Entry):
+        bucket = self.buckets[entry.frequency]
+        del bucket[query_index]
+        if not bucket:
+            del self.buckets[entry.frequency]
+            if self.min_frequency == entry.frequency:
+                self.min_frequency = min(self.buckets) if self.buckets else 0
+
+    def _link(self, query_index, entry: _Entry):
+        bucket = self.buckets.get(entry.frequency)
+        if bucket is None:
+            bucket = self.buckets[entry.frequency] = OrderedDict()
+        bucket[query_index] = entry
+        if self.min_frequency == 0 or entry.frequency < self.min_frequency:
+            self.min_frequency = entry.frequency
+
+    def remove(self, query_index):
+        entry = self.entries.pop(query_index, None)
+        if entry is not None:
+            self._unlink(query_index, entry)
+            self.bytes -= entry.size
+
+    def touch(self, query_index, entry: _Entry):
+        bucket = self.buckets[entry.frequency]
+        del bucket[query_index]
+        if not bucket:
+            del self.buckets[entry.frequency]
+            if self.min_frequency == entry.frequency:
+                # The entry moves up by one, so that is the new minimum
+                self.min_frequency = entry.frequency + 1
+        entry.frequency += 1
+        self._link(query_index, entry)
+        self.accesses += 1
+        interval = self.decay_interval if self.decay_interval is not None else 10 * len(self.entries)
+        if interval and self.accesses >= interval:
+            self._decay()
+
+    def _decay(self):
+        # Halve every frequency so entries that were popular long ago can be evicted. Runs once per `interval`
+        # accesses, which keeps the amortized cost per operation constant.
+        self.accesses = 0
+        old_buckets = self.buckets
+        self.buckets, self.min_frequency = {}, 0
+        for frequency in sorted(old_buckets):
+            for query_index, entry in old_buckets[frequency].items():
+                entry.frequency = max(1, frequency >> 1)
+                self._link(query_index, entry)
+
+    def insert(self, query_index, entry: _Entry):
+        self.entries[query_index] = entry
+        self._link(query_index, entry)
+
+    def evict(self) -> tuple:
+        bucket = self.buckets[self.min_frequency]
+        query_index, entry = bucket.popitem(last=False)
+        del self.entries[query_index]
+        if not bucket:
+            del self.buckets[self.min_frequency]
+            self.min_frequency = min(self.buckets) if self.buckets else 0
+        return query_index, entry
+
+
+class _ShardedCache(CacheStorageInterface):
+    notifies_evictions = True
+
+    def __init__(self, capacity_bytes: int, num_shards: int = 16, ttl: Optional[float] = None):
+        if capacity_bytes <= 0 or num_shards <= 0:
+            raise ValueError("capacity_bytes and num_shards must be positive.")
+        self.capacity_bytes = capacity_bytes
+        self.ttl = ttl
+        shard_bytes = max(1, capacity_bytes // num_shards)
+        self._shards = [self._make_shard(shard_bytes) for _ in range(num_shards)]
+
+    def _make_shard(self, capacity_bytes: int) -> _Shard:
+        raise NotImplementedError
+
+    def _shard(self, query_index) -> _Shard:
+        return self._shards[hash(query_index) % len(self._shards)]
+
+    def _expires_at(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = ttl if ttl is not None else self.ttl
+        return time.monotonic() + ttl if ttl is not None else None
+
+    def set_response(self, query_index: int, response: str, ttl: Optional[float] = None):
+        """
+        :param ttl: Seconds until the entry expires, overriding the cache-wide `ttl`. None uses the default.
+        """
+        size = response_size(response)
+        expires_at = self._expires_at(ttl)
+        shard = self._shard(query_index)
+        with shard.lock:
+            shard.put(query_index, response, size, expires_at)
+            dropped = shard.drain()
+        if dropped:
+            self._notify_evicted(dropped)
+
+    def get_response(self, query_index: int) -> str:
+        shard = self._shard(query_index)
+        now = time.monotonic()
+        with shard.lock:
+            response = shard.get(query_index, now)
+            dropped = shard.drain()
+        if dropped:
+            self._notify_evicted(dropped)
+        return response
+
+    def delete_response(self, query_index: int) -> bool:
+        shard = self._shard(query_index)
+        with shard.lock:
+            present = query_index in shard.entries
+            shard.remove(query_index)
+        return present
+
+    def set_many(self, responses: dict, ttl: Optional[float] = None):
+        expires_at = self._expires_at(ttl)
+        dropped = []
+        for shard, items in self._group(responses.items(), key=lambda item: item[0]).items():
+            with shard.lock:
+                for query_index, response in items:
+                    shard.put(query_index, response, response_size(response), expires_at)
+                dropped.extend(shard.drain())
+        if dropped:
+            self._notify_evicted(dropped)
+
+    def get_many(self, query_indices: list) -> List[str]:
+        results = [None] * len(query_indices)
+        now = time.monotonic()
+        dropped = []
+        for shard, positions in self._group(range(len(query_indices)), key=lambda position: query_indices[position]).items():
+            with shard.lock:
+                for position in positions:
+                    results[position] = shard.get(query_indices[position], now)
+                dropped.extend(shard.drain())
+        if dropped:
+            self._notify_evicted(dropped)
+        return results
+
+    def _group(self, items, key) -> dict:
+        # Take each shard's lock once per batch
+        groups = {}
+        for item in items:
+            groups.setdefault(self._shard(key(item)), []).append(item)
+        return groups
+
+    # In-process operations never block for long, so the async variants run inline instead of in a thread
+
+    async def set_response_async(self, query_index: int, response: str, ttl: Optional[float] = None):
+        self.set_response(query_index, response, ttl=ttl)
+
+    async def get_response_async(self, query_index: int) -> str:
+        return self.get_response(query_index)
+
+    async def delete_response_async(self, query_index: int) -> bool:
+        return self.delete_response(query_index)
+
+    async def set_many_async(self, responses: dict, ttl: Optional[float] = None):
+        self.set_many(responses, ttl=ttl)
+
+    async def get_many_async(self, query_indices: list) -> List[str]:
+        return self.get_many(query_indices)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes of responses currently held, as charged against `capacity_bytes`."""
+        return sum(shard.bytes for shard in self._shards)
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+
+class ShardedLRUCache(_ShardedCache):
+    """
+    Thread-safe LRU cache bounded by the bytes of the stored responses.
+
+    Keys are spread over `num_shards` partitions, each with its own lock and an equal share of the capacity, so
+    concurrent requests rarely contend. A response larger than a shard's share is not cached rather than
+    flushing the shard. Entries may expire after a cache-wide `ttl` or a per-call one; expired entries are
+    dropped when they are next read or evicted. Eviction listeners are called after the shard lock is released.
+    """
+
+    def _make_shard(self, capacity_bytes: int) -> _Shard:
+        return _LRUShard(capacity_bytes)
+
+
+class ShardedLFUCache(_ShardedCache):
+    """
+    Thread-safe LFU cache bounded by the bytes of the stored responses, with the same sharding, size and TTL
+    rules as `ShardedLRUCache`. Ties between equally frequent entries go to the least recently used one.
+
+    Frequencies are halved every `decay_interval` accesses to a shard (by default ten times the shard's entry
+    count), so entries that were popular once but are no longer read do not stay cached forever. Pass
+    `decay_interval=0` to disable aging.
+    """
+
+    def __init__(self, capacity_bytes: int, num_shards: int = 16, ttl: Optional[float] = None,
+                 decay_interval: Optional[int] = None):
+        self.decay_interval = decay_interval
+        super().__init__(capacity_bytes, num_shards=num_shards, ttl=ttl)
+
+    def _make_shard(self, capacity_bytes: int) -> _Shard:
+        return _LFUShard(capacity_bytes, self.decay_interval)
@@ -0,0 +1,263 @@
+import asyncio
+import json
+import threading
+import uuid
+import warnings
+from typing import List, Optional
+from vector_cache.cache_storage.base import CacheStorageInterface
+from vector_cache.cache_storage.sharded import ShardedLRUCache
+from vector_cache.utils.metrics import Metrics, NULL_METRICS
+
+WRITE_THROUGH = "write-through"
+WRITE_AROUND = "write-around"
+
+
+class TieredStorage(CacheStorageInterface):
+    def __init__(self, remote: CacheStorageInterface, local: Optional[CacheStorageInterface] = None,
+                 local_capacity_bytes: int = 64 * 1024 * 1024, local_ttl: Optional[float] = 30.0,
+                 write_policy: str = WRITE_THROUGH, invalidation_channel: Optional[str] = None,
+                 invalidation_client=None, invalidate_on_write: bool = False, metrics: Optional[Metrics] = None):
+        """
+        Keeps the hottest responses in process (L1) in front of a shared remote storage (L2) such as `RedisStorage`
+        or `MemcacheCache`. Reads check L1 first and promote L2 hits into it.
+
+        :param remote: The shared storage holding every response.
+        :param local: The in-process tier. Defaults to a `ShardedLRUCache` of `local_capacity_bytes` whose entries
+            expire after `local_ttl` seconds, which bounds how long a worker can serve an overwritten response.
+        :param local_capacity_bytes: Capacity of the default local tier.
+        :param local_ttl: Expiry of the default local tier's entries; None keeps them until evicted.
+        :param write_policy: "write-through" writes new responses to both tiers; "write-around" writes them to the
+            remote tier only and drops any local copy, so L1 holds only responses that have been read.
+        :param invalidation_channel: Redis pub/sub channel on which deletes are announced, so that other workers
+            drop their local copies right away instead of waiting for `local_ttl`.
+        :param invalidation_client: `redis.Redis` client used for the channel. Defaults to the remote tier's
+            client when it is a `RedisStorage`.
+        :param invalidate_on_write: Announce writes on the channel as well. `VectorCache` stores every response
+            under a new key, so there is no stale copy to drop and this is off by default; turn it on when keys are
+            overwritten, e.g. for an exact-match tier.
+        :param metrics: Records "l1_hit", "l2_hit" and "tier_miss" counters.
+        """
+        if write_policy not in (WRITE_THROUGH, WRITE_AROUND):
+            raise ValueError(f"write_policy must be '{WRITE_THROUGH}' or '{WRITE_AROUND}'.")
+        self.remote = remote
+        self.local = local if local is not None else ShardedLRUCache(local_capacity_bytes, ttl=local_ttl)
+        self.write_policy = write_policy
+        self.metrics = metrics or NULL_METRICS
+        # Evictions are reported by the remote tier, which holds the authoritative copy
+        self.notifies_evictions = remote.notifies_evictions
+        self._lock = threading.Lock()
+        self._l1_hits = self._l2_hits = self._misses = self._invalidations = 0
+
+        self.invalidation_channel = invalidation_channel
+        self.invalidate_on_write = invalidate_on_write
+        self._origin = uuid.uuid4().hex
+        self._publisher = None
+        self._subscriber = None
+        if invalidation_channel is not None:
+            if invalidation_client is None:
+                invalidation_client = getattr(remote, "r", None)
+                if invalidation_client is None:
+                    raise ValueError("invalidation_client is required unless the remote tier is a RedisStorage.")
+            self._publisher = invalidation_client
+            pubsub = invalidation_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{invalidation_channel: self._on_invalidation})
+            self._subscriber = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def _count(self, l1_hits: int = 0, l2_hits: int = 0, misses: int = 0):
+        with self._lock:
+            self._l1_hits += l1_hits
+            self._l2_hits += l2_hits
+            self._misses += misses
+        if l1_hits:
+            self.metrics.increment("l1_hit", l1_hits)
+        if l2_hits:
+            self.metrics.increment("l2_hit", l2_hits)
+        if misses:
+            self.metrics.increment("tier_miss", misses)
+
+    def stats(self) -> dict:
+        """
+        Lookup counts per tier. `l1_hit_rate` is the share of all lookups answered in process, `l2_hit_rate` the
+        share of L1 misses answered by the remote tier.
+        """
+        with self._lock:
+            l1_hits, l2_hits, misses, invalidations = self._l1_hits, self._l2_hits, self._misses, self._invalidations
+        lookups = l1_hits + l2_hits + misses
+        return {
+            "lookups": lookups,
+            "l1_hits": l1_hits,
+            "l2_hits": l2_hits,
+            "misses": misses,
+            "l1_hit_rate": l1_hits / lookups if lookups else 0.0,
+            "l2_hit_rate": l2_hits / (l2_hits + misses) if l2_hits + misses else 0.0,
+            "hit_rate": (l1_hits + l2_hits) / lookups if lookups else 0.0,
+            "invalidations": invalidations,
+        }
+
+    # Invalidation
+
+    def _publish_write(self, query_indices: list):
+        if self.invalidate_on_write:
+            self._publish(query_indices)
+
+    async def _publish_write_async(self, query_indices: list):
+        if self.invalidate_on_write:
+            await self._publish_async(query_indices)
+
+    def _publish(self, query_indices: list):
+        if self._publisher is None or not query_indices:
+            return
+        try:
+            self._publisher.publish(self.invalidation_channel,
+                                    json.dumps({"origin": self._origin, "keys": list(query_indices)}))
+        except Exception as e:
+            # The write itself succeeded; other workers fall back to `local_ttl`
+            warnings.warn(f"Could not publish cache invalidation: {e}")
+
+    async def _publish_async(self, query_indices: list):
+        if self._publisher is not None and query_indices:
+            await asyncio.to_thread(self._publish, query_indices)
+
+    def _on_invalidation(self, message):
+        try:
+            data = json.loads(message['data'])
+        except (TypeError, ValueError):
+            return
+        if data.get("origin") == self._origin:
+            return
+        keys = data.get("keys", ())
+        for query_index in keys:
+            self.local.delete_response(query_index)
+        with self._lock:
+            self._invalidations += len(keys)
+
+    def _write_local(self, responses: dict):
+        if self.write_policy == WRITE_THROUGH:
+            self.local.set_many(responses)
+        else:
+            for query_index in responses:
+                self.local.delete_response(query_index)
+
+    async def _write_local_async(self, responses: dict):
+        if self.write_policy == WRITE_THROUGH:
+            await self.local.set_many_async(responses)
+        else:
+            for query_index in responses:
+                await self.local.delete_response_async(query_index)
+
+    # Storage interface
+
+    def set_response(self, query_index: int, response: str):
+        self.remote.set_response(query_index, response)
+        self._write_local({query_index: response})
+        self._publish_write([query_index])
+
+    def get_response(self, query_index: int) -> str:
+        response = self.local.get_response(query_index)
+        if response is not None:
+            self._count(l1_hits=1)
+            return response
+        response = self.remote.get_response(query_index)
+        if response is None:
+            self._count(misses=1)
+            return None
+        self._count(l2_hits=1)
+        self.local.set_response(query_index, response)
+        return response
+
+    def set_many(self, responses: dict):
+        if not responses:
+            return
+        self.remote.set_many(responses)
+        self._write_local(responses)
+        self._publish_write(list(responses))
+
+    def get_many(self, query_indices: list) -> List[str]:
+        results = self.local.get_many(query_indices)
+        missing = [position for position, response in enumerate(results) if response is None]
+        promoted = {}
+        if missing:
+            fetched = self.remote.get_many([query_indices[position] for position in missing])
+            for position, response in zip(missing, fetched):
+                if response is not None:
+                    results[position] = response
+                    promoted[query_indices[position]] = response
+            if promoted:
+                self.local.set_many(promoted)
+        self._count(l1_hits=len(query_indices) - len(missing), l2_hits=len(promoted),
+                    misses=len(missing) - len(promoted))
+        return results
+
+    def delete_response(self, query_index: int) -> bool:
+        self.local.delete_response(query_index)
+        present = self.remote.delete_response(query_index)
+        self._publish([query_index])
+        return present
+
+    def add_eviction_listener(self, listener):
+        """
+        Listen for responses the remote tier evicts or expires. Local copies of those responses are dropped before
+        the listener is called.
+        """
+        super().add_eviction_listener(listener)
+        if len(self._eviction_listeners) == 1:
+            self.remote.add_eviction_listener(self._on_remote_evicted)
+
+    def _on_remote_evicted(self, query_indices: list):
+        for query_index in query_indices:
+            self.local.delete_response(query_index)
+        self._notify_evicted(query_indices)
+
+    async def set_response_async(self, query_index: int, response: str):
+        await self.remote.set_response_async(query_index, response)
+        await self._write_local_async({query_index: response})
+        await self._publish_write_async([query_index])
+
+    async def get_response_async(self, query_index: int) -> str:
+        response = await self.local.get_response_async(query_index)
+        if response is not None:
+            self._count(l1_hits=1)
+            return response
+        response = await self.remote.get_response_async(query_index)
+        if response is None:
+            self._count(misses=1)
+            return None
+        self._count(l2_hits=1)
+        await self.local.set_response_async(query_index, response)
+        return response
+
+    async def set_many_async(self, responses: dict):
+        if not responses:
+            return
+        await self.remote.set_many_async(responses)
+        await self._write_local_async(responses)
+        await self._publish_write_async(list(responses))
+
+    async def get_many_async(self, query_indices: list) -> List[str]:
+        results = await self.local.get_many_async(query_indices)
+        missing = [position for position, response in enumerate(results) if response is None]
+        promoted = {}
+        if missing:
+            fetched = await self.remote.get_many_async([query_indices[position] for position in missing])
+            for position, response in zip(missing, fetched):
+                if response is not None:
+                    results[position] = response
+                    promoted[query_indices[position]] = response
+            if promoted:
+                await self.local.set_many_async(promoted)
+        self._count(l1_hits=len(query_indices) - len(missing), l2_hits=len(promoted),
+                    misses=len(missing) - len(promoted))
+        return results
+
+    async def delete_response_async(self, query_index: int) -> bool:
+        await self.local.delete_response_async(query_index)
+        present = await self.remote.delete_response_async(query_index)
+        await self._publish_async([query_index])
+        return present
+
+    def close(self):
+        if self._subscriber is not None:
+            self._subscriber.stop()
+            self._subscriber = None
+        if hasattr(self.remote, "close"):
+            self.remote.close()
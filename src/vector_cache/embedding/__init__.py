@@ -1,2 +1,4 @@
 from .openai import OpenAIEmbeddings
 from .sentence_bert import SentenceBertEmbeddings
+from .cached import CachedEmbeddings
+from .batching import BatchingEmbeddings
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 
 
@@ -12,6 +13,17 @@ class BaseEmbedding(ABC):
         """
         pass
 
+    async def get_embeddings_async(self, text, **kwargs):
+        """
+        Generate embeddings without blocking the event loop.
+
+        Models with a native async client override this; the default runs `get_embeddings` in a worker thread.
+
+        :param text: A string or a list of strings for which to generate embeddings.
+        :return: The generated embeddings.
+        """
+        return await asyncio.to_thread(self.get_embeddings, text, **kwargs)
+
     @property
     @abstractmethod
     def dimension(self) -> int:
@@ -0,0 +1,179 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from vector_cache.embedding.base_embedding import BaseEmbedding
+
+_STOP = object()
+
+
+def _resolve(future: Future, result=None, exception: Exception = None):
+    # A caller that gave up (e.g. a cancelled asyncio task) has already cancelled its future
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+class BatchingEmbeddings(BaseEmbedding):
+    def __init__(self, embedding_model: BaseEmbedding, max_batch_size: int = 64, max_wait_us: int = 2000,
+                 max_in_flight: int = 1):
+        """
+        Coalesce concurrent `get_embeddings` calls into batched calls on another model.
+
+        Requests from any thread or event loop are queued. A dispatcher thread takes the first waiting request,
+        collects more until `max_batch_size` texts are gathered or `max_wait_us` microseconds have passed, then runs
+        one `get_embeddings` call on the wrapped model and hands each caller its slice of the result.
+
+        :param embedding_model: The model to batch calls for.
+        :param max_batch_size: The number of texts that triggers a dispatch without waiting any longer.
+        :param max_wait_us: How long the first request of a batch may wait for others to join it.
+        :param max_in_flight: How many batches may run on the wrapped model at once. Keep 1 for a local CPU-bound
+            model; raise it for remote APIs.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be a positive integer.")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be a positive integer.")
+        self.embedding_model = embedding_model
+        self.max_batch_size = max_batch_size
+        self.max_wait_us = max_wait_us
+        self.max_in_flight = max_in_flight
+        self.batches = 0
+        self.batched_texts = 0
+        self._stats_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_in_flight, thread_name_prefix="vector-cache-embedding") if max_in_flight > 1 else None
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="vector-cache-embedding-batcher", daemon=True)
+        self._thread.start()
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.embedding_model, "model_name", type(self.embedding_model).__name__)
+
+    def _submit(self, texts: list) -> Future:
+        future = Future()
+        # Checked and enqueued together, so nothing can be queued behind the stop marker
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("BatchingEmbeddings is closed.")
+            self._queue.put((texts, future))
+        return future
+
+    def _collect(self, first) -> tuple:
+        """
+        Gather requests for one batch. Returns the batch and whether the stop marker was seen.
+        """
+        batch = [first]
+        size = len(first[0])
+        deadline = time.perf_counter() + self.max_wait_us / 1_000_000
+        while size < self.max_batch_size:
+            try:
+                timeout = deadline - time.perf_counter()
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+            size += len(item[0])
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch, stopping = self._collect(item)
+            self._in_flight.acquire()
+            if self._executor is None:
+                self._dispatch(batch)
+            else:
+                self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: list):
+        try:
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            embeddings = self.embedding_model.get_embeddings(texts)
+            if len(embeddings) != len(texts):
+                raise RuntimeError(f"Expected {len(texts)} embeddings for a batch, got {len(embeddings)}.")
+            offset = 0
+            for request_texts, future in batch:
+                _resolve(future, list(embeddings[offset:offset + len(request_texts)]))
+                offset += len(request_texts)
+            with self._stats_lock:
+                self.batches += 1
+                self.batched_texts += len(texts)
+        except Exception as e:
+            # Whatever failed, no caller may be left waiting
+            for _, future in batch:
+                _resolve(future, exception=e)
+        finally:
+            self._in_flight.release()
+
+    def get_embeddings(self, text, **kwargs):
+        """
+        Generate embeddings, batched together with other concurrent callers.
+
+        :param text: A string or a list of strings for which to generate embeddings.
+        :return: The generated embeddings.
+        """
+        if kwargs:
+            # Extra arguments would have to match across the whole batch, so such calls go straight through
+            return self.embedding_model.get_embeddings(text, **kwargs)
+        is_single = isinstance(text, str)
+        texts = [text] if is_single else list(text)
+        if not texts:
+            return []
+        results = self._submit(texts).result()
+        return results[0] if is_single else results
+
+    async def get_embeddings_async(self, text, **kwargs):
+        """
+        Async counterpart of `get_embeddings`; waits on the batch without blocking the event loop.
+        """
+        if kwargs:
+            return await self.embedding_model.get_embeddings_async(text, **kwargs)
+        is_single = isinstance(text, str)
+        texts = [text] if is_single else list(text)
+        if not texts:
+            return []
+        results = await asyncio.wrap_future(self._submit(texts))
+        return results[0] if is_single else results
+
+    @property
+    def dimension(self) -> int:
+        return self.embedding_model.dimension
+
+    def close(self):
+        """Stop the dispatcher after the requests already queued have been served."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        # Nothing should be left behind the stop marker, but never leave a caller waiting
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                _resolve(item[1], exception=RuntimeError("BatchingEmbeddings is closed."))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,164 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+def approximate_token_counter(model_name: Optional[str] = None) -> Callable[[str], int]:
+    """
+    Return a function counting the tokens of a text: exact with tiktoken when it is installed and knows the model,
+    otherwise a conservative estimate of one token per three UTF-8 bytes.
+    """
+    if tiktoken is not None and model_name is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model_name)
+            return lambda text: len(encoding.encode(text, disallowed_special=()))
+        except KeyError:
+            pass
+    return lambda text: len(text.encode("utf-8")) // 3 + 1
+
+
+def chunk_texts(texts: List[str], max_items: int, max_tokens: Optional[int] = None,
+                count_tokens: Optional[Callable[[str], int]] = None) -> List[Tuple[int, int]]:
+    """
+    Split texts into consecutive (start, stop) ranges that respect a provider's per-request item and token limits.
+    A single text over the token limit gets a range of its own.
+    """
+    chunks = []
+    start = 0
+    tokens = 0
+    for position, text in enumerate(texts):
+        text_tokens = count_tokens(text) if max_tokens is not None else 0
+        if position > start and (position - start >= max_items or (max_tokens is not None and tokens + text_tokens > max_tokens)):
+            chunks.append((start, position))
+            start = position
+            tokens = 0
+        tokens += text_tokens
+    if start < len(texts):
+        chunks.append((start, len(texts)))
+    return chunks
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc: Exception, retry_exceptions: tuple = ()) -> bool:
+    if retry_exceptions and isinstance(exc, retry_exceptions):
+        return True
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    return _status_code(exc) in RETRYABLE_STATUS_CODES
+
+
+def call_with_retries(func: Callable, *args, max_retries: int = 5, initial_backoff: float = 0.5,
+                      max_backoff: float = 30.0, retry_exceptions: tuple = ()):
+    """
+    Call `func(*args)`, retrying throttled and transient failures with exponential backoff and full jitter.
+    A Retry-After header on the error, when present, sets the minimum wait.
+    """
+    attempt = 0
+    while True:
+        try:
+            return func(*args)
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e, retry_exceptions):
+                raise
+            time.sleep(_backoff_delay(e, attempt, initial_backoff, max_backoff))
+            attempt += 1
+
+
+async def call_with_retries_async(func: Callable, *args, max_retries: int = 5, initial_backoff: float = 0.5,
+                                  max_backoff: float = 30.0, retry_exceptions: tuple = ()):
+    """
+    Async counterpart of `call_with_retries` for a coroutine function.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await func(*args)
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e, retry_exceptions):
+                raise
+            await asyncio.sleep(_backoff_delay(e, attempt, initial_backoff, max_backoff))
+            attempt += 1
+
+
+def _backoff_delay(exc: Exception, attempt: int, initial_backoff: float, max_backoff: float) -> float:
+    delay = random.uniform(0, min(max_backoff, initial_backoff * (2 ** attempt)))
+    retry_after = _retry_after(exc)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, max_backoff))
+    return delay
+
+
+def _checked(embeddings: list, start: int, stop: int) -> list:
+    if len(embeddings) != stop - start:
+        raise RuntimeError(f"Expected {stop - start} embeddings for a chunk, got {len(embeddings)}.")
+    return embeddings
+
+
+def embed_in_chunks(texts: List[str], chunks: List[Tuple[int, int]], embed_request: Callable[[List[str]], list],
+                    max_in_flight: int = 8, max_retries: int = 5, initial_backoff: float = 0.5,
+                    max_backoff: float = 30.0, retry_exceptions: tuple = ()) -> list:
+    """
+    Run `embed_request` on each chunk, up to `max_in_flight` at a time, and reassemble the results in input order.
+    """
+    results = [None] * len(texts)
+
+    def run(chunk: Tuple[int, int]):
+        start, stop = chunk
+        embeddings = call_with_retries(embed_request, texts[start:stop], max_retries=max_retries,
+                                       initial_backoff=initial_backoff, max_backoff=max_backoff,
+                                       retry_exceptions=retry_exceptions)
+        results[start:stop] = _checked(embeddings, start, stop)
+
+    if len(chunks) == 1 or max_in_flight <= 1:
+        for chunk in chunks:
+            run(chunk)
+        return results
+
+    with ThreadPoolExecutor(min(max_in_flight, len(chunks)), thread_name_prefix="vector-cache-bulk") as executor:
+        # list() re-raises the first failure
+        list(executor.map(run, chunks))
+    return results
+
+
+async def embed_in_chunks_async(texts: List[str], chunks: List[Tuple[int, int]], embed_request: Callable,
+                                max_in_flight: int = 8, max_retries: int = 5, initial_backoff: float = 0.5,
+                                max_backoff: float = 30.0, retry_exceptions: tuple = ()) -> list:
+    """
+    Async counterpart of `embed_in_chunks` for a coroutine `embed_request`, run on the caller's event loop.
+    """
+    results = [None] * len(texts)
+    in_flight = asyncio.Semaphore(max(1, max_in_flight))
+
+    async def run(chunk: Tuple[int, int]):
+        start, stop = chunk
+        async with in_flight:
+            embeddings = await call_with_retries_async(embed_request, texts[start:stop], max_retries=max_retries,
+                                                       initial_backoff=initial_backoff, max_backoff=max_backoff,
+                                                       retry_exceptions=retry_exceptions)
+        results[start:stop] = _checked(embeddings, start, stop)
+
+    await asyncio.gather(*(run(chunk) for chunk in chunks))
+    return results
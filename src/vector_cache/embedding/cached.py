@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional
+import numpy as np
+from vector_cache.embedding.base_embedding import BaseEmbedding
+
+
+class CachedEmbeddings(BaseEmbedding):
+    def __init__(self, embedding_model: BaseEmbedding, max_bytes: int = 64 * 1024 * 1024, dtype: str = "float32",
+                 disk_path: Optional[str] = None):
+        """
+        Memoize the embeddings of another model.
+
+        Entries are keyed by (model name, hash of the text) and kept in an LRU bounded by the bytes of the stored
+        arrays. With `disk_path`, every new embedding is also written to a local SQLite file, which backs the memory
+        tier and survives restarts. In a list call only the texts missing from both tiers go to the wrapped model,
+        in a single call.
+
+        :param embedding_model: The model whose embeddings are cached.
+        :param max_bytes: Upper bound on the bytes of embedding data held in memory.
+        :param dtype: "float32", or "float16" to halve the memory and disk cost at a small precision loss.
+        :param disk_path: Optional SQLite file used as a persistent second tier.
+        """
+        self.embedding_model = embedding_model
+        self.max_bytes = max_bytes
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError("dtype must be 'float32' or 'float16'.")
+        self._cache = OrderedDict()  # (model_name, digest) -> np.ndarray in self.dtype
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._disk = None
+        if disk_path is not None:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (model TEXT, digest BLOB, dtype TEXT, data BLOB, PRIMARY KEY (model, digest))"
+            )
+            self._disk.commit()
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.embedding_model, "model_name", type(self.embedding_model).__name__)
+
+    def _key(self, text: str) -> tuple:
+        return self.model_name, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def _remember(self, key: tuple, array: np.ndarray):
+        # Caller holds self._lock
+        previous = self._cache.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.nbytes
+        self._cache[key] = array
+        self._bytes += array.nbytes
+        while self._bytes > self.max_bytes and self._cache:
+            _, evicted = self._cache.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def _read_disk(self, keys: list) -> dict:
+        # Caller holds self._lock
+        found = {}
+        for model_name in {model_name for model_name, _ in keys}:
+            digests = [digest for name, digest in keys if name == model_name]
+            for start in range(0, len(digests), 500):  # Stay below SQLite's bound parameter limit
+                chunk = digests[start:start + 500]
+                rows = self._disk.execute(
+                    f"SELECT digest, dtype, data FROM embeddings WHERE model = ? AND digest IN ({','.join('?' * len(chunk))})",
+                    [model_name, *chunk]
+                ).fetchall()
+                for digest, dtype, data in rows:
+                    found[(model_name, bytes(digest))] = np.frombuffer(data, dtype=dtype).astype(self.dtype, copy=False)
+        return found
+
+    def _lookup(self, texts: list):
+        """
+        Resolve texts from memory, then disk. Returns the per-position results (None for misses) and the distinct
+        missing texts in first-seen order.
+        """
+        keys = [self._key(text) for text in texts]
+        results = [None] * len(texts)
+        with self._lock:
+            for position, key in enumerate(keys):
+                array = self._cache.get(key)
+                if array is not None:
+                    self._cache.move_to_end(key)
+                    results[position] = array
+            if self._disk is not None:
+                unresolved = list({key for key, result in zip(keys, results) if result is None})
+                if unresolved:
+                    found = self._read_disk(unresolved)
+                    for key, array in found.items():
+                        self._remember(key, array)
+                    for position, key in enumerate(keys):
+                        if results[position] is None and key in found:
+                            results[position] = found[key]
+
+            missing = list(dict.fromkeys(text for text, result in zip(texts, results) if result is None))
+            self.hits += sum(result is not None for result in results)
+            self.misses += len(missing)
+        return results, missing
+
+    def _store(self, texts: list, results: list, missing: list, embeddings) -> list:
+        arrays = {text: np.asarray(embedding).astype(self.dtype) for text, embedding in zip(missing, embeddings)}
+        with self._lock:
+            new_rows = []
+            for text, array in arrays.items():
+                key = self._key(text)
+                self._remember(key, array)
+                new_rows.append((key[0], key[1], array.dtype.str, array.tobytes()))
+            if self._disk is not None and new_rows:
+                self._disk.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", new_rows)
+                self._disk.commit()
+        for position, text in enumerate(texts):
+            if results[position] is None:
+                results[position] = arrays[text]
+        return [result.astype(np.float32, copy=False) for result in results]
+
+    def get_embeddings(self, text, **kwargs):
+        """
+        Generate embeddings, serving cached texts from memory or disk.
+
+        :param text: A string or a list of strings for which to generate embeddings.
+        :return: A float32 array for a string, or a list of float32 arrays for a list.
+        """
+        if kwargs:
+            # Extra arguments may change the output, so they bypass the cache
+            return self.embedding_model.get_embeddings(text, **kwargs)
+        is_single = isinstance(text, str)
+        texts = [text] if is_single else list(text)
+        results, missing = self._lookup(texts)
+        embeddings = self.embedding_model.get_embeddings(missing) if missing else []
+        results = self._store(texts, results, missing, embeddings)
+        return results[0] if is_single else results
+
+    async def get_embeddings_async(self, text, **kwargs):
+        """
+        Async counterpart of `get_embeddings`; misses go to the wrapped model's async path and disk reads and writes
+        run in a worker thread.
+        """
+        if kwargs:
+            return await self.embedding_model.get_embeddings_async(text, **kwargs)
+        is_single = isinstance(text, str)
+        texts = [text] if is_single else list(text)
+        # With a disk tier the lookup and write-back do SQLite I/O, which must not block the event loop
+        if self._disk is not None:
+            results, missing = await asyncio.to_thread(self._lookup, texts)
+        else:
+            results, missing = self._lookup(texts)
+        embeddings = await self.embedding_model.get_embeddings_async(missing) if missing else []
+        if self._disk is not None and missing:
+            results = await asyncio.to_thread(self._store, texts, results, missing, embeddings)
+        else:
+            results = self._store(texts, results, missing, embeddings)
+        return results[0] if is_single else results
+
+    @property
+    def dimension(self) -> int:
+        return self.embedding_model.dimension
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes of embedding data currently held in memory."""
+        return self._bytes
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
@@ -1,15 +1,28 @@
 from vector_cache.embedding.base_embedding import BaseEmbedding
+from vector_cache.embedding.bulk import chunk_texts, embed_in_chunks, embed_in_chunks_async
 import cohere
+import httpx
+
+# Bulk requests are retried by `embed_in_chunks` with its own backoff, so the client must not retry them as well
+_BULK_REQUEST_OPTIONS = {"max_retries": 0}
+
 
 class CohereEmbeddings(BaseEmbedding):
-    def __init__(self, api_key, model_name="embed-english-v3.0"):
+    # Per-request limit of the embed endpoint
+    max_items_per_request = 96
+
+    def __init__(self, api_key, model_name="embed-english-v3.0", base_url=None, max_connections: int = 64):
         """
         Initialize the Cohere Embeddings with the desired model.
 
         :param api_key: Your Cohere API key.
         :param model_name: The model to use for generating embeddings.
+        :param base_url: Optional API base URL, e.g. a proxy or a local fake server in tests.
+        :param max_connections: Size of the pooled HTTP connection pool shared by concurrent and bulk calls.
         """
-        self.client = cohere.Client(api_key)
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.client = cohere.Client(api_key, base_url=base_url, httpx_client=httpx.Client(limits=limits))
+        self.async_client = cohere.AsyncClient(api_key, base_url=base_url, httpx_client=httpx.AsyncClient(limits=limits))
         self.model_name = model_name
         self._dimension = None  # Lazy-loaded embedding dimension
 
@@ -31,16 +44,79 @@ class CohereEmbeddings(BaseEmbedding):
         :return: The generated embeddings.
         """
         if isinstance(text, str):
-            text = [text]
+            return self._embed_request([text])[0]
+        texts = list(text)
+        if len(texts) > self.max_items_per_request:
+            return self.get_embeddings_bulk(texts)
+        return self._embed_request(texts)
 
+    def _embed_request(self, texts: list, request_options: dict = None) -> list:
         response = self.client.embed(
-            texts=text,
+            texts=texts,
             model=self.model_name,
-            input_type="search_document"
+            input_type="search_document",
+            request_options=request_options
         )
+        return response.embeddings
 
-        embeddings = response.embeddings
-        return embeddings[0] if len(embeddings) == 1 else embeddings
+    def _bulk_request(self, texts: list) -> list:
+        return self._embed_request(texts, _BULK_REQUEST_OPTIONS)
+
+    async def _embed_request_async(self, texts: list, request_options: dict = None) -> list:
+        response = await self.async_client.embed(
+            texts=texts,
+            model=self.model_name,
+            input_type="search_document",
+            request_options=request_options
+        )
+        return response.embeddings
+
+    async def _bulk_request_async(self, texts: list) -> list:
+        return await self._embed_request_async(texts, _BULK_REQUEST_OPTIONS)
+
+    def get_embeddings_bulk(self, texts: list, max_in_flight: int = 8, max_retries: int = 5,
+                            initial_backoff: float = 0.5) -> list:
+        """
+        Embed a large list of texts. The list is split into requests of at most `max_items_per_request` texts,
+        which are sent concurrently over the pooled client; throttled or failed requests are retried with backoff
+        and the embeddings are returned in input order.
+
+        :param texts: The texts to embed.
+        :param max_in_flight: The number of requests in flight at once.
+        :param max_retries: Retries per request for rate limits, 5xx responses and connection errors.
+        :param initial_backoff: The first retry delay in seconds; it doubles on each retry.
+        :return: A list with one embedding per input text.
+        """
+        texts = list(texts)
+        chunks = chunk_texts(texts, self.max_items_per_request)
+        return embed_in_chunks(texts, chunks, self._bulk_request, max_in_flight=max_in_flight,
+                               max_retries=max_retries, initial_backoff=initial_backoff,
+                               retry_exceptions=(httpx.TransportError,))
+
+    async def get_embeddings_bulk_async(self, texts: list, max_in_flight: int = 8, max_retries: int = 5,
+                                        initial_backoff: float = 0.5) -> list:
+        """
+        Async counterpart of `get_embeddings_bulk`; the requests run concurrently on the event loop.
+        """
+        texts = list(texts)
+        chunks = chunk_texts(texts, self.max_items_per_request)
+        return await embed_in_chunks_async(texts, chunks, self._bulk_request_async, max_in_flight=max_in_flight,
+                                           max_retries=max_retries, initial_backoff=initial_backoff,
+                                           retry_exceptions=(httpx.TransportError,))
+
+    async def get_embeddings_async(self, text, **kwargs):
+        """
+        Generate embeddings for a given text using Cohere's async client, without blocking the event loop.
+
+        :param text: A string or a list of strings for which to generate embeddings.
+        :return: The generated embeddings.
+        """
+        if isinstance(text, str):
+            return (await self._embed_request_async([text]))[0]
+        texts = list(text)
+        if len(texts) > self.max_items_per_request:
+            return await self.get_embeddings_bulk_async(texts)
+        return await self._embed_request_async(texts)
 
     @property
     def dimension(self):
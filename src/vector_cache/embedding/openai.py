@@ -1,17 +1,31 @@
 from vector_cache.embedding.base_embedding import BaseEmbedding
+from vector_cache.embedding.bulk import approximate_token_counter, chunk_texts, embed_in_chunks, embed_in_chunks_async
+import httpx
 import openai
 from openai.types import CreateEmbeddingResponse, Embedding
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
 class OpenAIEmbeddings(BaseEmbedding):
-    def __init__(self, api_key, model_name="text-embedding-ada-002"):
+    # Per-request limits of the embeddings endpoint
+    max_items_per_request = 2048
+    max_tokens_per_request = 300_000
+
+    def __init__(self, api_key, model_name="text-embedding-ada-002", base_url=None, max_connections: int = 64):
         """
         Initialize the OpenAI Embeddings with the desired model.
 
         :param api_key: Your OpenAI API key.
         :param model_name: The model to use for generating embeddings.
+        :param base_url: Optional API base URL, e.g. a proxy or a local fake server in tests.
+        :param max_connections: Size of the pooled HTTP connection pool shared by concurrent and bulk calls.
         """
-        self.client = OpenAI(api_key=api_key)
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.client = OpenAI(api_key=api_key, base_url=base_url, http_client=httpx.Client(limits=limits))
+        self.async_client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=httpx.AsyncClient(limits=limits))
+        # Bulk requests are retried by `embed_in_chunks` with its own backoff, so their clients must not retry as
+        # well; these copies share the connection pools above
+        self._bulk_client = self.client.with_options(max_retries=0)
+        self._bulk_async_client = self.async_client.with_options(max_retries=0)
         self.model_name = model_name
         self._dimension = None  # Lazy-loaded vector_cache.embedding dimension
 
@@ -29,12 +43,79 @@ class OpenAIEmbeddings(BaseEmbedding):
         :param text: A string or a list of strings for which to generate embeddings.
         :return: The generated embeddings.
         """
-        text = text.replace("\n", " ")
-        response = self.client.embeddings.create(input = [text], model=self.model_name)
-        if isinstance(text, list):
-            return [item.embedding for item in response.data]
-        else:
-            return response.data[0].embedding
+        if isinstance(text, str):
+            return self._embed_request([text])[0]
+        texts = list(text)
+        if len(texts) > self.max_items_per_request:
+            return self.get_embeddings_bulk(texts)
+        return self._embed_request(texts)
+
+    def _embed_request(self, texts: list, client: OpenAI = None) -> list:
+        texts = [item.replace("\n", " ") for item in texts]
+        response = (client or self.client).embeddings.create(input=texts, model=self.model_name)
+        return self._embeddings_of(response)
+
+    def _bulk_request(self, texts: list) -> list:
+        return self._embed_request(texts, self._bulk_client)
+
+    async def _embed_request_async(self, texts: list, client: AsyncOpenAI = None) -> list:
+        texts = [item.replace("\n", " ") for item in texts]
+        response = await (client or self.async_client).embeddings.create(input=texts, model=self.model_name)
+        return self._embeddings_of(response)
+
+    async def _bulk_request_async(self, texts: list) -> list:
+        return await self._embed_request_async(texts, self._bulk_async_client)
+
+    @staticmethod
+    def _embeddings_of(response: CreateEmbeddingResponse) -> list:
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    def _chunks(self, texts: list) -> list:
+        return chunk_texts(texts, self.max_items_per_request, self.max_tokens_per_request,
+                           approximate_token_counter(self.model_name))
+
+    def get_embeddings_bulk(self, texts: list, max_in_flight: int = 8, max_retries: int = 5,
+                            initial_backoff: float = 0.5) -> list:
+        """
+        Embed a large list of texts. The list is split by the endpoint's item and token limits, chunks are sent
+        concurrently over the pooled client, throttled or failed chunks are retried with backoff, and the
+        embeddings are returned in input order.
+
+        :param texts: The texts to embed.
+        :param max_in_flight: The number of chunk requests in flight at once.
+        :param max_retries: Retries per chunk for rate limits, 5xx responses and connection errors.
+        :param initial_backoff: The first retry delay in seconds; it doubles on each retry.
+        :return: A list with one embedding per input text.
+        """
+        texts = list(texts)
+        return embed_in_chunks(texts, self._chunks(texts), self._bulk_request, max_in_flight=max_in_flight,
+                               max_retries=max_retries, initial_backoff=initial_backoff,
+                               retry_exceptions=(openai.APIConnectionError, openai.RateLimitError))
+
+    async def get_embeddings_bulk_async(self, texts: list, max_in_flight: int = 8, max_retries: int = 5,
+                                        initial_backoff: float = 0.5) -> list:
+        """
+        Async counterpart of `get_embeddings_bulk`; the chunk requests run concurrently on the event loop.
+        """
+        texts = list(texts)
+        return await embed_in_chunks_async(texts, self._chunks(texts), self._bulk_request_async,
+                                           max_in_flight=max_in_flight, max_retries=max_retries,
+                                           initial_backoff=initial_backoff,
+                                           retry_exceptions=(openai.APIConnectionError, openai.RateLimitError))
+
+    async def get_embeddings_async(self, text, **kwargs):
+        """
+        Generate embeddings for a given text using OpenAI's async client, without blocking the event loop.
+
+        :param text: A string or a list of strings for which to generate embeddings.
+        :return: The generated embeddings.
+        """
+        if isinstance(text, str):
+            return (await self._embed_request_async([text]))[0]
+        texts = list(text)
+        if len(texts) > self.max_items_per_request:
+            return await self.get_embeddings_bulk_async(texts)
+        return await self._embed_request_async(texts)
 
 
     def get_embedding_dimension(self):
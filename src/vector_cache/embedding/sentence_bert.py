@@ -1,16 +1,47 @@
 from vector_cache.embedding.base_embedding import BaseEmbedding
+from vector_cache.embedding.sentence_bert_pool import SentenceBertPool
 from sentence_transformers import SentenceTransformer
 
 
 class SentenceBertEmbeddings(BaseEmbedding):
-    def __init__(self, model_name='sentence-transformers/all-MiniLM-L6-v2'):
-        self.model = SentenceTransformer(model_name)
+    def __init__(self, model_name='sentence-transformers/all-MiniLM-L6-v2', num_workers: int = 0,
+                 torch_threads: int = 1, chunk_size: int = 64):
+        """
+        :param model_name: The sentence-transformers model to load.
+        :param num_workers: When greater than 0, encode in a pool of this many worker processes instead of the
+            calling process, so CPU-bound encoding is not limited by the GIL. See `SentenceBertPool`.
+        :param torch_threads: torch threads per worker process (pool mode only).
+        :param chunk_size: The number of length-sorted texts sent to a worker per task (pool mode only).
+        """
+        self.pool = None
+        if num_workers > 0:
+            self.model = None
+            self.pool = SentenceBertPool(model_name, num_workers, torch_threads=torch_threads, chunk_size=chunk_size)
+        else:
+            self.model = SentenceTransformer(model_name)
         self.model_name = model_name
         self._dimension = None
         self.model_to_dimension_mapping = {"sentence-transformers/all-MiniLM-L6-v2": 384}
     
-    def get_embeddings(self, text):
-        return self.model.encode([text])[0]
+    def get_embeddings(self, text, **kwargs):
+        """
+        Generate embeddings for a given text.
+
+        :param text: A string or a list of strings for which to generate embeddings.
+        :return: A single embedding for a string, or a 2D array with one row per input text for a list.
+        """
+        if self.pool is not None:
+            if isinstance(text, str):
+                return self.pool.encode([text])[0]
+            return self.pool.encode(list(text))
+        if isinstance(text, str):
+            return self.model.encode([text], **kwargs)[0]
+        return self.model.encode(list(text), **kwargs)
+
+    def close(self):
+        """Shut down the worker processes, if any."""
+        if self.pool is not None:
+            self.pool.close()
 
     @property
     def dimension(self):
@@ -0,0 +1,120 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+
+# Per-worker state, set up once by _init_worker
+_model = None
+
+
+def _init_worker(model_name: str, torch_threads: int):
+    global _model
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(torch_threads)
+    _model = SentenceTransformer(model_name)
+
+
+def _worker_dimension() -> int:
+    return _model.get_sentence_embedding_dimension()
+
+
+def _encode_chunk(text_name: str, index_name: str, output_name: str, count: int, dimension: int, start: int,
+                  stop: int, batch_size: int) -> int:
+    # Workers share the parent's resource tracker, and the parent unlinks every block once the call is done
+    text_block = shared_memory.SharedMemory(name=text_name)
+    index_block = shared_memory.SharedMemory(name=index_name)
+    output_block = shared_memory.SharedMemory(name=output_name)
+    try:
+        index = np.ndarray((2 * count + 1,), dtype=np.int64, buffer=index_block.buf)
+        offsets, order = index[:count + 1], index[count + 1:]
+        positions = order[start:stop].copy()
+        texts = [bytes(text_block.buf[offsets[p]:offsets[p + 1]]).decode("utf-8") for p in positions]
+        embeddings = _model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        output = np.ndarray((count, dimension), dtype=np.float32, buffer=output_block.buf)
+        output[positions] = embeddings
+        del index, offsets, order, output  # Release the buffer views before closing the blocks
+        return stop - start
+    finally:
+        text_block.close()
+        index_block.close()
+        output_block.close()
+
+
+class SentenceBertPool:
+    def __init__(self, model_name: str, num_workers: int, torch_threads: int = 1, chunk_size: int = 64,
+                 batch_size: int = 32, start_method: str = "spawn"):
+        """
+        A pool of worker processes, each holding its own copy of a SentenceTransformer model.
+
+        Texts are sorted by length and cut into chunks of similar length, so padding inside a batch stays small.
+        Input texts and output embeddings travel through shared memory; only block names and offsets are pickled.
+
+        :param model_name: The sentence-transformers model each worker loads once at start-up.
+        :param num_workers: The number of worker processes.
+        :param torch_threads: torch intra-op threads per worker. Keep num_workers * torch_threads <= cores.
+        :param chunk_size: The number of texts sent to a worker per task.
+        :param batch_size: The batch size used by `SentenceTransformer.encode` inside a worker.
+        :param start_method: The multiprocessing start method. "spawn" avoids forking a process that has torch
+            loaded; callers then need an `if __name__ == "__main__":` guard.
+        """
+        if num_workers < 1:
+            raise ValueError("num_workers must be a positive integer.")
+        self.model_name = model_name
+        self.num_workers = num_workers
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        context = multiprocessing.get_context(start_method)
+        self._pool = context.Pool(num_workers, initializer=_init_worker, initargs=(model_name, torch_threads))
+        self._dimension = None
+
+    @property
+    def dimension(self) -> int:
+        if self._dimension is None:
+            self._dimension = self._pool.apply(_worker_dimension)
+        return self._dimension
+
+    def encode(self, texts: list) -> np.ndarray:
+        """
+        Encode texts across the workers.
+
+        :return: A float32 array with one row per input text, in input order.
+        """
+        count = len(texts)
+        dimension = self.dimension
+        if count == 0:
+            return np.zeros((0, dimension), dtype=np.float32)
+
+        encoded = [text.encode("utf-8") for text in texts]
+        lengths = np.fromiter((len(item) for item in encoded), dtype=np.int64, count=count)
+        text_block = shared_memory.SharedMemory(create=True, size=max(1, int(lengths.sum())))
+        index_block = shared_memory.SharedMemory(create=True, size=(2 * count + 1) * 8)
+        output_block = shared_memory.SharedMemory(create=True, size=count * dimension * 4)
+        try:
+            index = np.ndarray((2 * count + 1,), dtype=np.int64, buffer=index_block.buf)
+            index[0] = 0
+            np.cumsum(lengths, out=index[1:count + 1])
+            index[count + 1:] = np.argsort(lengths, kind="stable")
+            text_block.buf[:int(lengths.sum())] = b"".join(encoded)
+            del index
+
+            tasks = [
+                self._pool.apply_async(_encode_chunk, (text_block.name, index_block.name, output_block.name, count,
+                                                       dimension, start, min(start + self.chunk_size, count),
+                                                       self.batch_size))
+                for start in range(0, count, self.chunk_size)
+            ]
+            for task in tasks:
+                task.get()
+            output = np.ndarray((count, dimension), dtype=np.float32, buffer=output_block.buf)
+            result = output.copy()
+            del output
+            return result
+        finally:
+            for block in (text_block, index_block, output_block):
+                block.close()
+                block.unlink()
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
@@ -1,50 +1,456 @@
-from vector_cache.utils.time_utils import time_measurement
+import asyncio
+import inspect
+import queue
+import threading
+import warnings
+import weakref
+from functools import wraps
+from typing import Optional
+from vector_cache.utils.key_util import get_exact_match_key
+from vector_cache.utils.metrics import Metrics, NULL_METRICS
 from vector_cache.cache_storage.base import CacheStorageInterface
 from vector_cache.vector_stores.base import VectorStoreInterface
 from vector_cache.embedding.base_embedding import BaseEmbedding
 
 
+_STOP = object()
+
+
 class VectorCache:
     def __init__(self, embedding_model: BaseEmbedding, db: CacheStorageInterface, vector_store: VectorStoreInterface,
-                 cosine_threshold, verbose=False):
+                 cosine_threshold, verbose=False, exact_match_storage: Optional[CacheStorageInterface] = None,
+                 metrics: Optional[Metrics] = None, colocate_responses: bool = False,
+                 search_candidates: int = 3, evict_vectors: Optional[bool] = None, eviction_batch_size: int = 512):
+        """
+        :param exact_match_storage: Optional storage for an exact-match tier in front of the semantic lookup. It is
+            keyed by a hash of the query with whitespace collapsed and case ignored, so a repeated query is answered
+            without calling the embedding model or the vector store. Every insert populates it.
+        :param metrics: Optional `Metrics` receiving per-stage latencies, lookup outcomes and nearest distances,
+            e.g. `Metrics([InMemorySink()])`. Without it instrumentation is a no-op.
+        :param colocate_responses: Store each response with its vector as a payload and read it back from the search
+            call, skipping the separate storage lookup. Off by default: the payloads are not bounded by `db`'s
+            capacity, are not encoded by its codec and keep answering after `db` evicts the response, so only use it
+            with `str` responses and a vector store sized for them. Responses are still written to `db`, which
+            serves results that come back without a payload.
+        :param search_candidates: Number of nearest neighbours fetched per lookup. Candidates within the threshold
+            whose response is gone are skipped in favour of the next one, so a dead neighbour does not hide a
+            slightly farther live one.
+        :param evict_vectors: Delete a vector from the vector store when `db` evicts or expires its response, so
+            the index follows the live set. Defaults to on when `db` reports evictions, the vector store supports
+            deletes, and responses are not co-located (a co-located payload keeps serving hits after `db` drops its copy).
+            The deletes run in a background thread, so the write that caused an eviction does not wait for them; until
+            then the vector is skipped as a dead candidate.
+        :param eviction_batch_size: Most evicted vectors deleted per `delete_many` call of the background thread.
+        """
         self.embedding_model = embedding_model
         self.db = db
         self.vector_store = vector_store
         self.cosine_threshold = cosine_threshold
         self.verbose = verbose
+        self.exact_match_storage = exact_match_storage
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        if colocate_responses and not vector_store.supports_payload:
+            raise ValueError(f"{type(vector_store).__name__} does not support payloads.")
+        self.colocate_responses = colocate_responses
+        if search_candidates < 1:
+            raise ValueError("search_candidates must be a positive integer.")
+        self.search_candidates = search_candidates
+        if evict_vectors is None:
+            evict_vectors = db.notifies_evictions and vector_store.supports_delete and not colocate_responses
+        elif evict_vectors and not db.notifies_evictions:
+            raise ValueError(f"{type(db).__name__} does not report evictions.")
+        elif evict_vectors and not vector_store.supports_delete:
+            raise ValueError(f"{type(vector_store).__name__} does not support deletes.")
+        self.evict_vectors = evict_vectors
+        self.eviction_batch_size = max(1, eviction_batch_size)
+        self._evicted = queue.Queue()
+        self._eviction_thread = None
+        self._eviction_lock = threading.Lock()
+        if evict_vectors:
+            db.add_eviction_listener(self._queue_evicted_vectors)
+
+    def _queue_evicted_vectors(self, query_indices: list):
+        # Called inside the storage write that evicted; the vector store round-trip happens in the background
+        self._evicted.put(list(query_indices))
+        if self._eviction_thread is None:
+            with self._eviction_lock:
+                if self._eviction_thread is None:
+                    self._eviction_thread = threading.Thread(target=self._run_evictions, daemon=True,
+                                                             name="vector-cache-evictions")
+                    self._eviction_thread.start()
+
+    def _run_evictions(self):
+        while True:
+            item = self._evicted.get()
+            if item is _STOP:
+                self._evicted.task_done()
+                return
+            batch, taken, stopping = list(item), 1, False
+            while len(batch) < self.eviction_batch_size:
+                try:
+                    item = self._evicted.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.extend(item)
+            try:
+                self._delete_evicted_vectors(batch)
+            except Exception as e:
+                # The vectors stay behind as dead candidates, which lookups skip
+                warnings.warn(f"Could not delete evicted vectors: {e}")
+            finally:
+                for _ in range(taken):
+                    self._evicted.task_done()
+            if stopping:
+                return
+
+    def _delete_evicted_vectors(self, query_indices: list):
+        deleted = self.vector_store.delete_many(query_indices)
+        self.metrics.increment("vector_evicted", deleted)
+
+    def flush_evictions(self):
+        """
+        Wait until the vectors of every response evicted so far have been deleted from the vector store.
+        """
+        self._evicted.join()
+
+    def close(self):
+        """
+        Delete the vectors still queued for eviction and stop the background thread. The storages and the vector
+        store are left open.
+        """
+        with self._eviction_lock:
+            if self._eviction_thread is not None:
+                self._evicted.put(_STOP)
+                self._eviction_thread.join()
+                self._eviction_thread = None
+
+    def _payload_kwargs(self, response) -> dict:
+        return {"payload": response} if self.colocate_responses else {}
+
+    def _payloads_kwargs(self, responses: list) -> dict:
+        return {"payloads": list(responses)} if self.colocate_responses else {}
 
-    @time_measurement
     def add_query_to_index(self, query: str, response: str):
-        embedding = self.embedding_model.get_embeddings(query)
-        cache_key = self.vector_store.add(embedding)
-        self.db.set_response(cache_key, response)
+        metrics = self.metrics
+        with metrics.stage("embed"):
+            embedding = self.embedding_model.get_embeddings(query)
+        with metrics.stage("insert"):
+            cache_key = self.vector_store.add(embedding, **self._payload_kwargs(response))
+            self.db.set_response(cache_key, response)
+            if self.exact_match_storage is not None:
+                self.exact_match_storage.set_response(get_exact_match_key(query), response)
 
-    @time_measurement
     async def add_query_to_index_async(self, query: str, response: str):
-        embedding = self.embedding_model.get_embeddings(query)
-        query_index = self.vector_store.index.get_n_items()
-        self.vector_store.add(embedding, query_index)
-        self.db.set_response(query_index, response)
-
-    @time_measurement
-    def find_similar_queries(self, query: str, search_k: int = 1, include_distances=True):
-        embedding = self.embedding_model.get_embeddings(query)
-        nearest_indices, distances = self.vector_store.search(embedding, search_k, include_distances)
-        if nearest_indices:
-            nearest_index = nearest_indices[0]
-            distance = distances[0]
-            if distance < self.cosine_threshold:  # similarity threshold
-                cached_response = self.db.get_response(nearest_index)
-                return cached_response, distance
-        return None, None
-
-
-def semantic_cache_decorator(semantic_cache: VectorCache):
+        metrics = self.metrics
+        embedding = await self._embed_async(query)
+        with metrics.stage("insert"):
+            cache_key = await self.vector_store.add_async(embedding, **self._payload_kwargs(response))
+            # The response and exact-match writes are independent of each other
+            writes = [self.db.set_response_async(cache_key, response)]
+            if self.exact_match_storage is not None:
+                writes.append(self.exact_match_storage.set_response_async(get_exact_match_key(query), response))
+            await asyncio.gather(*writes)
+
+    def find_similar_queries(self, query: str, search_k: Optional[int] = None, include_distances=True):
+        metrics = self.metrics
+        if self.exact_match_storage is not None:
+            with metrics.stage("exact_match"):
+                cached_response = self.exact_match_storage.get_response(get_exact_match_key(query))
+            if cached_response is not None:
+                metrics.increment("exact_hit")
+                return cached_response, 0.0
+        search_k = search_k or self.search_candidates
+        with metrics.stage("embed"):
+            embedding = self.embedding_model.get_embeddings(query)
+        with metrics.stage("vector_search"):
+            if self.colocate_responses:
+                nearest_indices, distances, payloads = self.vector_store.search_with_payload(embedding, search_k)
+            else:
+                nearest_indices, distances = self.vector_store.search(embedding, search_k, include_distances)
+                payloads = None
+        cached_response, distance = None, None
+        for nearest_index, candidate_distance, payload in self._candidates(nearest_indices, distances, payloads):
+            if payload is None:
+                with metrics.stage("response_fetch"):
+                    payload = self.db.get_response(nearest_index)
+            if payload is not None:
+                cached_response, distance = payload, candidate_distance
+                break
+            # The response was evicted; try the next neighbour
+            metrics.increment("dead_candidate")
+        self._record_lookup(distances[0] if nearest_indices else None, cached_response)
+        return cached_response, distance
+
+    async def find_similar_queries_async(self, query: str, search_k: Optional[int] = None, include_distances=True):
+        metrics = self.metrics
+        if self.exact_match_storage is not None:
+            with metrics.stage("exact_match"):
+                cached_response = await self.exact_match_storage.get_response_async(get_exact_match_key(query))
+            if cached_response is not None:
+                metrics.increment("exact_hit")
+                return cached_response, 0.0
+        search_k = search_k or self.search_candidates
+        embedding = await self._embed_async(query)
+        with metrics.stage("vector_search"):
+            if self.colocate_responses:
+                nearest_indices, distances, payloads = await self.vector_store.search_with_payload_async(embedding, search_k)
+            else:
+                nearest_indices, distances = await self.vector_store.search_async(embedding, search_k, include_distances)
+                payloads = None
+        cached_response, distance = None, None
+        for nearest_index, candidate_distance, payload in self._candidates(nearest_indices, distances, payloads):
+            if payload is None:
+                with metrics.stage("response_fetch"):
+                    payload = await self.db.get_response_async(nearest_index)
+            if payload is not None:
+                cached_response, distance = payload, candidate_distance
+                break
+            # The response was evicted; try the next neighbour
+            metrics.increment("dead_candidate")
+        self._record_lookup(distances[0] if nearest_indices else None, cached_response)
+        return cached_response, distance
+
+    def add_queries_batch(self, queries: list, responses: list) -> list:
+        """
+        Index several query/response pairs with one embedding call and one bulk insert into the vector store and
+        the storage. Returns the cache keys, aligned with the inputs.
+        """
+        if len(queries) != len(responses):
+            raise ValueError("queries and responses must have the same length.")
+        if not queries:
+            return []
+        metrics = self.metrics
+        with metrics.stage("embed"):
+            embeddings = self.embedding_model.get_embeddings(list(queries))
+        with metrics.stage("insert"):
+            cache_keys = self.vector_store.add_many(embeddings, **self._payloads_kwargs(responses))
+            self.db.set_many(dict(zip(cache_keys, responses)))
+            if self.exact_match_storage is not None:
+                self.exact_match_storage.set_many(self._exact_match_items(queries, responses))
+        return cache_keys
+
+    async def add_queries_batch_async(self, queries: list, responses: list) -> list:
+        """
+        Async counterpart of `add_queries_batch`.
+        """
+        if len(queries) != len(responses):
+            raise ValueError("queries and responses must have the same length.")
+        if not queries:
+            return []
+        metrics = self.metrics
+        embeddings = await self._embed_async(list(queries))
+        with metrics.stage("insert"):
+            cache_keys = await self.vector_store.add_many_async(embeddings, **self._payloads_kwargs(responses))
+            writes = [self.db.set_many_async(dict(zip(cache_keys, responses)))]
+            if self.exact_match_storage is not None:
+                writes.append(self.exact_match_storage.set_many_async(self._exact_match_items(queries, responses)))
+            await asyncio.gather(*writes)
+        return cache_keys
+
+    def find_similar_queries_batch(self, queries: list, search_k: Optional[int] = None) -> list:
+        """
+        Look up several queries with one embedding call, one multi-query search and one bulk storage read, plus one
+        more read per round of evicted neighbours that have to be skipped.
+        Returns a (cached_response, distance) tuple per query, aligned with the inputs; misses are (None, None).
+        """
+        metrics = self.metrics
+        results = [(None, None)] * len(queries)
+        if self.exact_match_storage is not None:
+            with metrics.stage("exact_match"):
+                exact_responses = self.exact_match_storage.get_many([get_exact_match_key(query) for query in queries])
+            results = self._merge_exact_matches(exact_responses)
+        pending = [position for position, (cached_response, _) in enumerate(results) if cached_response is None]
+        if len(pending) < len(queries):
+            metrics.increment("exact_hit", len(queries) - len(pending))
+        if not pending:
+            return results
+
+        search_k = search_k or self.search_candidates
+        with metrics.stage("embed"):
+            embeddings = self.embedding_model.get_embeddings([queries[position] for position in pending])
+        with metrics.stage("vector_search"):
+            if self.colocate_responses:
+                search_results = self.vector_store.search_many_with_payload(embeddings, search_k)
+            else:
+                search_results = self.vector_store.search_many(embeddings, search_k, True)
+        candidates = self._batch_candidates(pending, search_results)
+        to_fetch = self._resolve_payloads(candidates, results, candidates)
+        # Each round reads the current candidate of every unresolved query; dead ones move on to the next
+        while to_fetch:
+            with metrics.stage("response_fetch"):
+                cached_responses = self.db.get_many([candidates[position][0][0] for position in to_fetch])
+            to_fetch = self._merge_fetched(candidates, results, to_fetch, cached_responses)
+        self._record_batch_lookups(pending, search_results, results)
+        return results
+
+    async def find_similar_queries_batch_async(self, queries: list, search_k: Optional[int] = None) -> list:
+        """
+        Async counterpart of `find_similar_queries_batch`.
+        """
+        metrics = self.metrics
+        results = [(None, None)] * len(queries)
+        if self.exact_match_storage is not None:
+            with metrics.stage("exact_match"):
+                exact_responses = await self.exact_match_storage.get_many_async([get_exact_match_key(query) for query in queries])
+            results = self._merge_exact_matches(exact_responses)
+        pending = [position for position, (cached_response, _) in enumerate(results) if cached_response is None]
+        if len(pending) < len(queries):
+            metrics.increment("exact_hit", len(queries) - len(pending))
+        if not pending:
+            return results
+
+        search_k = search_k or self.search_candidates
+        embeddings = await self._embed_async([queries[position] for position in pending])
+        with metrics.stage("vector_search"):
+            if self.colocate_responses:
+                search_results = await self.vector_store.search_many_with_payload_async(embeddings, search_k)
+            else:
+                search_results = await self.vector_store.search_many_async(embeddings, search_k, True)
+        candidates = self._batch_candidates(pending, search_results)
+        to_fetch = self._resolve_payloads(candidates, results, candidates)
+        # Each round reads the current candidate of every unresolved query; dead ones move on to the next
+        while to_fetch:
+            with metrics.stage("response_fetch"):
+                cached_responses = await self.db.get_many_async([candidates[position][0][0] for position in to_fetch])
+            to_fetch = self._merge_fetched(candidates, results, to_fetch, cached_responses)
+        self._record_batch_lookups(pending, search_results, results)
+        return results
+
+    async def _embed_async(self, text):
+        with self.metrics.stage("embed"):
+            return await self.embedding_model.get_embeddings_async(text)
+
+    @staticmethod
+    def _exact_match_items(queries: list, responses: list) -> dict:
+        return {get_exact_match_key(query): response for query, response in zip(queries, responses)}
+
+    @staticmethod
+    def _merge_exact_matches(exact_responses: list) -> list:
+        return [(response, 0.0) if response is not None else (None, None) for response in exact_responses]
+
+    def _candidates(self, nearest_indices: list, distances: list, payloads: Optional[list]) -> list:
+        # (nearest_index, distance, payload) for the neighbours within the threshold, nearest first
+        candidates = []
+        for position, (nearest_index, distance) in enumerate(zip(nearest_indices, distances)):
+            if distance >= self.cosine_threshold:  # similarity threshold
+                break
+            candidates.append((nearest_index, distance, payloads[position] if payloads else None))
+        return candidates
+
+    def _batch_candidates(self, positions: list, search_results: list) -> dict:
+        candidates = {}  # position in the batch -> candidates still to try, nearest first
+        for position, result in zip(positions, search_results):
+            position_candidates = self._candidates(result[0], result[1], result[2] if len(result) > 2 else None)
+            if position_candidates:
+                candidates[position] = position_candidates
+        return candidates
+
+    @staticmethod
+    def _resolve_payloads(candidates: dict, results: list, positions) -> list:
+        """
+        Answer the given positions whose current candidate carries a payload, and return those that need a
+        storage read.
+        """
+        to_fetch = []
+        for position in positions:
+            position_candidates = candidates[position]
+            if not position_candidates:
+                continue
+            _, distance, payload = position_candidates[0]
+            if payload is not None:
+                results[position] = (payload, distance)
+            else:
+                to_fetch.append(position)
+        return to_fetch
+
+    def _merge_fetched(self, candidates: dict, results: list, fetched_positions: list, cached_responses: list) -> list:
+        dead = []
+        for position, cached_response in zip(fetched_positions, cached_responses):
+            if cached_response is not None:
+                results[position] = (cached_response, candidates[position][0][1])
+            else:
+                candidates[position].pop(0)
+                dead.append(position)
+        if dead:
+            self.metrics.increment("dead_candidate", len(dead))
+        return self._resolve_payloads(candidates, results, dead)
+
+    def _record_lookup(self, distance, cached_response):
+        metrics = self.metrics
+        if not metrics.enabled:
+            return
+        if distance is not None:
+            metrics.observe_distance(float(distance))
+        if distance is None or distance >= self.cosine_threshold:
+            metrics.increment("miss")
+        elif cached_response is None:
+            metrics.increment("near_miss")
+        else:
+            metrics.increment("hit")
+
+    def _record_batch_lookups(self, positions: list, search_results: list, results: list):
+        if not self.metrics.enabled:
+            return
+        for position, result in zip(positions, search_results):
+            nearest_indices, distances = result[0], result[1]
+            distance = distances[0] if nearest_indices else None
+            self._record_lookup(distance, results[position][0])
+
+
+def semantic_cache_decorator(semantic_cache: VectorCache, max_concurrent_inserts: Optional[int] = None):
+    """
+    Cache the results of `func(query, ...)` in `semantic_cache`.
+
+    Works with both plain and `async def` functions; coroutine functions use the non-blocking lookup and insert
+    paths. `max_concurrent_inserts` caps how many cache inserts may run at once across all calls of the decorated
+    function, so a burst of misses cannot flood the vector store.
+    """
     def print_log(log):
         if semantic_cache.verbose:
             print(log)
 
+    if max_concurrent_inserts is not None and max_concurrent_inserts < 1:
+        raise ValueError("max_concurrent_inserts must be a positive integer.")
+
+    thread_semaphore = threading.BoundedSemaphore(max_concurrent_inserts) if max_concurrent_inserts else None
+    # asyncio semaphores belong to one event loop, so keep one per running loop
+    loop_semaphores = weakref.WeakKeyDictionary()
+
+    def get_loop_semaphore() -> Optional[asyncio.Semaphore]:
+        if not max_concurrent_inserts:
+            return None
+        loop = asyncio.get_running_loop()
+        semaphore = loop_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = loop_semaphores[loop] = asyncio.Semaphore(max_concurrent_inserts)
+        return semaphore
+
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(query, *args, **kwargs):
+                # Try to find a cached response without blocking the event loop
+                cached_response, distance = await semantic_cache.find_similar_queries_async(query)
+                if cached_response is not None:
+                    print_log(f"Cache Hit: Query: {query}, response: {cached_response} (distance: {distance})")
+                    return cached_response
+                print_log(f"Cache Miss: {query}")
+                response = await func(query, *args, **kwargs)
+
+                semaphore = get_loop_semaphore()
+                if semaphore is None:
+                    await semantic_cache.add_query_to_index_async(query, response)
+                else:
+                    async with semaphore:
+                        await semantic_cache.add_query_to_index_async(query, response)
+                return response
+            return async_wrapper
+
+        @wraps(func)
         def wrapper(query, *args, **kwargs):
             # Try to find a cached response
             cached_response, distance = semantic_cache.find_similar_queries(query)
@@ -57,7 +463,11 @@ def semantic_cache_decorator(semantic_cache: VectorCache):
             response = func(query, *args, **kwargs)
 
             # Add the query-response pair to the cache
-            semantic_cache.add_query_to_index(query, response)
+            if thread_semaphore is None:
+                semantic_cache.add_query_to_index(query, response)
+            else:
+                with thread_semaphore:
+                    semantic_cache.add_query_to_index(query, response)
 
             # Return the actual function's response
             return response
@@ -1,3 +1,4 @@
+import hashlib
 from typing import Union, Callable
 import uuid
 
@@ -10,3 +11,17 @@ def get_query_index(identifier: Union[str, Callable, None] = None):
     else:
         vector_id = str(uuid.uuid4())
     return vector_id
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalise a query for exact matching: collapse runs of whitespace and ignore case.
+    """
+    return " ".join(query.split()).casefold()
+
+
+def get_exact_match_key(query: str) -> str:
+    """
+    Storage key for the exact-match tier, a hash of the normalised query text.
+    """
+    return "exact:" + hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
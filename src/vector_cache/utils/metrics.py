@@ -0,0 +1,238 @@
+import threading
+from bisect import bisect_left
+from time import perf_counter_ns
+from typing import Callable, Dict, Iterable, Optional
+
+# Stages timed by VectorCache
+STAGES = ("exact_match", "embed", "vector_search", "response_fetch", "insert")
+
+# Lookup outcome counters recorded by VectorCache:
+# - hit: a neighbour passed the threshold and its response was found
+# - exact_hit: the exact-match tier answered before any embedding was made
+# - miss: no neighbour passed the threshold
+# - near_miss: a neighbour passed the threshold but its response was no longer in storage
+OUTCOMES = ("hit", "exact_hit", "miss", "near_miss")
+
+# Log-spaced latency bucket bounds: 1us, 2us, 4us ... ~8.4s
+LATENCY_BUCKETS_NS = tuple(1000 * 2 ** i for i in range(24))
+# Cosine distance bucket bounds: 0.025 ... 2.0
+DISTANCE_BUCKETS = tuple(round(0.025 * i, 3) for i in range(1, 81))
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Iterable[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # The last bucket is +Inf
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the q-quantile, or None for an empty histogram.
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip(self.bounds + (float("inf"),), self.counts)),
+        }
+
+
+class MetricsSink:
+    """
+    Receives raw measurements from `Metrics`. Subclasses override the events they care about.
+    """
+
+    def observe_latency(self, stage: str, elapsed_ns: int):
+        pass
+
+    def increment(self, name: str, amount: int = 1):
+        pass
+
+    def observe_distance(self, distance: float):
+        pass
+
+
+class InMemorySink(MetricsSink):
+    def __init__(self):
+        """
+        Aggregate measurements in process: a latency histogram per stage, counters and a distance histogram.
+        """
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.latencies: Dict[str, Histogram] = {}
+            self.counters: Dict[str, int] = {}
+            self.distances = Histogram(DISTANCE_BUCKETS)
+
+    def observe_latency(self, stage: str, elapsed_ns: int):
+        with self._lock:
+            histogram = self.latencies.get(stage)
+            if histogram is None:
+                histogram = self.latencies[stage] = Histogram(LATENCY_BUCKETS_NS)
+            histogram.observe(elapsed_ns)
+
+    def increment(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe_distance(self, distance: float):
+        with self._lock:
+            self.distances.observe(distance)
+
+    def snapshot(self) -> dict:
+        """
+        A point-in-time copy of everything recorded. Latencies are in nanoseconds.
+        """
+        with self._lock:
+            lookups = sum(self.counters.get(outcome, 0) for outcome in OUTCOMES)
+            hits = self.counters.get("hit", 0) + self.counters.get("exact_hit", 0)
+            return {
+                "latency_ns": {stage: histogram.snapshot() for stage, histogram in self.latencies.items()},
+                "counters": dict(self.counters),
+                "hit_rate": hits / lookups if lookups else None,
+                "distance": self.distances.snapshot(),
+            }
+
+
+class PrometheusSink(InMemorySink):
+    def __init__(self, namespace: str = "vector_cache"):
+        """
+        An `InMemorySink` that can render its state in the Prometheus text exposition format, e.g. from a
+        `/metrics` handler.
+        """
+        self.namespace = namespace
+        super().__init__()
+
+    @staticmethod
+    def _histogram_lines(name: str, histogram: Histogram, labels: str = "", divisor: float = 1.0) -> list:
+        lines = []
+        cumulative = 0
+        separator = "," if labels else ""
+        for bound, count in zip(histogram.bounds + (float("inf"),), histogram.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound / divisor)
+            lines.append(f'{name}_bucket{{{labels}{separator}le="{le}"}} {cumulative}')
+        braces = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{braces} {histogram.sum / divisor}")
+        lines.append(f"{name}_count{braces} {histogram.count}")
+        return lines
+
+    def render(self) -> str:
+        latency_name = f"{self.namespace}_stage_latency_seconds"
+        counter_name = f"{self.namespace}_events_total"
+        distance_name = f"{self.namespace}_nearest_distance"
+        with self._lock:
+            lines = [f"# HELP {latency_name} Latency of each cache stage.", f"# TYPE {latency_name} histogram"]
+            for stage, histogram in sorted(self.latencies.items()):
+                lines.extend(self._histogram_lines(latency_name, histogram, f'stage="{stage}"', divisor=1e9))
+            lines += [f"# HELP {counter_name} Cache lookup outcomes and other events.", f"# TYPE {counter_name} counter"]
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'{counter_name}{{event="{name}"}} {value}')
+            lines += [f"# HELP {distance_name} Distance to the nearest cached query.", f"# TYPE {distance_name} histogram"]
+            lines.extend(self._histogram_lines(distance_name, self.distances))
+        return "\n".join(lines) + "\n"
+
+
+class CallbackSink(MetricsSink):
+    def __init__(self, callback: Callable[[str, str, float], None]):
+        """
+        Forward every measurement to `callback(kind, name, value)`, where kind is "latency_ns", "counter" or
+        "distance". Useful for bridging into StatsD, OpenTelemetry or logging.
+        """
+        self.callback = callback
+
+    def observe_latency(self, stage: str, elapsed_ns: int):
+        self.callback("latency_ns", stage, elapsed_ns)
+
+    def increment(self, name: str, amount: int = 1):
+        self.callback("counter", name, amount)
+
+    def observe_distance(self, distance: float):
+        self.callback("distance", "nearest", distance)
+
+
+class _StageTimer:
+    __slots__ = ("sinks", "stage", "start")
+
+    def __init__(self, sinks: tuple, stage: str):
+        self.sinks = sinks
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed_ns = perf_counter_ns() - self.start
+        for sink in self.sinks:
+            sink.observe_latency(self.stage, elapsed_ns)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    def __init__(self, sinks: Optional[Iterable[MetricsSink]] = None):
+        """
+        The instrumentation surface used by `VectorCache`. With no sinks every call is a near no-op.
+
+        :param sinks: Where measurements go, e.g. `InMemorySink()`, `PrometheusSink()` or `CallbackSink(fn)`.
+        """
+        self.sinks = tuple(sinks or ())
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sinks)
+
+    def stage(self, name: str):
+        """
+        Context manager timing a stage with `perf_counter_ns`.
+        """
+        if not self.sinks:
+            return _NULL_TIMER
+        return _StageTimer(self.sinks, name)
+
+    def increment(self, name: str, amount: int = 1):
+        for sink in self.sinks:
+            sink.increment(name, amount)
+
+    def observe_distance(self, distance: float):
+        for sink in self.sinks:
+            sink.observe_distance(distance)
+
+
+NULL_METRICS = Metrics()
@@ -1,13 +1,29 @@
 from functools import wraps
-import time
-
-
-def time_measurement(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = time.time()  # Start time
-        result = func(*args, **kwargs)  # Execute the function
-        elapsed_time = time.time() - start_time  # Calculate elapsed time
-        print(f"{func.__name__} took {elapsed_time} seconds.")  # Print function name and elapsed time
-        return result
-    return wrapper
\ No newline at end of file
+import inspect
+from typing import Optional
+from vector_cache.utils.metrics import Metrics, NULL_METRICS
+
+
+def time_measurement(func=None, *, metrics: Metrics = NULL_METRICS, stage: Optional[str] = None):
+    """
+    Decorator recording each call of a function or coroutine function as a `metrics` stage, named after the
+    function unless `stage` is given. Use it bare (`@time_measurement`, a no-op without metrics) or with
+    arguments (`@time_measurement(metrics=metrics)`).
+    """
+    def decorator(func):
+        name = stage or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with metrics.stage(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
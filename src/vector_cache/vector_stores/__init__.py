@@ -1 +1,6 @@
-from .chroma_db import ChromaDB
\ No newline at end of file
+from .chroma_db import ChromaDB
+from .numpy_store import NumpyVectorStore
+from .hnsw import HNSWVectorStore
+from .mmap_store import MMapVectorStore
+from .quantized import QuantizedVectorStore
+from .compaction import Compactor, CompactionReport
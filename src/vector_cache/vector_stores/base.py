@@ -1,13 +1,109 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import Tuple, List
 from typing import Union, Callable
 
 
 class VectorStoreInterface(ABC):
+    # Stores that can keep a payload (the cached response) next to each vector set this to True. They accept
+    # `payload=` on `add`, `payloads=` on `add_many`, and return payloads from `search_with_payload`.
+    supports_payload = False
+    # Stores that can expire vectors set this to True. They accept `ttl=` (seconds) on `add` and `add_many`, never
+    # return expired vectors from a search, and reclaim them in `purge_expired`.
+    supports_expiry = False
+    # Stores that can remove vectors by id set this to True and implement `delete` / `delete_many`. `VectorCache`
+    # only deletes vectors whose responses were evicted for such stores.
+    supports_delete = False
+
     @abstractmethod
     def add(self, embedding: list,  **kwargs) -> str:
         pass
 
     @abstractmethod
     def search(self, embedding: list, top_n: int = 1, include_distances=True, **kwargs) -> Tuple[list, list]:
-        pass
\ No newline at end of file
+        pass
+
+    def add_many(self, embeddings: list, payloads: list = None, **kwargs) -> List[str]:
+        """
+        Add several embeddings and return their ids in input order.
+        Stores with a bulk insert API override this; the default adds them one at a time.
+        """
+        if payloads is None:
+            return [self.add(embedding, **kwargs) for embedding in embeddings]
+        return [self.add(embedding, payload=payload, **kwargs) for embedding, payload in zip(embeddings, payloads)]
+
+    def search_many(self, embeddings: list, top_n: int = 1, include_distances=True, **kwargs) -> List[Tuple[list, list]]:
+        """
+        Search for several embeddings and return one (ids, distances) result per embedding, in input order.
+        Stores with a multi-query API override this; the default searches them one at a time.
+        """
+        return [self.search(embedding, top_n, include_distances, **kwargs) for embedding in embeddings]
+
+    def search_with_payload(self, embedding: list, top_n: int = 1, **kwargs) -> Tuple[list, list, list]:
+        """
+        Search and return (ids, distances, payloads). A payload is None when the store holds none for that id.
+        Stores with `supports_payload` override this to fetch payloads in the same call as the search.
+        """
+        ids, distances = self.search(embedding, top_n, True, **kwargs)
+        return ids, distances, [None] * len(ids)
+
+    def search_many_with_payload(self, embeddings: list, top_n: int = 1, **kwargs) -> List[Tuple[list, list, list]]:
+        """
+        Search for several embeddings and return one (ids, distances, payloads) result per embedding, in input order.
+        """
+        return [self.search_with_payload(embedding, top_n, **kwargs) for embedding in embeddings]
+
+    def delete(self, vector_id: str) -> bool:
+        """
+        Remove a vector, e.g. because its response was evicted from the cache storage. Returns True if the id was
+        present, or when the backend cannot tell.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support deletes.")
+
+    def delete_many(self, vector_ids: list) -> int:
+        """
+        Remove several vectors and return how many were present.
+        Stores with a bulk delete API override this; the default deletes them one at a time.
+        """
+        return sum(bool(self.delete(vector_id)) for vector_id in vector_ids)
+
+    def purge_expired(self, limit: int = None) -> int:
+        """
+        Remove up to `limit` expired vectors and return how many were removed.
+        Stores without expiry, or whose backend expires entries itself, have nothing to purge.
+        """
+        return 0
+
+    def compact(self, min_fragmentation: float = 0.0) -> int:
+        """
+        Rebuild the store without the space held by deleted vectors once at least `min_fragmentation` of it is
+        dead, and return how many slots were reclaimed. Stores that reuse freed space need no compaction.
+        """
+        return 0
+
+    # Async counterparts. Stores with a native async client override these; the defaults run the blocking
+    # methods in a worker thread so that they never block the event loop.
+
+    async def add_async(self, embedding: list, **kwargs) -> str:
+        return await asyncio.to_thread(self.add, embedding, **kwargs)
+
+    async def search_async(self, embedding: list, top_n: int = 1, include_distances=True, **kwargs) -> Tuple[list, list]:
+        return await asyncio.to_thread(self.search, embedding, top_n, include_distances, **kwargs)
+
+    async def add_many_async(self, embeddings: list, **kwargs) -> List[str]:
+        return await asyncio.to_thread(self.add_many, embeddings, **kwargs)
+
+    async def search_many_async(self, embeddings: list, top_n: int = 1, include_distances=True, **kwargs) -> List[Tuple[list, list]]:
+        return await asyncio.to_thread(self.search_many, embeddings, top_n, include_distances, **kwargs)
+
+    async def search_with_payload_async(self, embedding: list, top_n: int = 1, **kwargs) -> Tuple[list, list, list]:
+        return await asyncio.to_thread(self.search_with_payload, embedding, top_n, **kwargs)
+
+    async def search_many_with_payload_async(self, embeddings: list, top_n: int = 1, **kwargs) -> List[Tuple[list, list, list]]:
+        return await asyncio.to_thread(self.search_many_with_payload, embeddings, top_n, **kwargs)
+
+    async def delete_async(self, vector_id: str) -> bool:
+        return await asyncio.to_thread(self.delete, vector_id)
+
+    async def delete_many_async(self, vector_ids: list) -> int:
+        return await asyncio.to_thread(self.delete_many, vector_ids)
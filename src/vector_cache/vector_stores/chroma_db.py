@@ -1,61 +1,133 @@
 import uuid
 
+import numpy as np
 from chromadb import QueryResult
-from chromadb.db.base import UniqueConstraintError
 
 from vector_cache.vector_stores.base import VectorStoreInterface
 import chromadb
-from typing import Union, Callable, Tuple
+from typing import Optional, Union, Callable, Tuple
 from vector_cache.utils.key_util import get_query_index
+
+
 class ChromaDB(VectorStoreInterface):
 
+    supports_payload = True
+    supports_delete = True
     default_collection = 'default_collection'
+    default_path = './chroma'
 
-    def __init__(self, collection: str = default_collection, persistent = False, identifier: Union[str, Callable, None] = None) -> None:
-        if persistent:
-            self.chroma_client = chromadb.PersistentClient()
+    def __init__(self, collection: str = default_collection, persistent = False, identifier: Union[str, Callable, None] = None,
+                 path: Optional[str] = None, space: str = "cosine", hnsw_m: Optional[int] = None,
+                 construction_ef: Optional[int] = None, search_ef: Optional[int] = None,
+                 batch_size: Optional[int] = None, sync_threshold: Optional[int] = None) -> None:
+        """
+        Parameters:
+        - persistent / path: Store the collection on disk under `path` (default "./chroma"); giving a path implies
+          persistent. Reopening the path loads the stored vectors and index as they are, with no re-embedding.
+        - space: Distance of a newly created collection ("cosine", "l2" or "ip"), matching `cosine_threshold` of
+          the cache with the default.
+        - hnsw_m, construction_ef, search_ef: HNSW settings of a newly created collection.
+        - batch_size, sync_threshold: How many records chroma buffers before adding them to the HNSW index, and
+          before writing the index to disk. Buffered records are searched by brute force, so a large batch_size
+          speeds up bulk loads but slows queries until the buffer is flushed.
+
+        Settings only apply when the collection is created; an existing collection keeps its own.
+        """
+        if persistent or path is not None:
+            self.chroma_client = chromadb.PersistentClient(path=path or self.default_path)
         else:
             self.chroma_client = chromadb.Client()
         self.identifier = identifier
+        metadata = {"hnsw:space": space}
+        for key, value in (("hnsw:M", hnsw_m), ("hnsw:construction_ef", construction_ef), ("hnsw:search_ef", search_ef),
+                           ("hnsw:batch_size", batch_size), ("hnsw:sync_threshold", sync_threshold)):
+            if value is not None:
+                metadata[key] = value
         try:
-            self.collection = self.chroma_client.create_collection(name=collection)
-        except UniqueConstraintError:
-            print(f"Collection {collection} already exists")
             self.collection = self.chroma_client.get_collection(name=collection)
+        except Exception:
+            # Missing collections raise ValueError or NotFoundError depending on the chroma version.
+            # get_or_create_collection is not used because it overwrites the metadata of an existing collection
+            self.collection = self.chroma_client.create_collection(name=collection, metadata=metadata)
 
-    def add(self, embedding: list, **kwargs) -> str:
-        vector_id = get_query_index(self.identifier)
-        # chroma db client expects the embeddings themselves to be a list.
-        # So, we convert it to such but only if it's not already a list
-        if isinstance(embedding, list):
-            self.collection.add(ids=[vector_id], embeddings=[embedding])
-        else:
-            embedding_list = embedding.tolist()
-            self.collection.add(ids=[vector_id], embeddings=[embedding_list])
-        return vector_id
+    @staticmethod
+    def _matrix(embeddings) -> np.ndarray:
+        # chroma accepts a 2-d array and converts it in one go, rather than a list of per-embedding lists
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1)
+
+    def add(self, embedding: list, payload: str = None, **kwargs) -> str:
+        return self.add_many([embedding], None if payload is None else [payload])[0]
+
+    def add_many(self, embeddings: list, payloads: list = None, **kwargs) -> list:
+        """
+        Add a batch in one call, or two when only some records have a payload.
+        """
+        if len(embeddings) == 0:
+            return []
+        vector_ids = [get_query_index(self.identifier) for _ in embeddings]
+        matrix = self._matrix(embeddings)
+        if payloads is None or all(payload is None for payload in payloads):
+            self.collection.add(ids=vector_ids, embeddings=matrix)
+            return vector_ids
+        # The payload is kept as the record's document. chroma wants a document for every record of a call, so
+        # records without a payload go in a second call
+        with_payload = [i for i, payload in enumerate(payloads) if payload is not None]
+        without_payload = [i for i, payload in enumerate(payloads) if payload is None]
+        self.collection.add(ids=[vector_ids[i] for i in with_payload], embeddings=matrix[with_payload],
+                            documents=[payloads[i] for i in with_payload])
+        if without_payload:
+            self.collection.add(ids=[vector_ids[i] for i in without_payload], embeddings=matrix[without_payload])
+        return vector_ids
 
     def get(self, id: str) -> Tuple[str, float]:
         pass
 
     def search(self, embedding: list, top_k: int, include_distances:bool = True, **kwargs) -> Tuple[list, list]:
-        # chroma db client expects the embeddings themselves to be a list.
-        # So, we convert it to such but only if it's not already a list
+        ids, distances = self.search_many([embedding], top_k)[0]
+        if include_distances:
+            return ids, distances
+        return ids
 
-        if isinstance(embedding, list):
-            embedding_list = embedding
-        else:
-            embedding_list = embedding.tolist()
+    def search_many(self, embeddings: list, top_k: int = 1, include_distances: bool = True, **kwargs) -> list:
+        # A single query call with one row per embedding; chroma returns one result list per query
+        if len(embeddings) == 0:
+            return []
+        query_result: QueryResult = self.collection.query(query_embeddings=self._matrix(embeddings), n_results=top_k, include=["distances"])
+        distances = query_result['distances'] if include_distances else [[] for _ in embeddings]
+        return list(zip(query_result['ids'], distances))
 
-        if include_distances:
-            query_result: QueryResult = self.collection.query(query_embeddings=[embedding_list], n_results=top_k, include=["distances"])
-            return query_result['ids'][0], query_result['distances'][0]
-        else:
-            query_result: QueryResult = self.collection.query(query_embeddings=[embedding_list], n_results=top_k, include=["distances"])
-            return query_result['ids'][0]
+    def search_with_payload(self, embedding: list, top_n: int = 1, **kwargs) -> Tuple[list, list, list]:
+        """
+        Search and return each record's document, where the payload is kept, in the same query.
+        """
+        return self.search_many_with_payload([embedding], top_n)[0]
+
+    def search_many_with_payload(self, embeddings: list, top_n: int = 1, **kwargs) -> list:
+        if len(embeddings) == 0:
+            return []
+        query_result: QueryResult = self.collection.query(query_embeddings=self._matrix(embeddings), n_results=top_n, include=["distances", "documents"])
+        return list(zip(query_result['ids'], query_result['distances'], query_result['documents']))
+
+    def delete(self, vector_id: str) -> bool:
+        return self.delete_many([vector_id]) == 1
+
+    def delete_many(self, vector_ids: list) -> int:
+        # chroma ignores unknown ids and does not report which existed, so all are counted
+        if len(vector_ids) == 0:
+            return 0
+        self.collection.delete(ids=list(vector_ids))
+        return len(vector_ids)
+
+    def __len__(self) -> int:
+        return self.collection.count()
 
+    def close(self) -> None:
+        # chroma writes through to disk as records are added, so there is nothing to flush
+        self.collection = None
+        self.chroma_client = None
 
     def __enter__(self) -> "ChromaDB":
         return self
 
     def __exit__(self, exc_type, exc_value, traceback) -> None:
-        self.close()
\ No newline at end of file
+        self.close()
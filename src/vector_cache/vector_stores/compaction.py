@@ -0,0 +1,103 @@
+import threading
+import time
+import warnings
+from typing import Callable, NamedTuple, Optional
+
+from vector_cache.utils.metrics import Metrics, NULL_METRICS
+from vector_cache.vector_stores.base import VectorStoreInterface
+
+
+class CompactionReport(NamedTuple):
+    reclaimed: int
+    defragmented: int
+    duration_s: float
+
+
+class Compactor:
+    def __init__(self, vector_store: VectorStoreInterface, interval: float = 60.0, batch_size: int = 1000,
+                 min_fragmentation: float = 0.25, metrics: Optional[Metrics] = None,
+                 on_report: Optional[Callable[[CompactionReport], None]] = None):
+        """
+        Periodically purges expired vectors from a store and compacts it once enough of it is dead.
+
+        Expired vectors are removed `batch_size` at a time so that no single purge holds the store's lock for
+        long; searches and inserts interleave between batches. The compaction itself builds the new layout
+        outside the lock and only swaps it in under it.
+
+        :param vector_store: The store to maintain.
+        :param interval: Seconds between runs of the background thread.
+        :param batch_size: Maximum number of expired vectors removed per `purge_expired` call.
+        :param min_fragmentation: Fraction of dead slots above which the store is compacted. None skips compaction.
+        :param metrics: Records the "compaction" stage and a "vector_expired" counter.
+        :param on_report: Called with a `CompactionReport` after every run.
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive.")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        self.vector_store = vector_store
+        self.interval = interval
+        self.batch_size = batch_size
+        self.min_fragmentation = min_fragmentation
+        self.metrics = metrics or NULL_METRICS
+        self.on_report = on_report
+        self.last_report: Optional[CompactionReport] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> CompactionReport:
+        """
+        Purge every vector that has expired so far, then compact the store if it is fragmented enough.
+        """
+        start = time.perf_counter()
+        reclaimed = 0
+        defragmented = 0
+        with self.metrics.stage("compaction"):
+            while not self._stop.is_set():
+                purged = self.vector_store.purge_expired(self.batch_size)
+                reclaimed += purged
+                if purged < self.batch_size:
+                    break
+            if self.min_fragmentation is not None and not self._stop.is_set():
+                defragmented = self.vector_store.compact(self.min_fragmentation)
+        if reclaimed:
+            self.metrics.increment("vector_expired", reclaimed)
+        report = CompactionReport(reclaimed, defragmented, time.perf_counter() - start)
+        self.last_report = report
+        if self.on_report is not None:
+            self.on_report(report)
+        return report
+
+    def start(self) -> "Compactor":
+        """
+        Run `run_once` every `interval` seconds in a daemon thread until `stop` is called.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vector-cache-compactor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the background thread, letting a run in progress finish its current batch.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                warnings.warn(f"Vector store compaction failed: {e}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
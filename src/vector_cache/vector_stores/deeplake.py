@@ -6,6 +6,8 @@ from vector_cache.vector_stores.base import VectorStoreInterface
 from typing import Union, Callable
 from vector_cache.utils.key_util import get_query_index
 #WIP : DO NOT USE YET
+# No delete support until the adapter targets the real DeepLake client, so `supports_delete` stays False and
+# VectorCache does not delete vectors of evicted responses from this store.
 class DeepLakeVectorStore(VectorStoreInterface):
     def __init__(self, index_name: str, api_key: str, identifier: Union[str, Callable, None] = None):
         """
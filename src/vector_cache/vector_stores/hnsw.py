@@ -0,0 +1,332 @@
+import heapq
+import math
+import random
+import threading
+import time
+from typing import Tuple, Union, Callable, Optional
+import numpy as np
+from vector_cache.vector_stores.base import VectorStoreInterface
+from vector_cache.vector_stores.numpy_store import normalize
+from vector_cache.utils.key_util import get_query_index
+
+
+class HNSWVectorStore(VectorStoreInterface):
+    supports_payload = True
+    supports_expiry = True
+    supports_delete = True
+
+    def __init__(self, dimension: int, m: int = 16, ef_construction: int = 200, ef_search: int = 50,
+                 initial_capacity: int = 1024, seed: Optional[int] = None,
+                 identifier: Union[str, Callable, None] = None, ttl: Optional[float] = None):
+        """
+        Initialize an in-process approximate nearest neighbour store using a Hierarchical Navigable Small World graph.
+
+        Inserts are incremental. Deleted and expired nodes stay in the graph as tombstones until `compact` rebuilds
+        it from the live nodes. Raise `ef_search` for better recall at the cost of latency;
+        `examples/benchmark_hnsw_recall.py` prints the trade-off against `NumpyVectorStore`.
+
+        Parameters:
+        - dimension: The dimension of the vectors to be stored.
+        - m: The number of links per node on the upper layers (layer 0 keeps 2 * m).
+        - ef_construction: The size of the candidate list used while inserting.
+        - ef_search: The size of the candidate list used while searching. Can be overridden per call.
+        - initial_capacity: The number of vector rows to allocate up front.
+        - seed: Seed for the level generator, for reproducible graphs.
+        - identifier: How to identify different_keys, can be prefix string, a function or None (default)
+        - ttl: Default seconds after which an added vector expires and is no longer returned by searches. `add`
+          accepts a per-call `ttl`.
+        """
+        if dimension <= 0:
+            raise ValueError("dimension must be a positive integer.")
+        if m < 2:
+            raise ValueError("m must be at least 2.")
+        self.dimension = dimension
+        self.m = m
+        self.ef_construction = max(ef_construction, m)
+        self.ef_search = ef_search
+        self.identifier = identifier
+        self.ttl = ttl
+        self._level_multiplier = 1 / math.log(m)
+        self._random = random.Random(seed)
+        self._vectors = np.zeros((max(1, initial_capacity), dimension), dtype=np.float32)
+        self._graph = []  # node -> layer -> list of neighbour nodes
+        self._ids = []
+        self._payloads = []
+        self._alive = []
+        self._expires_at = []  # time.monotonic() deadlines, inf for none
+        self._has_expiry = False
+        self._compacting = False
+        self._id_to_node = {}
+        self._entry_point = None
+        self._max_level = -1
+        self._lock = threading.RLock()
+
+    def _as_vector(self, embedding: Union[list, np.ndarray]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        if vector.shape != (self.dimension,):
+            raise ValueError(f"Embedding must have shape ({self.dimension},), got {vector.shape}.")
+        return vector
+
+    def _random_level(self) -> int:
+        return int(-math.log(1.0 - self._random.random()) * self._level_multiplier)
+
+    def _append_vector(self, vector: np.ndarray) -> int:
+        node = len(self._ids)
+        if node == len(self._vectors):
+            vectors = np.zeros((len(self._vectors) * 2, self.dimension), dtype=np.float32)
+            vectors[:node] = self._vectors[:node]
+            self._vectors = vectors
+        self._vectors[node] = vector
+        return node
+
+    def _search_layer(self, query: np.ndarray, entry_points: list, ef: int, level: int) -> list:
+        """
+        Greedy beam search on one layer. Returns up to `ef` (distance, node) pairs sorted by distance.
+        """
+        vectors = self._vectors
+        visited = set(entry_points)
+        distances = (1.0 - vectors[entry_points] @ query).tolist()
+        candidates = list(zip(distances, entry_points))
+        heapq.heapify(candidates)
+        results = [(-distance, node) for distance, node in candidates]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            distance, node = heapq.heappop(candidates)
+            if distance > -results[0][0]:
+                break
+            neighbours = [n for n in self._graph[node][level] if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+            for neighbour_distance, neighbour in zip((1.0 - vectors[neighbours] @ query).tolist(), neighbours):
+                if len(results) < ef or neighbour_distance < -results[0][0]:
+                    heapq.heappush(candidates, (neighbour_distance, neighbour))
+                    heapq.heappush(results, (-neighbour_distance, neighbour))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+        return sorted((-negative_distance, node) for negative_distance, node in results)
+
+    def _select_neighbours(self, candidates: list, m: int) -> list:
+        """
+        Neighbour selection heuristic from the HNSW paper: prefer candidates that are closer to the base node than to
+        any already selected neighbour, then top up with the closest pruned ones.
+        """
+        if len(candidates) <= m:
+            return [node for _, node in candidates]
+        nodes = [node for _, node in candidates]
+        candidate_vectors = self._vectors[nodes]
+        # One matrix product up front is far cheaper than a small NumPy call per candidate
+        pairwise = (1.0 - candidate_vectors @ candidate_vectors.T).tolist()
+        selected = []
+        pruned = []
+        for i, (distance, _) in enumerate(candidates):
+            if len(selected) >= m:
+                break
+            row = pairwise[i]
+            if any(row[j] < distance for j in selected):
+                pruned.append(i)
+                continue
+            selected.append(i)
+        for i in pruned:
+            if len(selected) >= m:
+                break
+            selected.append(i)
+        return [nodes[i] for i in selected]
+
+    def _insert(self, vector: np.ndarray, vector_id: str, payload=None, expires_at: float = math.inf) -> None:
+        node = self._append_vector(vector)
+        level = self._random_level()
+        self._graph.append([[] for _ in range(level + 1)])
+        self._ids.append(vector_id)
+        self._payloads.append(payload)
+        self._alive.append(True)
+        self._expires_at.append(expires_at)
+        if expires_at != math.inf:
+            self._has_expiry = True
+        self._id_to_node[vector_id] = node
+
+        if self._entry_point is None:
+            self._entry_point = node
+            self._max_level = level
+            return
+
+        entry_points = [self._entry_point]
+        for layer in range(self._max_level, level, -1):
+            entry_points = [self._search_layer(vector, entry_points, 1, layer)[0][1]]
+
+        for layer in range(min(level, self._max_level), -1, -1):
+            found = self._search_layer(vector, entry_points, self.ef_construction, layer)
+            neighbours = self._select_neighbours(found, self.m)
+            self._graph[node][layer] = neighbours
+            max_links = 2 * self.m if layer == 0 else self.m
+            for neighbour in neighbours:
+                links = self._graph[neighbour][layer]
+                links.append(node)
+                if len(links) > max_links:
+                    link_distances = (1.0 - self._vectors[links] @ self._vectors[neighbour]).tolist()
+                    self._graph[neighbour][layer] = self._select_neighbours(sorted(zip(link_distances, links)), max_links)
+            entry_points = [n for _, n in found]
+
+        if level > self._max_level:
+            self._entry_point = node
+            self._max_level = level
+
+    def add(self, embedding: Union[list, np.ndarray], payload=None, ttl: Optional[float] = None, **kwargs) -> str:
+        """
+        Insert an embedding into the graph.
+
+        Parameters:
+        - embedding: The embedding to add, as a list or numpy array.
+        - payload: Optional value kept with the vector and returned by `search_with_payload`.
+        - ttl: Optional seconds until the vector expires, overriding the store's default.
+        - **kwargs: Additional keyword arguments.
+
+        Returns:
+        - The generated id of the stored vector.
+        """
+        vector = normalize(self._as_vector(embedding))
+        vector_id = get_query_index(self.identifier)
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else math.inf
+        with self._lock:
+            if vector_id in self._id_to_node:
+                raise ValueError(f"Vector id {vector_id} already exists.")
+            self._insert(vector, vector_id, payload, expires_at)
+        return vector_id
+
+    def search(self, embedding: Union[list, np.ndarray], top_n: int = 1, include_distances: bool = True, **kwargs) -> Tuple[list, list]:
+        """
+        Search the graph for approximate nearest neighbours by cosine distance.
+
+        Parameters:
+        - embedding: The query embedding, as a list or numpy array.
+        - top_n: The number of top similar results to return.
+        - include_distances: Whether to include distances in the results.
+        - ef_search: Optional override of the store's `ef_search` for this call.
+
+        Returns:
+        - A tuple of two lists: ids of the closest embeddings, and their respective cosine distances.
+        """
+        query = normalize(self._as_vector(embedding))
+        ef = max(kwargs.get("ef_search", self.ef_search), top_n)
+        with self._lock:
+            if self._entry_point is None or top_n <= 0:
+                return [], []
+            entry_points = [self._entry_point]
+            for layer in range(self._max_level, 0, -1):
+                entry_points = [self._search_layer(query, entry_points, 1, layer)[0][1]]
+            found = self._search_layer(query, entry_points, ef, 0)
+            if self._has_expiry:
+                now = time.monotonic()
+                matches = [(distance, node) for distance, node in found if self._alive[node] and self._expires_at[node] > now][:top_n]
+            else:
+                matches = [(distance, node) for distance, node in found if self._alive[node]][:top_n]
+            ids = [self._ids[node] for _, node in matches]
+        distances = [distance for distance, _ in matches] if include_distances else []
+        return ids, distances
+
+    def search_with_payload(self, embedding: Union[list, np.ndarray], top_n: int = 1, **kwargs) -> Tuple[list, list, list]:
+        """
+        Search like `search` and also return the payload stored with each result.
+        """
+        with self._lock:
+            ids, distances = self.search(embedding, top_n, True, **kwargs)
+            return ids, distances, [self._payloads[self._id_to_node[vector_id]] for vector_id in ids]
+
+    def delete(self, vector_id: str) -> bool:
+        """
+        Remove a vector from search results. The node stays in the graph so that it can still be traversed.
+
+        Returns:
+        - True if the id was present, False otherwise.
+        """
+        with self._lock:
+            return self._delete_locked(vector_id)
+
+    def delete_many(self, vector_ids: list) -> int:
+        with self._lock:
+            return sum(self._delete_locked(vector_id) for vector_id in vector_ids)
+
+    def _delete_locked(self, vector_id: str) -> bool:
+        node = self._id_to_node.pop(vector_id, None)
+        if node is None:
+            return False
+        self._alive[node] = False
+        self._payloads[node] = None
+        return True
+
+    def purge_expired(self, limit: Optional[int] = None) -> int:
+        """
+        Delete up to `limit` expired vectors and return how many were removed. Their nodes remain as tombstones
+        until `compact`.
+        """
+        if not self._has_expiry:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            expired = [vector_id for vector_id, node in self._id_to_node.items() if self._expires_at[node] <= now]
+            if limit is not None:
+                expired = expired[:limit]
+            return sum(self._delete_locked(vector_id) for vector_id in expired)
+
+    def compact(self, min_fragmentation: float = 0.0) -> int:
+        """
+        Rebuild the graph from the live nodes, dropping tombstones that searches would otherwise keep traversing.
+        The new graph is built outside the lock while the current one keeps serving; nodes added or deleted
+        meanwhile are applied to it when it is swapped in.
+
+        Parameters:
+        - min_fragmentation: Skip the rebuild unless at least this fraction of the nodes is dead.
+
+        Returns:
+        - The number of nodes reclaimed.
+        """
+        with self._lock:
+            total = len(self._ids)
+            live = len(self._id_to_node)
+            if self._compacting or total == 0 or live == total or 1 - live / total < min_fragmentation:
+                return 0
+            self._compacting = True
+            nodes = [node for node in range(total) if self._alive[node]]
+            vectors = self._vectors[nodes]
+            ids = [self._ids[node] for node in nodes]
+            payloads = [self._payloads[node] for node in nodes]
+            expires_at = [self._expires_at[node] for node in nodes]
+        try:
+            rebuilt = HNSWVectorStore(self.dimension, m=self.m, ef_construction=self.ef_construction, ef_search=self.ef_search,
+                                      initial_capacity=max(1, len(nodes)), seed=self._random.random(), ttl=self.ttl)
+            for vector, vector_id, payload, deadline in zip(vectors, ids, payloads, expires_at):
+                rebuilt._insert(vector, vector_id, payload, deadline)
+        except BaseException:
+            with self._lock:
+                self._compacting = False
+            raise
+
+        with self._lock:
+            self._compacting = False
+            for node, vector_id in zip(nodes, ids):
+                if not self._alive[node]:
+                    rebuilt._delete_locked(vector_id)
+            for node in range(total, len(self._ids)):
+                if self._alive[node]:
+                    rebuilt._insert(self._vectors[node], self._ids[node], self._payloads[node], self._expires_at[node])
+            reclaimed = len(self._ids) - len(rebuilt._ids)
+            for name in ("_vectors", "_graph", "_ids", "_payloads", "_alive", "_expires_at", "_has_expiry", "_id_to_node",
+                         "_entry_point", "_max_level"):
+                setattr(self, name, getattr(rebuilt, name))
+        return reclaimed
+
+    def __len__(self) -> int:
+        return len(self._id_to_node)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
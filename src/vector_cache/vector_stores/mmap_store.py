@@ -0,0 +1,387 @@
+import json
+import os
+import struct
+import threading
+import zlib
+from typing import Tuple, Union, Callable
+import numpy as np
+from vector_cache.vector_stores.base import VectorStoreInterface
+from vector_cache.vector_stores.numpy_store import normalize
+from vector_cache.utils.key_util import get_query_index
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, a single writer is assumed
+    fcntl = None
+
+_META_FILE = "meta.json"
+_MANIFEST_FILE = "manifest.log"
+_LOCK_FILE = "writer.lock"
+_FORMAT_VERSION = 1
+
+# Manifest record: crc32, kind, id length, global row, followed by the utf-8 id.
+# The crc covers everything after itself and, for ADD records, the vector bytes in the segment as well.
+_RECORD_HEADER = struct.Struct("<IBHI")
+_ADD = 1
+_DELETE = 2
+
+FSYNC_POLICIES = ("always", "batch", "never")
+
+
+class MMapVectorStore(VectorStoreInterface):
+    supports_delete = True
+
+    def __init__(self, path: str, dimension: int = None, segment_rows: int = 65536, read_only: bool = False,
+                 fsync: str = "always", fsync_every: int = 256, identifier: Union[str, Callable, None] = None):
+        """
+        Initialize a persistent vector store whose vectors live in memory-mapped, append-only segment files.
+
+        Reopening an existing directory only replays the small id manifest; vector pages are faulted in lazily by
+        the first searches, so a restarted process can serve immediately. Several processes can open the same
+        directory with `read_only=True` while a single writer appends.
+
+        Parameters:
+        - path: Directory holding the segment files and manifest. Created if it does not exist.
+        - dimension: The dimension of the vectors. Required when creating a new store, read from disk otherwise.
+        - segment_rows: The number of vectors per segment file.
+        - read_only: Map segments read-only and never write. Use `refresh` to pick up the writer's appends.
+        - fsync: "always" syncs vectors and manifest on every write, "batch" every `fsync_every` writes and on
+          `sync`/`close`, "never" leaves it to the operating system.
+        - fsync_every: The number of writes between syncs when `fsync="batch"`.
+        - identifier: How to identify different_keys, can be prefix string, a function or None (default)
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}.")
+        self.path = path
+        self.read_only = read_only
+        self.fsync = fsync
+        self.fsync_every = max(1, fsync_every)
+        self.identifier = identifier
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._unsynced = 0
+
+        meta_path = os.path.join(path, _META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as fh:
+                meta = json.load(fh)
+            if meta.get("version") != _FORMAT_VERSION:
+                raise ValueError(f"Unsupported store version {meta.get('version')} in {path}.")
+            if dimension is not None and dimension != meta["dimension"]:
+                raise ValueError(f"Store in {path} has dimension {meta['dimension']}, got {dimension}.")
+            self.dimension = meta["dimension"]
+            self.segment_rows = meta["segment_rows"]
+        else:
+            if read_only:
+                raise FileNotFoundError(f"No vector store found in {path}.")
+            if dimension is None or dimension <= 0:
+                raise ValueError("dimension must be a positive integer when creating a new store.")
+            self.dimension = dimension
+            self.segment_rows = segment_rows
+            os.makedirs(path, exist_ok=True)
+            self._write_meta(meta_path)
+
+        if not read_only:
+            self._acquire_writer_lock()
+
+        self._segments = []
+        self._ids = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._id_to_row = {}
+        self._manifest_offset = 0
+        manifest_path = os.path.join(path, _MANIFEST_FILE)
+        if not read_only:
+            # Open in append mode once the tail has been validated by _replay_manifest
+            open(manifest_path, "ab").close()
+        self._replay_manifest()
+        self._manifest = None if read_only else open(manifest_path, "ab")
+
+    def _write_meta(self, meta_path: str):
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump({"version": _FORMAT_VERSION, "dimension": self.dimension, "segment_rows": self.segment_rows}, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, meta_path)
+
+    def _acquire_writer_lock(self):
+        if fcntl is None:
+            return
+        self._lock_file = open(os.path.join(self.path, _LOCK_FILE), "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            raise RuntimeError(f"Another process is already writing to {self.path}; open it with read_only=True.")
+
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(self.path, f"segment-{index:05d}.f32")
+
+    def _open_segment(self, index: int, create: bool = False) -> np.memmap:
+        segment_path = self._segment_path(index)
+        shape = (self.segment_rows, self.dimension)
+        if create and not os.path.exists(segment_path):
+            return np.memmap(segment_path, dtype=np.float32, mode="w+", shape=shape)
+        return np.memmap(segment_path, dtype=np.float32, mode="r" if self.read_only else "r+", shape=shape)
+
+    def _segment_for_row(self, row: int, create: bool = False) -> Union[np.memmap, None]:
+        index = row // self.segment_rows
+        while len(self._segments) <= index:
+            if not create and not os.path.exists(self._segment_path(len(self._segments))):
+                return None
+            self._segments.append(self._open_segment(len(self._segments), create=create))
+        return self._segments[index]
+
+    def _vector_bytes(self, row: int) -> Union[bytes, None]:
+        segment = self._segment_for_row(row)
+        if segment is None:
+            return None
+        return segment[row % self.segment_rows].tobytes()
+
+    def _set_alive(self, row: int, value: bool):
+        if row >= len(self._alive):
+            alive = np.zeros(max(row + 1, 2 * len(self._alive), 1024), dtype=bool)
+            alive[:len(self._alive)] = self._alive
+            self._alive = alive
+        self._alive[row] = value
+
+    def _replay_manifest(self):
+        """
+        Apply manifest records written since the last replay. A record that is incomplete or whose checksum does not
+        match (a torn write from a crash) ends the replay; a writer truncates the file back to the last good record.
+        """
+        manifest_path = os.path.join(self.path, _MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return
+        with open(manifest_path, "rb") as fh:
+            fh.seek(self._manifest_offset)
+            data = fh.read()
+
+        offset = 0
+        while offset + _RECORD_HEADER.size <= len(data):
+            crc, kind, id_length, row = _RECORD_HEADER.unpack_from(data, offset)
+            end = offset + _RECORD_HEADER.size + id_length
+            if end > len(data) or kind not in (_ADD, _DELETE):
+                break
+            body = data[offset + 4:end]
+            if kind == _ADD:
+                vector_bytes = self._vector_bytes(row)
+                if vector_bytes is None or zlib.crc32(vector_bytes, zlib.crc32(body)) != crc:
+                    break
+            elif zlib.crc32(body) != crc:
+                break
+            vector_id = data[offset + _RECORD_HEADER.size:end].decode("utf-8")
+            if kind == _ADD:
+                if row >= len(self._ids):
+                    self._ids.extend([None] * (row + 1 - len(self._ids)))
+                self._ids[row] = vector_id
+                self._id_to_row[vector_id] = row
+                self._set_alive(row, True)
+            else:
+                if self._id_to_row.pop(vector_id, None) is not None:
+                    self._set_alive(row, False)
+            offset = end
+
+        self._manifest_offset += offset
+        if offset < len(data) and not self.read_only:
+            with open(manifest_path, "r+b") as fh:
+                fh.truncate(self._manifest_offset)
+                os.fsync(fh.fileno())
+
+    def _append_record(self, kind: int, vector_id: str, row: int, vector_bytes: bytes = b""):
+        encoded_id = vector_id.encode("utf-8")
+        body = _RECORD_HEADER.pack(0, kind, len(encoded_id), row)[4:] + encoded_id
+        crc = zlib.crc32(vector_bytes, zlib.crc32(body)) if kind == _ADD else zlib.crc32(body)
+        self._manifest.write(struct.pack("<I", crc) + body)
+        self._manifest_offset += 4 + len(body)
+        self._unsynced += 1
+
+    def _apply_fsync_policy(self):
+        if self.fsync == "always" or (self.fsync == "batch" and self._unsynced >= self.fsync_every):
+            self._sync()
+        elif self.fsync == "never":
+            self._manifest.flush()
+
+    def _sync(self):
+        for segment in self._segments:
+            segment.flush()
+        self._manifest.flush()
+        os.fsync(self._manifest.fileno())
+        self._unsynced = 0
+
+    def sync(self):
+        """Flush pending vectors and manifest records to disk."""
+        if self.read_only:
+            return
+        with self._lock:
+            self._sync()
+
+    def refresh(self):
+        """Pick up records appended by the writer since this store was opened. Mostly useful with `read_only=True`."""
+        with self._lock:
+            self._replay_manifest()
+
+    def _as_matrix(self, embeddings: Union[list, np.ndarray]) -> np.ndarray:
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(f"Embeddings must have {self.dimension} dimensions, got {matrix.shape[1]}.")
+        return normalize(matrix)
+
+    def _append(self, vector: np.ndarray) -> str:
+        vector_id = get_query_index(self.identifier)
+        if vector_id in self._id_to_row:
+            raise ValueError(f"Vector id {vector_id} already exists.")
+        row = len(self._ids)
+        segment = self._segment_for_row(row, create=True)
+        segment[row % self.segment_rows] = vector
+        # The vector is written before the record that references it, and both are covered by the checksum
+        self._append_record(_ADD, vector_id, row, segment[row % self.segment_rows].tobytes())
+        self._ids.append(vector_id)
+        self._id_to_row[vector_id] = row
+        self._set_alive(row, True)
+        return vector_id
+
+    def add(self, embedding: Union[list, np.ndarray], **kwargs) -> str:
+        """
+        Append an embedding to the current segment and record it in the manifest.
+
+        Parameters:
+        - embedding: The embedding to add, as a list or numpy array.
+        - **kwargs: Additional keyword arguments.
+
+        Returns:
+        - The generated id of the stored vector.
+        """
+        return self.add_many([embedding], **kwargs)[0]
+
+    def add_many(self, embeddings: Union[list, np.ndarray], **kwargs) -> list:
+        """
+        Append several embeddings. With `fsync="always"` the whole batch is synced once, after the last record.
+
+        Returns:
+        - The generated ids, in input order.
+        """
+        if self.read_only:
+            raise RuntimeError("Cannot add to a read-only store.")
+        if len(embeddings) == 0:
+            return []
+        matrix = self._as_matrix(embeddings)
+        with self._lock:
+            ids = [self._append(vector) for vector in matrix]
+            self._apply_fsync_policy()
+        return ids
+
+    def _similarities(self, queries: np.ndarray) -> np.ndarray:
+        total = len(self._ids)
+        similarities = np.empty((len(queries), total), dtype=np.float32)
+        for index in range((total + self.segment_rows - 1) // self.segment_rows):
+            start = index * self.segment_rows
+            rows = min(self.segment_rows, total - start)
+            similarities[:, start:start + rows] = queries @ self._segments[index][:rows].T
+        similarities[:, ~self._alive[:total]] = -np.inf
+        return similarities
+
+    def _top_n(self, similarities: np.ndarray, top_n: int, include_distances: bool) -> Tuple[list, list]:
+        if top_n < len(similarities):
+            candidates = np.argpartition(-similarities, top_n - 1)[:top_n]
+        else:
+            candidates = np.arange(len(similarities))
+        order = candidates[np.argsort(-similarities[candidates], kind="stable")][:top_n]
+        ids = [self._ids[row] for row in order]
+        distances = (1.0 - similarities[order]).tolist() if include_distances else []
+        return ids, distances
+
+    def search(self, embedding: Union[list, np.ndarray], top_n: int = 1, include_distances: bool = True, **kwargs) -> Tuple[list, list]:
+        """
+        Search for the nearest embeddings by cosine distance, scanning the mapped segments.
+
+        Parameters:
+        - embedding: The query embedding, as a list or numpy array.
+        - top_n: The number of top similar results to return.
+        - include_distances: Whether to include distances in the results.
+
+        Returns:
+        - A tuple of two lists: ids of the closest embeddings, and their respective cosine distances.
+        """
+        return self.search_many([embedding], top_n, include_distances)[0]
+
+    def search_many(self, embeddings: Union[list, np.ndarray], top_n: int = 1, include_distances: bool = True, **kwargs) -> list:
+        """
+        Search for several embeddings with one pass over the segments.
+
+        Returns:
+        - One (ids, distances) tuple per query embedding, in input order.
+        """
+        if len(embeddings) == 0:
+            return []
+        queries = self._as_matrix(embeddings)
+        with self._lock:
+            top_n = min(top_n, len(self._id_to_row))
+            if top_n <= 0:
+                return [([], []) for _ in range(len(queries))]
+            similarities = self._similarities(queries)
+            return [self._top_n(row, top_n, include_distances) for row in similarities]
+
+    def delete(self, vector_id: str) -> bool:
+        """
+        Record a deletion in the manifest. Segment space is append-only and is not reclaimed.
+
+        Returns:
+        - True if the id was present, False otherwise.
+        """
+        return self.delete_many([vector_id]) == 1
+
+    def delete_many(self, vector_ids: list) -> int:
+        """
+        Record several deletions with a single fsync.
+        """
+        if self.read_only:
+            raise RuntimeError("Cannot delete from a read-only store.")
+        deleted = 0
+        with self._lock:
+            for vector_id in vector_ids:
+                row = self._id_to_row.pop(vector_id, None)
+                if row is None:
+                    continue
+                self._append_record(_DELETE, vector_id, row)
+                self._alive[row] = False
+                deleted += 1
+            if deleted:
+                self._apply_fsync_policy()
+        return deleted
+
+    def __len__(self) -> int:
+        return len(self._id_to_row)
+
+    @property
+    def mapped_bytes(self) -> int:
+        """
+        Disk space taken by the segment files, i.e. what the mapped vectors occupy in the page cache once faulted
+        in. Counts allocated blocks where the platform reports them, so the unwritten tail of a sparse segment is
+        not included.
+        """
+        total = 0
+        for index in range(len(self._segments)):
+            stat = os.stat(self._segment_path(index))
+            blocks = getattr(stat, "st_blocks", None)
+            total += min(stat.st_size, blocks * 512) if blocks is not None else stat.st_size
+        return total
+
+    def close(self):
+        with self._lock:
+            if self._manifest is not None and not self._manifest.closed:
+                self._sync()
+                self._manifest.close()
+            # Dropping the references unmaps the segments once no caller holds a view into them
+            self._segments = []
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
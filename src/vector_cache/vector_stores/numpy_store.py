@@ -0,0 +1,336 @@
+import threading
+import time
+from typing import Optional, Tuple, Union, Callable
+import numpy as np
+from vector_cache.vector_stores.base import VectorStoreInterface
+from vector_cache.utils.key_util import get_query_index
+
+
+def normalize(embeddings: np.ndarray) -> np.ndarray:
+    """
+    L2-normalise a vector or a matrix of row vectors, leaving zero vectors untouched.
+    """
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+class NumpyVectorStore(VectorStoreInterface):
+    supports_payload = True
+    supports_expiry = True
+    supports_delete = True
+
+    def __init__(self, dimension: int, initial_capacity: int = 1024, identifier: Union[str, Callable, None] = None,
+                 ttl: Optional[float] = None):
+        """
+        Initialize an in-process vector store backed by a NumPy matrix.
+
+        Embeddings are normalised on insert and kept in a contiguous float32 matrix, so a search is a single
+        matrix-vector product. The matrix doubles in size when full, and rows freed by `delete` are reused.
+
+        Parameters:
+        - dimension: The dimension of the vectors to be stored.
+        - initial_capacity: The number of rows to allocate up front.
+        - identifier: How to identify different_keys, can be prefix string, a function or None (default)
+        - ttl: Default seconds after which an added vector expires and is no longer returned by searches. `add` and
+          `add_many` accept a per-call `ttl`. Expired rows are reclaimed by `purge_expired`.
+        """
+        if dimension <= 0:
+            raise ValueError("dimension must be a positive integer.")
+        self.dimension = dimension
+        self.identifier = identifier
+        self.ttl = ttl
+        self.initial_capacity = max(1, initial_capacity)
+        capacity = self.initial_capacity
+        self._vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._expires_at = np.full(capacity, np.inf)  # time.monotonic() deadlines
+        self._has_expiry = False  # Set once any row was added with a ttl, so searches skip the check until then
+        self._compacting = False
+        self._ids = [None] * capacity
+        self._payloads = [None] * capacity
+        self._id_to_row = {}
+        self._free_rows = []
+        self._size = 0  # High-water mark: rows [0, _size) have been handed out at least once
+        self._lock = threading.Lock()
+
+    def _as_vector(self, embedding: Union[list, np.ndarray]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        if vector.shape != (self.dimension,):
+            raise ValueError(f"Embedding must have shape ({self.dimension},), got {vector.shape}.")
+        return vector
+
+    def _grow(self):
+        capacity = len(self._ids) * 2
+        vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        expires_at = np.full(capacity, np.inf)
+        expires_at[:self._size] = self._expires_at[:self._size]
+        self._vectors = vectors
+        self._alive = alive
+        self._expires_at = expires_at
+        self._payloads.extend([None] * (capacity - len(self._ids)))
+        self._ids.extend([None] * (capacity - len(self._ids)))
+
+    def _allocate_row(self) -> int:
+        # While `compact` copies rows outside the lock, only fresh rows are handed out
+        if self._free_rows and not self._compacting:
+            return self._free_rows.pop()
+        if self._size == len(self._ids):
+            self._grow()
+        row = self._size
+        self._size += 1
+        return row
+
+    def _as_matrix(self, embeddings: Union[list, np.ndarray]) -> np.ndarray:
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != self.dimension:
+            raise ValueError(f"Embeddings must have shape (n, {self.dimension}), got {matrix.shape}.")
+        return matrix
+
+    def _deadline(self, ttl: Optional[float]) -> float:
+        ttl = ttl if ttl is not None else self.ttl
+        return time.monotonic() + ttl if ttl is not None else np.inf
+
+    def _insert(self, vector: np.ndarray, payload=None, expires_at: float = np.inf) -> str:
+        vector_id = get_query_index(self.identifier)
+        if vector_id in self._id_to_row:
+            raise ValueError(f"Vector id {vector_id} already exists.")
+        row = self._allocate_row()
+        self._vectors[row] = vector
+        self._alive[row] = True
+        self._expires_at[row] = expires_at
+        if expires_at != np.inf:
+            self._has_expiry = True
+        self._ids[row] = vector_id
+        self._payloads[row] = payload
+        self._id_to_row[vector_id] = row
+        return vector_id
+
+    def add(self, embedding: Union[list, np.ndarray], payload=None, ttl: Optional[float] = None, **kwargs) -> str:
+        """
+        Add an embedding to the store.
+
+        Parameters:
+        - embedding: The embedding to add, as a list or numpy array.
+        - payload: Optional value kept with the vector and returned by `search_with_payload`.
+        - ttl: Optional seconds until the vector expires, overriding the store's default.
+        - **kwargs: Additional keyword arguments.
+
+        Returns:
+        - The generated id of the stored vector.
+        """
+        vector = normalize(self._as_vector(embedding))
+        expires_at = self._deadline(ttl)
+        with self._lock:
+            return self._insert(vector, payload, expires_at)
+
+    def add_many(self, embeddings: Union[list, np.ndarray], payloads: list = None, ttl: Optional[float] = None, **kwargs) -> list:
+        """
+        Add several embeddings, normalising them as one matrix.
+
+        Returns:
+        - The generated ids, in input order.
+        """
+        if len(embeddings) == 0:
+            return []
+        matrix = normalize(self._as_matrix(embeddings))
+        payloads = payloads if payloads is not None else [None] * len(matrix)
+        expires_at = self._deadline(ttl)
+        with self._lock:
+            return [self._insert(vector, payload, expires_at) for vector, payload in zip(matrix, payloads)]
+
+    def _top_n(self, similarities: np.ndarray, top_n: int, include_distances: bool) -> Tuple[list, list]:
+        if top_n < self._size:
+            candidates = np.argpartition(-similarities, top_n - 1)[:top_n]
+        else:
+            candidates = np.arange(self._size)
+        order = candidates[np.argsort(-similarities[candidates], kind="stable")][:top_n]
+        order = order[similarities[order] > -np.inf]  # Fewer unexpired rows than top_n
+        ids = [self._ids[row] for row in order]
+        distances = (1.0 - similarities[order]).tolist() if include_distances else []
+        return ids, distances
+
+    def search(self, embedding: Union[list, np.ndarray], top_n: int = 1, include_distances: bool = True, **kwargs) -> Tuple[list, list]:
+        """
+        Search for the nearest embeddings by cosine distance.
+
+        Parameters:
+        - embedding: The query embedding, as a list or numpy array.
+        - top_n: The number of top similar results to return.
+        - include_distances: Whether to include distances in the results.
+
+        Returns:
+        - A tuple of two lists: ids of the closest embeddings, and their respective cosine distances.
+        """
+        query = normalize(self._as_vector(embedding))
+        with self._lock:
+            live = len(self._id_to_row)
+            top_n = min(top_n, live)
+            if top_n <= 0:
+                return [], []
+            similarities = self._vectors[:self._size] @ query
+            dead = self._dead_rows(live)
+            if dead is not None:
+                similarities[dead] = -np.inf
+            return self._top_n(similarities, top_n, include_distances)
+
+    def search_many(self, embeddings: Union[list, np.ndarray], top_n: int = 1, include_distances: bool = True, **kwargs) -> list:
+        """
+        Search for several embeddings with a single matrix-matrix product.
+
+        Returns:
+        - One (ids, distances) tuple per query embedding, in input order.
+        """
+        if len(embeddings) == 0:
+            return []
+        queries = normalize(self._as_matrix(embeddings))
+        with self._lock:
+            live = len(self._id_to_row)
+            top_n = min(top_n, live)
+            if top_n <= 0:
+                return [([], []) for _ in range(len(queries))]
+            similarities = queries @ self._vectors[:self._size].T
+            dead = self._dead_rows(live)
+            if dead is not None:
+                similarities[:, dead] = -np.inf
+            return [self._top_n(row, top_n, include_distances) for row in similarities]
+
+    def _dead_rows(self, live: int) -> Optional[np.ndarray]:
+        # Caller holds self._lock. Mask of deleted or expired rows, or None when every row is searchable.
+        if self._has_expiry:
+            return ~self._alive[:self._size] | (self._expires_at[:self._size] <= time.monotonic())
+        if live < self._size:
+            return ~self._alive[:self._size]
+        return None
+
+    def _payloads_for(self, results: list) -> list:
+        with self._lock:
+            return [
+                (ids, distances, [self._payloads[self._id_to_row[vector_id]] if vector_id in self._id_to_row else None
+                                  for vector_id in ids])
+                for ids, distances in results
+            ]
+
+    def search_with_payload(self, embedding: Union[list, np.ndarray], top_n: int = 1, **kwargs) -> Tuple[list, list, list]:
+        """
+        Search like `search` and also return the payload stored with each result.
+        """
+        return self._payloads_for([self.search(embedding, top_n, True)])[0]
+
+    def search_many_with_payload(self, embeddings: Union[list, np.ndarray], top_n: int = 1, **kwargs) -> list:
+        return self._payloads_for(self.search_many(embeddings, top_n, True))
+
+    def delete(self, vector_id: str) -> bool:
+        """
+        Remove a vector from the store. Its row is tombstoned and reused by a later `add`.
+
+        Returns:
+        - True if the id was present, False otherwise.
+        """
+        with self._lock:
+            return self._delete_locked(vector_id)
+
+    def delete_many(self, vector_ids: list) -> int:
+        with self._lock:
+            return sum(self._delete_locked(vector_id) for vector_id in vector_ids)
+
+    def _delete_locked(self, vector_id: str) -> bool:
+        row = self._id_to_row.pop(vector_id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._ids[row] = None
+        self._payloads[row] = None
+        self._free_rows.append(row)
+        return True
+
+    def purge_expired(self, limit: Optional[int] = None) -> int:
+        """
+        Delete up to `limit` expired vectors and return how many were removed. Their rows are reused by later adds
+        or dropped by `compact`.
+        """
+        if not self._has_expiry:
+            return 0
+        with self._lock:
+            rows = np.flatnonzero(self._alive[:self._size] & (self._expires_at[:self._size] <= time.monotonic()))
+            if limit is not None:
+                rows = rows[:limit]
+            return sum(self._delete_locked(self._ids[row]) for row in rows)
+
+    def compact(self, min_fragmentation: float = 0.0) -> int:
+        """
+        Pack live rows into right-sized arrays, dropping the holes left by deletes so searches scan only live rows.
+        Rows are copied outside the lock while readers and writers carry on; the lock is only taken to snapshot the
+        live rows and to swap in the packed arrays, folding in whatever changed meanwhile.
+
+        Parameters:
+        - min_fragmentation: Skip compaction unless at least this fraction of the scanned rows is dead.
+
+        Returns:
+        - The number of rows reclaimed.
+        """
+        with self._lock:
+            size = self._size
+            if self._compacting or size == 0 or len(self._id_to_row) == size or 1 - len(self._id_to_row) / size < min_fragmentation:
+                return 0
+            self._compacting = True
+            rows = np.flatnonzero(self._alive[:size])
+            vectors, ids, payloads = self._vectors, self._ids, self._payloads
+        try:
+            # Rows in the snapshot are never rewritten while _compacting is set: deletes only clear _alive
+            packed_vectors = vectors[rows]
+            packed_ids = [ids[row] for row in rows]
+            packed_payloads = [payloads[row] for row in rows]
+            packed_id_to_row = {vector_id: row for row, vector_id in enumerate(packed_ids)}
+        except BaseException:
+            with self._lock:
+                self._compacting = False
+            raise
+
+        with self._lock:
+            self._compacting = False
+            kept = self._alive[rows]
+            if not kept.all():
+                packed_vectors = packed_vectors[kept]
+                packed_ids = [vector_id for vector_id, keep in zip(packed_ids, kept) if keep]
+                packed_payloads = [payload for payload, keep in zip(packed_payloads, kept) if keep]
+                packed_id_to_row = {vector_id: row for row, vector_id in enumerate(packed_ids)}
+            kept_rows = rows[kept]
+            # Rows handed out during the copy
+            added_rows = np.flatnonzero(self._alive[size:self._size]) + size
+            all_rows = np.concatenate([kept_rows, added_rows])
+            count = len(all_rows)
+            capacity = max(self.initial_capacity, count)
+            new_vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+            new_vectors[:len(kept_rows)] = packed_vectors
+            new_vectors[len(kept_rows):count] = self._vectors[added_rows]
+            new_alive = np.zeros(capacity, dtype=bool)
+            new_alive[:count] = True
+            new_expires_at = np.full(capacity, np.inf)
+            new_expires_at[:count] = self._expires_at[all_rows]
+            new_ids = packed_ids + [self._ids[row] for row in added_rows] + [None] * (capacity - count)
+            new_payloads = packed_payloads + [self._payloads[row] for row in added_rows] + [None] * (capacity - count)
+            reclaimed = self._size - count
+            self._vectors, self._alive, self._expires_at = new_vectors, new_alive, new_expires_at
+            self._ids, self._payloads = new_ids, new_payloads
+            for row in range(len(kept_rows), count):
+                packed_id_to_row[new_ids[row]] = row
+            self._id_to_row = packed_id_to_row
+            self._free_rows = []
+            self._size = count
+        return reclaimed
+
+    def __len__(self) -> int:
+        return len(self._id_to_row)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,57 +1,263 @@
-import uuid
+import io
+import re
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Optional, Tuple
+from typing import Union, Callable
+import numpy as np
 import psycopg2
 from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from pgvector.psycopg2 import register_vector
 from vector_cache.vector_stores.base import VectorStoreInterface
-from typing import Tuple
-from typing import Union, Callable
 from vector_cache.utils.key_util import get_query_index
 
+
+def _copy_text(value: Optional[str]) -> str:
+    # Escapes for COPY's text format
+    if value is None:
+        return "\\N"
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
 class PGVector(VectorStoreInterface):
-    def __init__(self, connection_string: str, table_name: str = "vector_store", identifier: Union[str, Callable, None] = None):
+    supports_payload = True
+    supports_delete = True
+
+    def __init__(self, connection_string: str, table_name: str = "vector_store", identifier: Union[str, Callable, None] = None,
+                 dimension: int = 1536, index_type: Optional[str] = "hnsw", m: int = 16, ef_construction: int = 64,
+                 ef_search: Optional[int] = None, probes: Optional[int] = None, min_connections: Optional[int] = None,
+                 max_connections: int = 10, copy_threshold: int = 1000):
+        """
+        Parameters:
+        - connection_string: libpq connection string or URL.
+        - table_name: Table holding the vectors; created if missing.
+        - dimension: Size of the `vector` column.
+        - index_type: "hnsw" (built when the table is created and maintained on insert), "ivfflat" (built by
+          `build_index` once the table is loaded, since its lists are clustered from the existing rows), or None for
+          exact search.
+        - m, ef_construction: HNSW build parameters.
+        - ef_search: Default `hnsw.ef_search` for searches; more is slower but finds more true neighbours.
+        - probes: Default `ivfflat.probes` for searches.
+        - min_connections, max_connections: Bounds of the thread-safe connection pool. The pool closes connections
+          returned while it already holds `min_connections` idle ones, so it defaults to `max_connections`; a lower
+          value saves server connections at the cost of reconnecting (and re-preparing) under load.
+        - copy_threshold: `add_many` batches of at least this many rows are loaded with COPY instead of a multi-row
+          INSERT.
+        """
+        if index_type not in ("hnsw", "ivfflat", None):
+            raise ValueError("index_type must be 'hnsw', 'ivfflat' or None.")
         self.connection_string = connection_string
         self.table_name = table_name
-        self.conn = psycopg2.connect(self.connection_string)
-        self.create_table()
+        self.dimension = dimension
+        self.index_type = index_type
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.probes = probes
+        self.copy_threshold = copy_threshold
         self.identifier = identifier
+        min_connections = max_connections if min_connections is None else min_connections
+        self.pool = ThreadedConnectionPool(min_connections, max_connections, self.connection_string)
+        # The pool raises once all connections are out; callers wait for one instead
+        self._slots = threading.BoundedSemaphore(max_connections)
+        # Connections whose vector type adapter and prepared statements are set up. Held weakly, so a connection the
+        # pool closes drops out and a new one is always prepared
+        self._prepared = weakref.WeakSet()
+        self._prepared_lock = threading.Lock()
+        self._statement = re.sub(r"\W", "_", table_name)
+        self.create_table()
+
+    @contextmanager
+    def _cursor(self, prepare: bool = True):
+        """
+        Check a connection out of the pool, waiting while all are in use, and run the block in one transaction,
+        committed on success.
+        """
+        with self._slots:
+            conn = self.pool.getconn()
+            try:
+                if prepare and conn not in self._prepared:
+                    self._prepare(conn)
+                with conn:
+                    with conn.cursor() as cur:
+                        yield cur
+            finally:
+                self.pool.putconn(conn, close=bool(conn.closed))
+
+    def _prepare(self, conn):
+        register_vector(conn)
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    PREPARE {self._statement}_search(vector, integer) AS
+                    SELECT id, embedding <=> $1 AS distance FROM {self.table_name} ORDER BY embedding <=> $1 LIMIT $2
+                """)
+                cur.execute(f"""
+                    PREPARE {self._statement}_search_payload(vector, integer) AS
+                    SELECT id, embedding <=> $1 AS distance, payload FROM {self.table_name} ORDER BY embedding <=> $1 LIMIT $2
+                """)
+        with self._prepared_lock:
+            self._prepared.add(conn)
+
     def create_table(self):
-        with self.conn.cursor() as cur:
+        with self._cursor(prepare=False) as cur:
+            cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
             cur.execute(f"""
                 CREATE TABLE IF NOT EXISTS {self.table_name} (
                     id UUID PRIMARY KEY,
-                    embedding vector(1536)
+                    embedding vector({int(self.dimension)}),
+                    payload TEXT
                 )
             """)
-            cur.execute(f"CREATE INDEX IF NOT EXISTS embedding_idx ON {self.table_name} USING ivfflat (embedding vector_cosine_ops)")
-            self.conn.commit()
+            # Tables created before payloads were supported
+            cur.execute(f"ALTER TABLE {self.table_name} ADD COLUMN IF NOT EXISTS payload TEXT")
+            if self.index_type == "hnsw":
+                cur.execute(f"""
+                    CREATE INDEX IF NOT EXISTS {self._statement}_embedding_hnsw ON {self.table_name}
+                    USING hnsw (embedding vector_cosine_ops) WITH (m = {int(self.m)}, ef_construction = {int(self.ef_construction)})
+                """)
+
+    def build_index(self, lists: Optional[int] = None):
+        """
+        Build the ivfflat index from the rows loaded so far, replacing an earlier one. `lists` defaults to pgvector's
+        recommendation: rows / 1000 up to a million rows, and the square root of the row count above that.
+        """
+        with self._cursor(prepare=False) as cur:
+            if lists is None:
+                cur.execute(f"SELECT count(*) FROM {self.table_name}")
+                rows = cur.fetchone()[0]
+                lists = max(1, rows // 1000 if rows <= 1_000_000 else int(rows ** 0.5))
+            cur.execute(f"DROP INDEX IF EXISTS {self._statement}_embedding_ivfflat")
+            cur.execute(f"""
+                CREATE INDEX {self._statement}_embedding_ivfflat ON {self.table_name}
+                USING ivfflat (embedding vector_cosine_ops) WITH (lists = {int(lists)})
+            """)
 
-    def add(self, embedding: list, **kwargs) -> str:
+    def _configure_search(self, cur, ef_search: Optional[int], probes: Optional[int]):
+        # SET LOCAL lasts until the end of the transaction, so pooled connections keep the server defaults
+        ef_search = ef_search if ef_search is not None else self.ef_search
+        probes = probes if probes is not None else self.probes
+        if ef_search is not None:
+            cur.execute(f"SET LOCAL hnsw.ef_search = {int(ef_search)}")
+        if probes is not None:
+            cur.execute(f"SET LOCAL ivfflat.probes = {int(probes)}")
+
+    @staticmethod
+    def _vector(embedding) -> np.ndarray:
+        return np.asarray(embedding, dtype=np.float32)
+
+    def add(self, embedding: list, payload: str = None, **kwargs) -> str:
         vector_id = get_query_index(self.identifier)
-        with self.conn.cursor() as cur:
-            cur.execute(f"INSERT INTO {self.table_name} (id, embedding) VALUES (%s, %s)", (id, embedding))
-            self.conn.commit()
+        with self._cursor() as cur:
+            cur.execute(f"INSERT INTO {self.table_name} (id, embedding, payload) VALUES (%s, %s, %s)",
+                        (vector_id, self._vector(embedding), payload))
         return vector_id
 
-    def search(self, embedding: list, top_n: int = 1, include_distances=True, **kwargs) -> Tuple[list, list]:
-        with self.conn.cursor() as cur:
-            query = f"""
-                SELECT id, 1 - (embedding <=> %s) AS cosine_similarity
-                FROM {self.table_name}
-                ORDER BY cosine_similarity DESC
-                LIMIT %s
-            """
-            cur.execute(query, (embedding, top_n))
+    def add_many(self, embeddings: list, payloads: list = None, **kwargs) -> list:
+        """
+        Insert a batch in one transaction: a multi-row INSERT for small batches, COPY from `copy_threshold` rows.
+        """
+        if len(embeddings) == 0:
+            return []
+        payloads = payloads if payloads is not None else [None] * len(embeddings)
+        vector_ids = [get_query_index(self.identifier) for _ in range(len(embeddings))]
+        with self._cursor() as cur:
+            if len(embeddings) >= self.copy_threshold:
+                buffer = io.StringIO()
+                for vector_id, embedding, payload in zip(vector_ids, embeddings, payloads):
+                    values = ",".join(map(repr, self._vector(embedding).tolist()))
+                    buffer.write(f"{vector_id}\t[{values}]\t{_copy_text(payload)}\n")
+                buffer.seek(0)
+                cur.copy_expert(f"COPY {self.table_name} (id, embedding, payload) FROM STDIN", buffer)
+            else:
+                rows = [(vector_id, self._vector(embedding), payload)
+                        for vector_id, embedding, payload in zip(vector_ids, embeddings, payloads)]
+                execute_values(cur, f"INSERT INTO {self.table_name} (id, embedding, payload) VALUES %s", rows,
+                               page_size=len(rows))
+        return vector_ids
+
+    def search(self, embedding: list, top_n: int = 1, include_distances=True, ef_search: Optional[int] = None,
+               probes: Optional[int] = None, **kwargs) -> Tuple[list, list]:
+        """
+        Search with the prepared statement of the connection. `ef_search` / `probes` override the defaults for this
+        query.
+        """
+        with self._cursor() as cur:
+            self._configure_search(cur, ef_search, probes)
+            cur.execute(f"EXECUTE {self._statement}_search(%s, %s)", (self._vector(embedding), top_n))
             results = cur.fetchall()
 
         ids = [str(result[0]) for result in results]
-        distances = [1 - result[1] for result in results] if include_distances else None
+        distances = [float(result[1]) for result in results] if include_distances else None
 
         return (ids, distances) if include_distances else (ids,)
 
+    def _search_batch(self, cur, embeddings: list, top_n: int, with_payload: bool) -> list:
+        # One round-trip for the batch: each query vector drives an index scan through a lateral join
+        cur.execute(f"""
+            SELECT q.position, r.id, r.distance{", r.payload" if with_payload else ""}
+            FROM unnest(%s::vector[]) WITH ORDINALITY AS q(embedding, position)
+            CROSS JOIN LATERAL (
+                SELECT id, payload, embedding <=> q.embedding AS distance
+                FROM {self.table_name}
+                ORDER BY embedding <=> q.embedding
+                LIMIT %s
+            ) r
+            ORDER BY q.position, r.distance
+        """, ([self._vector(embedding) for embedding in embeddings], top_n))
+        grouped = [[] for _ in embeddings]
+        for row in cur.fetchall():
+            grouped[row[0] - 1].append(row[1:])
+        return grouped
+
+    def search_many(self, embeddings: list, top_n: int = 1, include_distances=True, ef_search: Optional[int] = None,
+                    probes: Optional[int] = None, **kwargs) -> list:
+        if len(embeddings) == 0:
+            return []
+        with self._cursor() as cur:
+            self._configure_search(cur, ef_search, probes)
+            grouped = self._search_batch(cur, embeddings, top_n, with_payload=False)
+        return [([str(row[0]) for row in rows], [float(row[1]) for row in rows] if include_distances else [])
+                for rows in grouped]
+
+    def search_with_payload(self, embedding: list, top_n: int = 1, ef_search: Optional[int] = None,
+                            probes: Optional[int] = None, **kwargs) -> Tuple[list, list, list]:
+        """
+        Search and read the payload column in the same query.
+        """
+        with self._cursor() as cur:
+            self._configure_search(cur, ef_search, probes)
+            cur.execute(f"EXECUTE {self._statement}_search_payload(%s, %s)", (self._vector(embedding), top_n))
+            rows = cur.fetchall()
+        return [str(row[0]) for row in rows], [float(row[1]) for row in rows], [row[2] for row in rows]
+
+    def search_many_with_payload(self, embeddings: list, top_n: int = 1, ef_search: Optional[int] = None,
+                                 probes: Optional[int] = None, **kwargs) -> list:
+        if len(embeddings) == 0:
+            return []
+        with self._cursor() as cur:
+            self._configure_search(cur, ef_search, probes)
+            grouped = self._search_batch(cur, embeddings, top_n, with_payload=True)
+        return [([str(row[0]) for row in rows], [float(row[1]) for row in rows], [row[2] for row in rows])
+                for rows in grouped]
+
+    def delete(self, vector_id: str) -> bool:
+        return self.delete_many([vector_id]) == 1
+
+    def delete_many(self, vector_ids: list) -> int:
+        if len(vector_ids) == 0:
+            return 0
+        with self._cursor() as cur:
+            cur.execute(f"DELETE FROM {self.table_name} WHERE id = ANY(%s::uuid[])", (list(vector_ids),))
+            return cur.rowcount
+
     def close(self):
-        self.conn.close()
+        self.pool.closeall()
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.close()
\ No newline at end of file
+        self.close()
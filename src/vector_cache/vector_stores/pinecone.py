@@ -7,6 +7,8 @@ from typing import Union, Callable
 from vector_cache.utils.key_util import get_query_index
 
 class PineconeVectorStore(VectorStoreInterface):
+    supports_delete = True
+
     def __init__(self, index_name: str, api_key: str, environment: str = 'us-west1-gcp', identifier: Union[str, Callable, None] = None):
         """
         Initialize the Pinecone vector store client.
@@ -54,6 +56,30 @@ class PineconeVectorStore(VectorStoreInterface):
 
         return vector_id
 
+    def add_many(self, embeddings: list, **kwargs) -> list:
+        """
+        Add several embeddings to the Pinecone index with a single upsert.
+
+        Returns:
+        - The generated ids, in input order.
+        """
+        if len(embeddings) == 0:
+            return []
+        vectors = []
+        for embedding in embeddings:
+            if isinstance(embedding, np.ndarray):
+                embedding = embedding.tolist()
+            elif not isinstance(embedding, list):
+                raise ValueError("Embedding must be a list or numpy array.")
+            vectors.append((get_query_index(self.identifier), embedding))
+
+        try:
+            self.index.upsert(vectors=vectors)
+        except Exception as e:
+            raise RuntimeError(f"Failed to add embeddings to Pinecone: {str(e)}")
+
+        return [vector_id for vector_id, _ in vectors]
+
     def search(self, embedding: Union[list, np.ndarray], top_n: int = 1, include_distances: bool = True, **kwargs) -> Tuple[list, list]:
         """
         Search for similar embeddings in the Pinecone index.
@@ -80,6 +106,21 @@ class PineconeVectorStore(VectorStoreInterface):
         except Exception as e:
             raise RuntimeError(f"Failed to search Pinecone index: {str(e)}")
 
+    def delete(self, vector_id: str) -> bool:
+        return self.delete_many([vector_id]) == 1
+
+    def delete_many(self, vector_ids: list) -> int:
+        """
+        Delete several vectors in one request. Pinecone does not report which ids existed, so all are counted.
+        """
+        if len(vector_ids) == 0:
+            return 0
+        try:
+            self.index.delete(ids=list(vector_ids))
+        except Exception as e:
+            raise RuntimeError(f"Failed to delete embeddings from Pinecone: {str(e)}")
+        return len(vector_ids)
+
     def close(self):
         """Close the Pinecone client (not strictly necessary, but good practice)."""
         pinecone.deinit()
@@ -1,57 +1,281 @@
 import uuid
-from qdrant_client import QdrantClient
+import numpy as np
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from qdrant_client.http import models
 from vector_cache.vector_stores.base import VectorStoreInterface
-from typing import Tuple
+from typing import Optional, Tuple
 from typing import Union, Callable
 from vector_cache.utils.key_util import get_query_index
 
+QUANTIZATIONS = ("scalar", "binary")
+
+
 class QdrantStore(VectorStoreInterface):
-    def __init__(self, collection_name: str = "default_collection", host: str = "localhost", port: int = 6333, identifier: Union[str, Callable, None] = None):
-        self.client = QdrantClient(host=host, port=port)
+    supports_payload = True
+    supports_delete = True
+
+    def __init__(self, collection_name: str = "default_collection", host: str = "localhost", port: int = 6333,
+                 identifier: Union[str, Callable, None] = None, dimension: int = 1536, location: Optional[str] = None,
+                 path: Optional[str] = None, url: Optional[str] = None, api_key: Optional[str] = None,
+                 prefer_grpc: bool = False, grpc_port: int = 6334, hnsw_m: Optional[int] = None,
+                 hnsw_ef_construct: Optional[int] = None, hnsw_ef: Optional[int] = None,
+                 quantization: Optional[str] = None, oversampling: Optional[float] = None,
+                 batch_size: int = 256, wait: bool = True):
+        """
+        Parameters:
+        - dimension: Size of the collection's vectors.
+        - location / path: Run Qdrant embedded in the process instead of connecting to a server: `location=":memory:"`
+          keeps the collection in memory, `path` persists it to a directory. Useful for tests and small
+          deployments; the async methods then run the embedded client in a worker thread.
+        - url, api_key: Connect to a URL (e.g. Qdrant Cloud) instead of host and port.
+        - prefer_grpc: Use gRPC on `grpc_port` instead of HTTP, which is faster for large batches.
+        - hnsw_m, hnsw_ef_construct: HNSW parameters of a newly created collection; None keeps Qdrant's defaults.
+        - hnsw_ef: Default `ef` of searches.
+        - quantization: "scalar" (int8) or "binary" quantization of a newly created collection, kept in RAM with the
+          original vectors on disk. Searches rescore the candidates with the original vectors.
+        - oversampling: With quantization, fetch this many times `top_n` candidates before rescoring.
+        - batch_size: Points per upsert request in `add_many`.
+        - wait: Whether writes wait until the points are indexed. With False, upserts return once Qdrant has
+          accepted them, and a search right afterwards may not see them yet.
+        """
+        if quantization not in QUANTIZATIONS + (None,):
+            raise ValueError(f"quantization must be one of {QUANTIZATIONS} or None.")
+        if location is not None or path is not None:
+            self.client = QdrantClient(location=location, path=path)
+            # An async client would open a second, separate embedded instance
+            self.async_client = None
+        else:
+            options = dict(url=url, api_key=api_key, prefer_grpc=prefer_grpc, grpc_port=grpc_port)
+            if url is None:
+                options.update(host=host, port=port)
+            self.client = QdrantClient(**options)
+            self.async_client = AsyncQdrantClient(**options)
         self.collection_name = collection_name
+        self.dimension = dimension
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct
+        self.quantization = quantization
+        self.batch_size = batch_size
+        self.wait = wait
+        self.search_params = None
+        if hnsw_ef is not None or quantization is not None:
+            self.search_params = models.SearchParams(
+                hnsw_ef=hnsw_ef,
+                quantization=models.QuantizationSearchParams(rescore=True, oversampling=oversampling) if quantization else None
+            )
         self.create_collection()
         self.identifier = identifier
 
     def create_collection(self):
+        if self.client.collection_exists(self.collection_name):
+            return
+        hnsw_config = None
+        if self.hnsw_m is not None or self.hnsw_ef_construct is not None:
+            hnsw_config = models.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+        quantization_config = None
+        if self.quantization == "scalar":
+            quantization_config = models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, always_ram=True)
+            )
+        elif self.quantization == "binary":
+            quantization_config = models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
         try:
             self.client.create_collection(
                 collection_name=self.collection_name,
-                vectors_config=models.VectorParams(size=1536, distance=models.Distance.COSINE)
+                vectors_config=models.VectorParams(size=self.dimension, distance=models.Distance.COSINE,
+                                                   on_disk=True if quantization_config else None),
+                hnsw_config=hnsw_config,
+                quantization_config=quantization_config
             )
         except Exception as e:
+            # Another worker created it in the meantime
             if "already exists" not in str(e):
                 raise
 
-    def add(self, embedding: list,  **kwargs) -> str:
+    @staticmethod
+    def _vector(embedding) -> list:
+        return np.asarray(embedding, dtype=np.float32).tolist()
+
+    def _point(self, vector_id: str, embedding: list, payload: str = None) -> models.PointStruct:
+        return models.PointStruct(id=vector_id, vector=self._vector(embedding),
+                                  payload={"response": payload} if payload is not None else None)
+
+    def _batches(self, embeddings: list, payloads: list = None):
+        vector_ids = [get_query_index(self.identifier) for _ in embeddings]
+        payloads = payloads if payloads is not None else [None] * len(embeddings)
+        points = [self._point(vector_id, embedding, payload) for vector_id, embedding, payload in zip(vector_ids, embeddings, payloads)]
+        return vector_ids, [points[start:start + self.batch_size] for start in range(0, len(points), self.batch_size)]
+
+    @staticmethod
+    def _payload_of(point) -> str:
+        return point.payload.get("response") if point.payload else None
+
+    def _requests(self, embeddings: list, top_n: int, with_payload) -> list:
+        return [
+            models.QueryRequest(query=self._vector(embedding), limit=top_n, with_payload=with_payload, params=self.search_params)
+            for embedding in embeddings
+        ]
+
+    @staticmethod
+    def _ids_and_distances(points: list, include_distances=True) -> Tuple[list, list]:
+        # Qdrant returns cosine similarity; convert it to distance
+        return [str(point.id) for point in points], [1 - point.score for point in points] if include_distances else []
+
+    def _with_payloads(self, points: list) -> Tuple[list, list, list]:
+        return ([str(point.id) for point in points], [1 - point.score for point in points],
+                [self._payload_of(point) for point in points])
+
+    def add(self, embedding: list, payload: str = None, wait: Optional[bool] = None, **kwargs) -> str:
         vector_id = get_query_index(self.identifier)
 
         self.client.upsert(
             collection_name=self.collection_name,
-            points=[models.PointStruct(id=id, vector=embedding)]
+            points=[self._point(vector_id, embedding, payload)],
+            wait=self.wait if wait is None else wait
         )
-        return id
+        return vector_id
+
+    def add_many(self, embeddings: list, payloads: list = None, wait: Optional[bool] = None, **kwargs) -> list:
+        """
+        Upsert points in requests of `batch_size`.
+        """
+        if len(embeddings) == 0:
+            return []
+        vector_ids, batches = self._batches(embeddings, payloads)
+        for points in batches:
+            self.client.upsert(collection_name=self.collection_name, points=points,
+                               wait=self.wait if wait is None else wait)
+        return vector_ids
 
     def search(self, embedding: list, top_n: int = 1, include_distances=True, **kwargs) -> Tuple[list, list]:
-        search_result = self.client.search(
+        search_result = self.client.query_points(
+            collection_name=self.collection_name,
+            query=self._vector(embedding),
+            limit=top_n,
+            with_payload=False,
+            search_params=self.search_params
+        ).points
+
+        ids, distances = self._ids_and_distances(search_result)
+        return (ids, distances) if include_distances else (ids,)
+
+    def search_many(self, embeddings: list, top_n: int = 1, include_distances=True, **kwargs) -> list:
+        if len(embeddings) == 0:
+            return []
+        batch_result = self.client.query_batch_points(
             collection_name=self.collection_name,
-            query_vector=embedding,
-            limit=top_n
+            requests=self._requests(embeddings, top_n, False)
         )
+        return [self._ids_and_distances(response.points, include_distances) for response in batch_result]
 
-        ids = [str(point.id) for point in search_result]
+    def search_with_payload(self, embedding: list, top_n: int = 1, **kwargs) -> Tuple[list, list, list]:
+        """
+        Search and return each point's stored response payload in the same request.
+        """
+        return self.search_many_with_payload([embedding], top_n)[0]
 
-        if include_distances:
-            distances = [1 - point.score for point in search_result]  # Convert similarity to distance
-            return ids, distances
-        else:
-            return (ids,)
+    def search_many_with_payload(self, embeddings: list, top_n: int = 1, **kwargs) -> list:
+        if len(embeddings) == 0:
+            return []
+        batch_result = self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=self._requests(embeddings, top_n, ["response"])
+        )
+        return [self._with_payloads(response.points) for response in batch_result]
+
+    # In embedded mode there is no async client, and the base class runs the blocking methods in a worker thread
+
+    async def add_async(self, embedding: list, payload: str = None, wait: Optional[bool] = None, **kwargs) -> str:
+        if self.async_client is None:
+            return await super().add_async(embedding, payload=payload, wait=wait, **kwargs)
+        vector_id = get_query_index(self.identifier)
+        await self.async_client.upsert(
+            collection_name=self.collection_name,
+            points=[self._point(vector_id, embedding, payload)],
+            wait=self.wait if wait is None else wait
+        )
+        return vector_id
+
+    async def add_many_async(self, embeddings: list, payloads: list = None, wait: Optional[bool] = None, **kwargs) -> list:
+        if self.async_client is None:
+            return await super().add_many_async(embeddings, payloads=payloads, wait=wait, **kwargs)
+        if len(embeddings) == 0:
+            return []
+        vector_ids, batches = self._batches(embeddings, payloads)
+        for points in batches:
+            await self.async_client.upsert(collection_name=self.collection_name, points=points,
+                                           wait=self.wait if wait is None else wait)
+        return vector_ids
+
+    async def search_async(self, embedding: list, top_n: int = 1, include_distances=True, **kwargs) -> Tuple[list, list]:
+        if self.async_client is None:
+            return await super().search_async(embedding, top_n, include_distances, **kwargs)
+        search_result = await self.async_client.query_points(
+            collection_name=self.collection_name,
+            query=self._vector(embedding),
+            limit=top_n,
+            with_payload=False,
+            search_params=self.search_params
+        )
+        return self._ids_and_distances(search_result.points, include_distances)
+
+    async def search_many_async(self, embeddings: list, top_n: int = 1, include_distances=True, **kwargs) -> list:
+        if self.async_client is None:
+            return await super().search_many_async(embeddings, top_n, include_distances, **kwargs)
+        if len(embeddings) == 0:
+            return []
+        batch_result = await self.async_client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=self._requests(embeddings, top_n, False)
+        )
+        return [self._ids_and_distances(response.points, include_distances) for response in batch_result]
+
+    async def search_with_payload_async(self, embedding: list, top_n: int = 1, **kwargs) -> Tuple[list, list, list]:
+        return (await self.search_many_with_payload_async([embedding], top_n))[0]
+
+    async def search_many_with_payload_async(self, embeddings: list, top_n: int = 1, **kwargs) -> list:
+        if self.async_client is None:
+            return await super().search_many_with_payload_async(embeddings, top_n, **kwargs)
+        if len(embeddings) == 0:
+            return []
+        batch_result = await self.async_client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=self._requests(embeddings, top_n, ["response"])
+        )
+        return [self._with_payloads(response.points) for response in batch_result]
+
+    def delete(self, vector_id: str) -> bool:
+        return self.delete_many([vector_id]) == 1
+
+    def delete_many(self, vector_ids: list) -> int:
+        """
+        Delete several points in one request. Qdrant does not report which ids existed, so all are counted.
+        """
+        if len(vector_ids) == 0:
+            return 0
+        self.client.delete(collection_name=self.collection_name, points_selector=models.PointIdsList(points=list(vector_ids)))
+        return len(vector_ids)
+
+    async def delete_async(self, vector_id: str) -> bool:
+        return await self.delete_many_async([vector_id]) == 1
+
+    async def delete_many_async(self, vector_ids: list) -> int:
+        if self.async_client is None:
+            return await super().delete_many_async(vector_ids)
+        if len(vector_ids) == 0:
+            return 0
+        await self.async_client.delete(collection_name=self.collection_name, points_selector=models.PointIdsList(points=list(vector_ids)))
+        return len(vector_ids)
 
     def close(self):
         self.client.close()
 
+    async def close_async(self):
+        if self.async_client is not None:
+            await self.async_client.close()
+
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.close()
\ No newline at end of file
+        self.close()
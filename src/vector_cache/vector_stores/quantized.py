@@ -0,0 +1,452 @@
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Optional, Tuple, Union
+import numpy as np
+from vector_cache.vector_stores.base import VectorStoreInterface
+from vector_cache.vector_stores.numpy_store import normalize
+from vector_cache.utils.key_util import get_query_index
+
+# Rows scanned per block, which bounds the temporary float32 copy made while scanning codes
+_SCAN_BLOCK_ROWS = 8192
+_PQ_CENTROIDS = 256
+
+
+def _train_pq_codebooks(vectors: np.ndarray, subvectors: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Run k-means in each subspace. Returns codebooks of shape (subvectors, centroids, dimension // subvectors).
+    """
+    count, dimension = vectors.shape
+    sub_dimension = dimension // subvectors
+    centroids = min(_PQ_CENTROIDS, count)
+    codebooks = np.zeros((subvectors, _PQ_CENTROIDS, sub_dimension), dtype=np.float32)
+    for m in range(subvectors):
+        data = vectors[:, m * sub_dimension:(m + 1) * sub_dimension]
+        book = data[rng.choice(count, centroids, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmin((book * book).sum(axis=1) - 2.0 * data @ book.T, axis=1)
+            sums = np.zeros_like(book)
+            np.add.at(sums, assignment, data)
+            sizes = np.bincount(assignment, minlength=centroids)
+            empty = sizes == 0
+            book[~empty] = sums[~empty] / sizes[~empty, None]
+            # Re-seed empty clusters from random points so every code stays useful
+            if empty.any():
+                book[empty] = data[rng.choice(count, int(empty.sum()))]
+        codebooks[m, :centroids] = book
+        if centroids < _PQ_CENTROIDS:
+            codebooks[m, centroids:] = book[0]
+    return codebooks
+
+
+class QuantizedVectorStore(VectorStoreInterface):
+    supports_payload = True
+    supports_expiry = True
+    supports_delete = True
+
+    def __init__(self, dimension: int, quantization: str = "int8", rerank: Optional[str] = "disk",
+                 rerank_candidates: int = 32, rerank_path: Optional[str] = None, pq_subvectors: Optional[int] = None,
+                 pq_train_size: int = 4096, pq_iterations: int = 15, initial_capacity: int = 1024,
+                 seed: Optional[int] = None, identifier: Union[str, Callable, None] = None, ttl: Optional[float] = None):
+        """
+        Initialize an in-process vector store that scans compressed codes instead of float32 vectors.
+
+        With "int8" each normalised vector is kept as int8 codes plus one float32 scale (about 4x smaller than
+        float32). With "pq" (product quantization) it is split into `pq_subvectors` pieces, each replaced by the
+        one-byte id of its nearest centroid (dimension * 4 / pq_subvectors times smaller, e.g. 32x at the default
+        of dimension / 8). PQ codebooks are trained once `pq_train_size` vectors have been added, on a sample of that size; until then searches are
+        exact over the vectors seen so far. Call `train` to train up front on a sample instead.
+
+        Quantized scores are approximate. With `rerank`, full vectors are also kept, in RAM ("memory") or in a
+        memory-mapped file ("disk"), and the best `rerank_candidates` codes are re-scored exactly, so returned
+        distances, and therefore the `cosine_threshold` decision, are exact. Only the candidate set is approximate.
+        With `rerank=None` only codes are kept and distances are approximate.
+
+        Parameters:
+        - dimension: The dimension of the vectors to be stored.
+        - quantization: "int8" or "pq".
+        - rerank: "disk" (the default) keeps full vectors out of RAM in the page cache. "memory" keeps them in RAM,
+          which avoids page faults on re-scoring but costs dimension * 4 bytes per vector on top of the codes, so
+          the store then uses more RAM than an unquantized one. None keeps only the codes.
+        - rerank_candidates: How many approximate candidates are re-scored exactly per query.
+        - rerank_path: File holding the full vectors for rerank="disk". It is overwritten on open. Defaults to a
+          temporary file that is removed on `close`.
+        - pq_subvectors: Subvectors per vector for "pq"; must divide dimension. Defaults to dimension // 8.
+        - pq_train_size: Vectors collected before PQ codebooks are trained automatically.
+        - pq_iterations: k-means iterations per subspace.
+        - initial_capacity: The number of rows to allocate up front.
+        - seed: Seed for PQ training.
+        - identifier: How to identify different_keys, can be prefix string, a function or None (default)
+        - ttl: Default seconds after which an added vector expires and is no longer returned by searches. `add` and
+          `add_many` accept a per-call `ttl`. Expired rows are reclaimed by `purge_expired` and reused by later adds.
+        """
+        if dimension <= 0:
+            raise ValueError("dimension must be a positive integer.")
+        if quantization not in ("int8", "pq"):
+            raise ValueError("quantization must be 'int8' or 'pq'.")
+        if rerank not in ("memory", "disk", None):
+            raise ValueError("rerank must be 'memory', 'disk' or None.")
+        if quantization == "pq":
+            pq_subvectors = pq_subvectors or dimension // 8
+            if pq_subvectors <= 0 or dimension % pq_subvectors:
+                raise ValueError(f"pq_subvectors must be a positive divisor of dimension ({dimension}).")
+        self.dimension = dimension
+        self.quantization = quantization
+        self.rerank = rerank
+        self.rerank_candidates = max(1, rerank_candidates)
+        self.pq_subvectors = pq_subvectors
+        self.pq_train_size = max(_PQ_CENTROIDS, pq_train_size)
+        self.pq_iterations = pq_iterations
+        self.identifier = identifier
+        self.ttl = ttl
+        self._rng = np.random.default_rng(seed)
+        capacity = max(1, initial_capacity)
+
+        if quantization == "int8":
+            self._codes = np.zeros((capacity, dimension), dtype=np.int8)
+            self._scales = np.zeros(capacity, dtype=np.float32)
+        else:
+            # Column-major, so the scan reads each subvector's codes contiguously
+            self._codes = np.zeros((capacity, pq_subvectors), dtype=np.uint8, order="F")
+            self._codebooks = None
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._expires_at = np.full(capacity, np.inf)  # time.monotonic() deadlines
+        self._has_expiry = False
+        self._ids = [None] * capacity
+        self._payloads = [None] * capacity
+        self._id_to_row = {}
+        self._free_rows = []
+        self._size = 0  # High-water mark: rows [0, _size) have been handed out at least once
+        self._lock = threading.Lock()
+
+        self._owns_rerank_file = False
+        self._rerank_path = None
+        self._full = None
+        if rerank == "memory":
+            self._full = np.zeros((capacity, dimension), dtype=np.float32)
+        elif rerank == "disk":
+            if rerank_path is None:
+                handle, rerank_path = tempfile.mkstemp(prefix="vector-cache-rerank-", suffix=".f32")
+                os.close(handle)
+                self._owns_rerank_file = True
+            self._rerank_path = rerank_path
+            self._full = self._open_rerank_file(capacity, fresh=True)
+        # Untrained PQ searches exactly over these until the codebooks exist
+        self._pending = np.zeros((capacity, dimension), dtype=np.float32) if quantization == "pq" and rerank is None else None
+
+    @property
+    def trained(self) -> bool:
+        return self.quantization == "int8" or self._codebooks is not None
+
+    @property
+    def bytes_per_vector(self) -> int:
+        """RAM used per stored vector by codes and, for rerank="memory", the full vector."""
+        code_bytes = self.dimension + 4 if self.quantization == "int8" else self.pq_subvectors
+        return code_bytes + (self.dimension * 4 if self.rerank == "memory" else 0)
+
+    def _open_rerank_file(self, capacity: int, fresh: bool = False) -> np.memmap:
+        with open(self._rerank_path, "wb" if fresh else "r+b") as f:
+            f.truncate(capacity * self.dimension * 4)
+        return np.memmap(self._rerank_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+
+    def _as_vector(self, embedding: Union[list, np.ndarray]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        if vector.shape != (self.dimension,):
+            raise ValueError(f"Embedding must have shape ({self.dimension},), got {vector.shape}.")
+        return vector
+
+    def _as_matrix(self, embeddings: Union[list, np.ndarray]) -> np.ndarray:
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != self.dimension:
+            raise ValueError(f"Embeddings must have shape (n, {self.dimension}), got {matrix.shape}.")
+        return matrix
+
+    def _grow(self):
+        old_capacity = len(self._ids)
+        capacity = old_capacity * 2
+
+        def grown(array: np.ndarray) -> np.ndarray:
+            bigger = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype, order="F" if np.isfortran(array) else "C")
+            bigger[:self._size] = array[:self._size]
+            return bigger
+
+        self._codes = grown(self._codes)
+        if self.quantization == "int8":
+            self._scales = grown(self._scales)
+        self._alive = grown(self._alive)
+        expires_at = np.full(capacity, np.inf)
+        expires_at[:self._size] = self._expires_at[:self._size]
+        self._expires_at = expires_at
+        if self._pending is not None:
+            self._pending = grown(self._pending)
+        if self.rerank == "memory":
+            self._full = grown(self._full)
+        elif self.rerank == "disk":
+            self._full.flush()
+            self._full = self._open_rerank_file(capacity)
+        self._ids.extend([None] * (capacity - old_capacity))
+        self._payloads.extend([None] * (capacity - old_capacity))
+
+    def _allocate_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+        if self._size == len(self._ids):
+            self._grow()
+        row = self._size
+        self._size += 1
+        return row
+
+    def _encode(self, vectors: np.ndarray, rows: np.ndarray):
+        if self.quantization == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._codes[rows] = np.rint(vectors / scales[:, None]).astype(np.int8)
+            self._scales[rows] = scales
+        elif self._codebooks is not None:
+            sub_dimension = self.dimension // self.pq_subvectors
+            for m, book in enumerate(self._codebooks):
+                data = vectors[:, m * sub_dimension:(m + 1) * sub_dimension]
+                self._codes[rows, m] = np.argmin((book * book).sum(axis=1) - 2.0 * data @ book.T, axis=1)
+
+    def _full_vectors(self) -> np.ndarray:
+        return self._full if self._full is not None else self._pending
+
+    def _train(self, sample: np.ndarray):
+        # Caller holds self._lock
+        if self._codebooks is not None and self._full_vectors() is None and self._alive[:self._size].any():
+            # Without rerank the original vectors are dropped once encoded, so stored codes cannot be re-encoded
+            raise ValueError("Retraining PQ codebooks requires rerank full vectors; create the store with "
+                             "rerank='memory' or 'disk', or train once before adding vectors.")
+        self._codebooks = _train_pq_codebooks(sample, self.pq_subvectors, self.pq_iterations, self._rng)
+        rows = np.flatnonzero(self._alive[:self._size])
+        if len(rows):
+            self._encode(self._full_vectors()[rows], rows)
+        self._pending = None
+
+    def train(self, embeddings: Union[list, np.ndarray]):
+        """
+        Train the PQ codebooks on a representative sample (at least a few thousand vectors is best). Vectors
+        already stored are encoded with the new codebooks. No-op for "int8".
+
+        Retraining a store that already holds vectors needs their full vectors, i.e. `rerank` set; otherwise it
+        raises ValueError.
+        """
+        if self.quantization != "pq":
+            return
+        sample = normalize(self._as_matrix(embeddings))
+        with self._lock:
+            self._train(sample)
+
+    def _deadline(self, ttl: Optional[float]) -> float:
+        ttl = ttl if ttl is not None else self.ttl
+        return time.monotonic() + ttl if ttl is not None else np.inf
+
+    def _insert_many(self, vectors: np.ndarray, payloads: list = None, expires_at: float = np.inf) -> list:
+        # Caller holds self._lock
+        ids = [get_query_index(self.identifier) for _ in range(len(vectors))]
+        if len(set(ids)) != len(ids) or any(vector_id in self._id_to_row for vector_id in ids):
+            raise ValueError("Vector id already exists.")
+        rows = []
+        payloads = payloads if payloads is not None else [None] * len(ids)
+        for vector_id, payload in zip(ids, payloads):
+            row = self._allocate_row()
+            self._ids[row] = vector_id
+            self._payloads[row] = payload
+            self._id_to_row[vector_id] = row
+            rows.append(row)
+        rows = np.asarray(rows)
+        full = self._full_vectors()
+        if full is not None:
+            full[rows] = vectors
+        self._encode(vectors, rows)
+        self._alive[rows] = True
+        self._expires_at[rows] = expires_at
+        if expires_at != np.inf:
+            self._has_expiry = True
+        if not self.trained and len(self._id_to_row) >= self.pq_train_size:
+            rows = np.flatnonzero(self._alive[:self._size])
+            if len(rows) > self.pq_train_size:
+                rows = self._rng.choice(rows, self.pq_train_size, replace=False)
+            self._train(self._full_vectors()[np.sort(rows)])
+        return ids
+
+    def add(self, embedding: Union[list, np.ndarray], payload=None, ttl: Optional[float] = None, **kwargs) -> str:
+        """
+        Add an embedding to the store.
+
+        Parameters:
+        - embedding: The embedding to add, as a list or numpy array.
+        - payload: Optional value kept with the vector and returned by `search_with_payload`.
+        - ttl: Optional seconds until the vector expires, overriding the store's default.
+        - **kwargs: Additional keyword arguments.
+
+        Returns:
+        - The generated id of the stored vector.
+        """
+        vector = normalize(self._as_vector(embedding))
+        expires_at = self._deadline(ttl)
+        with self._lock:
+            return self._insert_many(vector[None, :], [payload], expires_at)[0]
+
+    def add_many(self, embeddings: Union[list, np.ndarray], payloads: list = None, ttl: Optional[float] = None, **kwargs) -> list:
+        """
+        Add several embeddings, quantizing them as one matrix.
+
+        Returns:
+        - The generated ids, in input order.
+        """
+        if len(embeddings) == 0:
+            return []
+        matrix = normalize(self._as_matrix(embeddings))
+        expires_at = self._deadline(ttl)
+        with self._lock:
+            return self._insert_many(matrix, payloads, expires_at)
+
+    def _approximate_similarities(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Scores of every row for each query, shape (len(queries), _size). Exact while PQ is untrained.
+        """
+        size = self._size
+        if not self.trained:
+            return queries @ self._full_vectors()[:size].T
+        similarities = np.empty((len(queries), size), dtype=np.float32)
+        if self.quantization == "int8":
+            for start in range(0, size, _SCAN_BLOCK_ROWS):
+                stop = min(start + _SCAN_BLOCK_ROWS, size)
+                block = self._codes[start:stop].astype(np.float32)
+                similarities[:, start:stop] = (queries @ block.T) * self._scales[start:stop]
+            return similarities
+        sub_dimension = self.dimension // self.pq_subvectors
+        for position, query in enumerate(queries):
+            # Lookup table of query-subvector x centroid inner products, shape (subvectors, centroids)
+            table = np.einsum("mkd,md->mk", self._codebooks, query.reshape(self.pq_subvectors, sub_dimension))
+            scores = similarities[position]
+            scores[:] = 0.0
+            for m in range(self.pq_subvectors):
+                scores += table[m].take(self._codes[:size, m])
+        return similarities
+
+    def _top_n(self, query: np.ndarray, similarities: np.ndarray, top_n: int, include_distances: bool) -> Tuple[list, list]:
+        exact = not self.trained
+        candidates_wanted = top_n if exact or self._full is None else max(top_n, self.rerank_candidates)
+        if candidates_wanted < self._size:
+            candidates = np.argpartition(-similarities, candidates_wanted - 1)[:candidates_wanted]
+        else:
+            candidates = np.arange(self._size)
+        candidates = candidates[np.isfinite(similarities[candidates])]
+        if not exact and self._full is not None:
+            # Rerank with full vectors so the returned distances are exact
+            candidates = np.sort(candidates)  # Ascending rows keep reads from a memory-mapped file sequential
+            scores = self._full[candidates] @ query
+        else:
+            scores = similarities[candidates]
+        order = np.argsort(-scores, kind="stable")[:top_n]
+        ids = [self._ids[row] for row in candidates[order]]
+        distances = (1.0 - scores[order]).astype(float).tolist() if include_distances else []
+        return ids, distances
+
+    def search(self, embedding: Union[list, np.ndarray], top_n: int = 1, include_distances: bool = True, **kwargs) -> Tuple[list, list]:
+        """
+        Search for the nearest embeddings by cosine distance.
+
+        Parameters:
+        - embedding: The query embedding, as a list or numpy array.
+        - top_n: The number of top similar results to return.
+        - include_distances: Whether to include distances in the results.
+
+        Returns:
+        - A tuple of two lists: ids of the closest embeddings, and their respective cosine distances.
+        """
+        return self.search_many(self._as_vector(embedding)[None, :], top_n, include_distances)[0]
+
+    def search_many(self, embeddings: Union[list, np.ndarray], top_n: int = 1, include_distances: bool = True, **kwargs) -> list:
+        """
+        Search for several embeddings in one scan of the codes.
+
+        Returns:
+        - One (ids, distances) tuple per query embedding, in input order.
+        """
+        if len(embeddings) == 0:
+            return []
+        queries = normalize(self._as_matrix(embeddings))
+        with self._lock:
+            live = len(self._id_to_row)
+            top_n = min(top_n, live)
+            if top_n <= 0:
+                return [([], []) for _ in range(len(queries))]
+            similarities = self._approximate_similarities(queries)
+            if self._has_expiry:
+                similarities[:, ~self._alive[:self._size] | (self._expires_at[:self._size] <= time.monotonic())] = -np.inf
+            elif live < self._size:
+                similarities[:, ~self._alive[:self._size]] = -np.inf
+            return [self._top_n(query, row, top_n, include_distances) for query, row in zip(queries, similarities)]
+
+    def _payloads_for(self, results: list) -> list:
+        with self._lock:
+            return [
+                (ids, distances, [self._payloads[self._id_to_row[vector_id]] if vector_id in self._id_to_row else None
+                                  for vector_id in ids])
+                for ids, distances in results
+            ]
+
+    def search_with_payload(self, embedding: Union[list, np.ndarray], top_n: int = 1, **kwargs) -> Tuple[list, list, list]:
+        """
+        Search like `search` and also return the payload stored with each result.
+        """
+        return self._payloads_for([self.search(embedding, top_n, True)])[0]
+
+    def search_many_with_payload(self, embeddings: Union[list, np.ndarray], top_n: int = 1, **kwargs) -> list:
+        return self._payloads_for(self.search_many(embeddings, top_n, True))
+
+    def delete(self, vector_id: str) -> bool:
+        """
+        Remove a vector from the store. Its row is tombstoned and reused by a later `add`.
+
+        Returns:
+        - True if the id was present, False otherwise.
+        """
+        with self._lock:
+            return self._delete_locked(vector_id)
+
+    def delete_many(self, vector_ids: list) -> int:
+        with self._lock:
+            return sum(self._delete_locked(vector_id) for vector_id in vector_ids)
+
+    def _delete_locked(self, vector_id: str) -> bool:
+        row = self._id_to_row.pop(vector_id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._ids[row] = None
+        self._payloads[row] = None
+        self._free_rows.append(row)
+        return True
+
+    def purge_expired(self, limit: Optional[int] = None) -> int:
+        """
+        Delete up to `limit` expired vectors and return how many were removed. Their rows are reused by later adds.
+        """
+        if not self._has_expiry:
+            return 0
+        with self._lock:
+            rows = np.flatnonzero(self._alive[:self._size] & (self._expires_at[:self._size] <= time.monotonic()))
+            if limit is not None:
+                rows = rows[:limit]
+            return sum(self._delete_locked(self._ids[row]) for row in rows)
+
+    def __len__(self) -> int:
+        return len(self._id_to_row)
+
+    def close(self):
+        if self.rerank == "disk" and self._full is not None:
+            self._full.flush()
+            self._full = None
+            if self._owns_rerank_file:
+                os.remove(self._rerank_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
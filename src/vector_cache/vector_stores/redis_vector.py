@@ -1,16 +1,27 @@
+import asyncio
 from typing import Tuple, Union
 import uuid
 import numpy as np
 from redis import Redis
+import redis.asyncio
 from redis.commands.search.field import VectorField
-from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+try:
+    from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+except ImportError:  # renamed in redis-py 6
+    from redis.commands.search.index_definition import IndexDefinition, IndexType
 from redis.commands.search.query import Query
 from vector_cache.vector_stores.base import VectorStoreInterface
-from typing import Union, Callable
+from typing import Union, Callable, Optional
 from vector_cache.utils.key_util import get_query_index
 
 class RedisVectorStore(VectorStoreInterface):
-    def __init__(self, index_name: str, redis_url: str = "redis://localhost:6379", vector_dim: int = 1536, identifier: Union[str, Callable, None] = None):
+    supports_payload = True
+    supports_expiry = True
+    supports_delete = True
+
+    def __init__(self, index_name: str, redis_url: str = "redis://localhost:6379", vector_dim: int = 1536, identifier: Union[str, Callable, None] = None,
+                 connection_pool: redis.ConnectionPool = None, async_connection_pool: redis.asyncio.ConnectionPool = None,
+                 ttl: Optional[int] = None):
         """
         Initialize the Redis vector store client.
 
@@ -18,10 +29,23 @@ class RedisVectorStore(VectorStoreInterface):
         - index_name: The name of the Redis index to use.
         - redis_url: The URL to connect to Redis.
         - vector_dim: The dimension of the vectors to be stored.
+        - connection_pool: Optional pool shared with other clients of the same server (e.g. `RedisStorage`);
+          redis_url is then ignored.
+        - async_connection_pool: The same for the asyncio client.
+        - ttl: Default seconds after which an embedding's hash expires. Redis removes expired hashes from the
+          index itself, so searches never see them and `purge_expired` has nothing to do.
         """
-        self.redis_client = Redis.from_url(redis_url)
+        if connection_pool is not None:
+            self.redis_client = Redis(connection_pool=connection_pool)
+        else:
+            self.redis_client = Redis.from_url(redis_url)
+        if async_connection_pool is not None:
+            self.async_redis_client = redis.asyncio.Redis(connection_pool=async_connection_pool)
+        else:
+            self.async_redis_client = redis.asyncio.Redis.from_url(redis_url)
         self.index_name = index_name
         self.vector_dim = vector_dim
+        self.ttl = ttl
         self.create_index()
         self.identifier = identifier
 
@@ -40,12 +64,14 @@ class RedisVectorStore(VectorStoreInterface):
                 definition=IndexDefinition(prefix=[f"{self.index_name}:"], index_type=IndexType.HASH)
             )
 
-    def add(self, embedding: list, **kwargs) -> str:
+    def add(self, embedding: list, payload: str = None, ttl: Optional[int] = None, **kwargs) -> str:
         """
         Add an embedding to the Redis index.
 
         Parameters:
         - embedding: The embedding to add, as a list or numpy array.
+        - payload: Optional response stored in the same hash, under the "payload" field.
+        - ttl: Optional seconds until the hash expires, overriding the store's default.
         - **kwargs: Additional keyword arguments.
 
         Returns:
@@ -61,15 +87,54 @@ class RedisVectorStore(VectorStoreInterface):
 
         key = f"{self.index_name}:{vector_id}"
 
+        ttl = ttl if ttl is not None else self.ttl
         try:
-            self.redis_client.hset(key, mapping={
-                "vector": np.array(embedding, dtype=np.float32).tobytes()
-            })
+            if ttl is None:
+                self.redis_client.hset(key, mapping=self._hash_fields(embedding, payload))
+            else:
+                pipeline = self.redis_client.pipeline()
+                pipeline.hset(key, mapping=self._hash_fields(embedding, payload))
+                pipeline.expire(key, ttl)
+                pipeline.execute()
         except Exception as e:
             raise RuntimeError(f"Failed to add embedding to Redis: {str(e)}")
 
         return vector_id
 
+    @staticmethod
+    def _hash_fields(embedding, payload: str = None) -> dict:
+        fields = {"vector": np.asarray(embedding, dtype=np.float32).tobytes()}
+        if payload is not None:
+            fields["payload"] = payload
+        return fields
+
+    def add_many(self, embeddings: list, payloads: list = None, ttl: Optional[int] = None, **kwargs) -> list:
+        """
+        Add several embeddings to the Redis index in one pipelined round-trip.
+
+        Returns:
+        - The generated ids, in input order.
+        """
+        if len(embeddings) == 0:
+            return []
+        vector_ids = [get_query_index(self.identifier) for _ in embeddings]
+        payloads = payloads if payloads is not None else [None] * len(embeddings)
+        ttl = ttl if ttl is not None else self.ttl
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for vector_id, embedding, payload in zip(vector_ids, embeddings, payloads):
+            if not isinstance(embedding, (list, np.ndarray)):
+                raise ValueError("Embedding must be a list or numpy array.")
+            pipeline.hset(f"{self.index_name}:{vector_id}", mapping=self._hash_fields(embedding, payload))
+            if ttl is not None:
+                pipeline.expire(f"{self.index_name}:{vector_id}", ttl)
+
+        try:
+            pipeline.execute()
+        except Exception as e:
+            raise RuntimeError(f"Failed to add embeddings to Redis: {str(e)}")
+
+        return vector_ids
+
     def search(self, embedding: Union[list, np.ndarray], top_n: int = 1, include_distances: bool = True, **kwargs) -> Tuple[list, list]:
         """
         Search for similar embeddings in the Redis index.
@@ -90,13 +155,7 @@ class RedisVectorStore(VectorStoreInterface):
         query_vector = np.array(embedding, dtype=np.float32).tobytes()
 
         try:
-            query = (
-                Query(f"*=>[KNN {top_n} @vector $vector AS distance]")
-                .sort_by("distance")
-                .paging(0, top_n)
-                .dialect(2)
-            )
-            results = self.redis_client.ft(self.index_name).search(query, query_params={"vector": query_vector})
+            results = self.redis_client.ft(self.index_name).search(self._knn_query(top_n), query_params={"vector": query_vector})
 
             ids = [doc.id.split(":")[-1] for doc in results.docs]
             distances = [float(doc.distance) for doc in results.docs] if include_distances else []
@@ -105,6 +164,171 @@ class RedisVectorStore(VectorStoreInterface):
         except Exception as e:
             raise RuntimeError(f"Failed to search Redis index: {str(e)}")
 
+    def search_many(self, embeddings: list, top_n: int = 1, include_distances: bool = True, **kwargs) -> list:
+        """
+        Search for several embeddings, sending all KNN queries in one pipelined round-trip.
+
+        Returns:
+        - One (ids, distances) tuple per query embedding, in input order.
+        """
+        if len(embeddings) == 0:
+            return []
+        replies = self._pipelined_knn(embeddings, top_n, ("distance",))
+        return [self._parse_knn_reply(reply, include_distances)[:2] for reply in replies]
+
+    def _knn_command(self, embedding, top_n: int, fields: tuple) -> tuple:
+        if not isinstance(embedding, (list, np.ndarray)):
+            raise ValueError("Embedding must be a list or numpy array.")
+        return (
+            "FT.SEARCH", self.index_name, f"*=>[KNN {top_n} @vector $vector AS distance]",
+            "PARAMS", 2, "vector", np.asarray(embedding, dtype=np.float32).tobytes(),
+            "SORTBY", "distance", "RETURN", len(fields), *fields, "LIMIT", 0, top_n, "DIALECT", 2
+        )
+
+    def _pipelined_knn(self, embeddings: list, top_n: int, fields: tuple) -> list:
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for embedding in embeddings:
+            pipeline.execute_command(*self._knn_command(embedding, top_n, fields))
+        try:
+            return pipeline.execute()
+        except Exception as e:
+            raise RuntimeError(f"Failed to search Redis index: {str(e)}")
+
+    @staticmethod
+    def _parse_knn_reply(reply: list, include_distances: bool = True) -> Tuple[list, list, list]:
+        # Raw reply: [total, key, [field, value, ...], key, [field, value, ...], ...]
+        ids, distances, payloads = [], [], []
+        for key, fields in zip(reply[1::2], reply[2::2]):
+            key = key.decode() if isinstance(key, bytes) else key
+            ids.append(key.split(":")[-1])
+            values = {(name.decode() if isinstance(name, bytes) else name): value
+                      for name, value in zip(fields[::2], fields[1::2])}
+            if include_distances:
+                distances.append(float(values["distance"]))
+            payload = values.get("payload")
+            payloads.append(payload.decode() if isinstance(payload, bytes) else payload)
+        return ids, distances, payloads
+
+    def search_with_payload(self, embedding: Union[list, np.ndarray], top_n: int = 1, **kwargs) -> Tuple[list, list, list]:
+        """
+        Search and return the payload stored in each result's hash, in the same round-trip.
+
+        Returns:
+        - A tuple of three lists: ids, cosine distances and payloads (None where a hash has no payload).
+        """
+        try:
+            reply = self.redis_client.execute_command(*self._knn_command(embedding, top_n, ("distance", "payload")))
+        except Exception as e:
+            raise RuntimeError(f"Failed to search Redis index: {str(e)}")
+        return self._parse_knn_reply(reply)
+
+    def search_many_with_payload(self, embeddings: list, top_n: int = 1, **kwargs) -> list:
+        """
+        Search for several embeddings with payloads, in one pipelined round-trip.
+        """
+        if len(embeddings) == 0:
+            return []
+        return [self._parse_knn_reply(reply) for reply in self._pipelined_knn(embeddings, top_n, ("distance", "payload"))]
+
+    @staticmethod
+    def _knn_query(top_n: int) -> Query:
+        return (
+            Query(f"*=>[KNN {top_n} @vector $vector AS distance]")
+            .sort_by("distance")
+            .paging(0, top_n)
+            .dialect(2)
+        )
+
+    async def add_async(self, embedding: list, payload: str = None, ttl: Optional[int] = None, **kwargs) -> str:
+        """
+        Add an embedding to the Redis index using the asyncio client.
+        """
+        if not isinstance(embedding, (list, np.ndarray)):
+            raise ValueError("Embedding must be a list or numpy array.")
+        vector_id = get_query_index(self.identifier)
+
+        key = f"{self.index_name}:{vector_id}"
+        ttl = ttl if ttl is not None else self.ttl
+        try:
+            if ttl is None:
+                await self.async_redis_client.hset(key, mapping=self._hash_fields(embedding, payload))
+            else:
+                pipeline = self.async_redis_client.pipeline()
+                pipeline.hset(key, mapping=self._hash_fields(embedding, payload))
+                pipeline.expire(key, ttl)
+                await pipeline.execute()
+        except Exception as e:
+            raise RuntimeError(f"Failed to add embedding to Redis: {str(e)}")
+
+        return vector_id
+
+    async def search_async(self, embedding: Union[list, np.ndarray], top_n: int = 1, include_distances: bool = True, **kwargs) -> Tuple[list, list]:
+        """
+        Search for similar embeddings in the Redis index using the asyncio client.
+        """
+        if not isinstance(embedding, (list, np.ndarray)):
+            raise ValueError("Embedding must be a list or numpy array.")
+        query_vector = np.asarray(embedding, dtype=np.float32).tobytes()
+
+        try:
+            results = await self.async_redis_client.ft(self.index_name).search(self._knn_query(top_n), query_params={"vector": query_vector})
+        except Exception as e:
+            raise RuntimeError(f"Failed to search Redis index: {str(e)}")
+
+        ids = [doc.id.split(":")[-1] for doc in results.docs]
+        distances = [float(doc.distance) for doc in results.docs] if include_distances else []
+        return ids, distances
+
+    async def search_many_async(self, embeddings: list, top_n: int = 1, include_distances: bool = True, **kwargs) -> list:
+        """
+        Search for several embeddings concurrently over the asyncio connection pool.
+        """
+        return list(await asyncio.gather(*(self.search_async(embedding, top_n, include_distances) for embedding in embeddings)))
+
+    async def search_with_payload_async(self, embedding: Union[list, np.ndarray], top_n: int = 1, **kwargs) -> Tuple[list, list, list]:
+        """
+        Async counterpart of `search_with_payload`.
+        """
+        try:
+            reply = await self.async_redis_client.execute_command(*self._knn_command(embedding, top_n, ("distance", "payload")))
+        except Exception as e:
+            raise RuntimeError(f"Failed to search Redis index: {str(e)}")
+        return self._parse_knn_reply(reply)
+
+    async def search_many_with_payload_async(self, embeddings: list, top_n: int = 1, **kwargs) -> list:
+        return list(await asyncio.gather(*(self.search_with_payload_async(embedding, top_n) for embedding in embeddings)))
+
+    def delete(self, vector_id: str) -> bool:
+        """
+        Delete an embedding's hash; Redis drops it from the index as well.
+        """
+        return self.delete_many([vector_id]) == 1
+
+    def delete_many(self, vector_ids: list) -> int:
+        """
+        Delete several embeddings with a single DEL.
+
+        Returns:
+        - The number of ids that were present.
+        """
+        if len(vector_ids) == 0:
+            return 0
+        try:
+            return self.redis_client.delete(*(f"{self.index_name}:{vector_id}" for vector_id in vector_ids))
+        except Exception as e:
+            raise RuntimeError(f"Failed to delete embeddings from Redis: {str(e)}")
+
+    async def delete_async(self, vector_id: str) -> bool:
+        return await self.delete_many_async([vector_id]) == 1
+
+    async def delete_many_async(self, vector_ids: list) -> int:
+        if len(vector_ids) == 0:
+            return 0
+        try:
+            return await self.async_redis_client.delete(*(f"{self.index_name}:{vector_id}" for vector_id in vector_ids))
+        except Exception as e:
+            raise RuntimeError(f"Failed to delete embeddings from Redis: {str(e)}")
+
     def close(self):
         """Close the Redis client."""
         self.redis_client.close()